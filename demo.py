@@ -34,17 +34,29 @@ Role of Each Data Structure:
 3. Sparse Table:
 	- Precompute static peak bandwidth (max) for [L, R] (immutable historical data).
 	- Highlight its advantage for read-only max queries with O(1) time.
+
+4. Block Sparse Table:
+	- Sparse Table over block maxima plus in-block prefix/suffix maxima (O(n) space).
+	- Near-O(1) max queries that still accept late corrections: an update only
+	  rebuilds the affected block and the summary windows covering it.
+
+For an unbounded stream where only the last W intervals matter, see
+`src.sliding_window.SlidingWindowMonitor`, which uses a Segment Tree or
+Fenwick Tree of fixed capacity W as a ring buffer.
 '''
 
 
-import matplotlib.pyplot as plt
+import numpy as np
 
+from src import backend
 from src.fenwick_tree import FenwickTree
 from src.segment_tree import SegmentTree
-from src.sparse_table import SparseTable
+from src.sparse_table import SparseTable, BlockSparseTable
 
-from src.generate_data import generate_dataset, generate_operations
+from src.generate_data import generate_dataset, generate_operation_array
 from src.helper import parse_args, benchmark_updates, benchmark_queries, print_results
+from src.helper import benchmark_worker_scaling, print_scaling_results
+from src.helper import benchmark_mixed_workload, print_mixed_results
 
 
 # ----------------- Configuration -----------------
@@ -54,22 +66,34 @@ max_size = 10_000_000            # Maximum dataset size (10 million)
 num_operations = 10_000          # Number of operations per run
 dataset_type = "random"          # Dataset type: "random", "sparse_peaks", "increasing", "decreasing", "all_equal"
 max_val = 1000                   # Maximum bandwidth value
+scaling_queries = 1_000_000      # Number of batched queries per worker-scaling run (--workers)
 # -------------------------------------------------
 
 
 def main():
     args = parse_args()
     
+    # Report which backend runs the scalar update / query loops
+    print(f"Backend: {backend.get_backend()} (available: {', '.join(backend.AVAILABLE)})")
+    backend.warmup()  # Compile JIT kernels up front so compilation is not timed
+    
     # Initialize results storage
     update_results = {
         "Fenwick Tree": {"sizes": [], "times": []},
-        "Segment Tree": {"sizes": [], "times": []}
+        "Segment Tree": {"sizes": [], "times": []},
+        "Block Sparse Table": {"sizes": [], "times": []}
     }
     query_results = {
         "Fenwick Tree (Sum)": {"sizes": [], "times": []},
         "Segment Tree (Sum)": {"sizes": [], "times": []},
         "Segment Tree (Max)": {"sizes": [], "times": []},
-        "Sparse Table (Max)": {"sizes": [], "times": []}
+        "Sparse Table (Max)": {"sizes": [], "times": []},
+        "Block Sparse Table (Max)": {"sizes": [], "times": []},
+        "Fenwick Tree (Sum, Batch)": {"sizes": [], "times": []},
+        "Segment Tree (Sum, Batch)": {"sizes": [], "times": []},
+        "Segment Tree (Max, Batch)": {"sizes": [], "times": []},
+        "Sparse Table (Max, Batch)": {"sizes": [], "times": []},
+        "Block Sparse Table (Max, Batch)": {"sizes": [], "times": []}
     }
     
     # Generate dataset sizes
@@ -88,17 +112,17 @@ def main():
         
         # Generate update operations
         print("Generating update operations...", end="\r")
-        update_ops = generate_operations(size, num_ops=num_operations, query_ratio=0.0)  # 100% updates
+        update_ops = generate_operation_array(size, num_ops=num_operations, query_ratio=0.0)  # 100% updates
         print(f"Generated {len(update_ops)} update operations.          ")
         
         # Generate sum query operations
         print("Generating sum query operations...", end="\r")
-        sum_query_ops = generate_operations(size, num_ops=num_operations, query_ratio=1.0, query_type="sum")  # 100% sum queries
+        sum_query_ops = generate_operation_array(size, num_ops=num_operations, query_ratio=1.0, query_type="sum")  # 100% sum queries
         print(f"Generated {len(sum_query_ops)} sum query operations.          ")
         
         # Generate max query operations
         print("Generating max query operations...", end="\r")
-        max_query_ops = generate_operations(size, num_ops=num_operations, query_ratio=1.0, query_type="max")  # 100% max queries
+        max_query_ops = generate_operation_array(size, num_ops=num_operations, query_ratio=1.0, query_type="max")  # 100% max queries
         print(f"Generated {len(max_query_ops)} max query operations.          ")
         
         # Initialize data structures
@@ -114,15 +138,22 @@ def main():
         sparse = SparseTable(data)
         print("Sparse Table initialized.          ")
         
+        print("Initializing Block Sparse Table...", end="\r")
+        block_sparse = BlockSparseTable(data)
+        print("Block Sparse Table initialized.          ")
+        
         # Benchmark updates
         print("Benchmarking updates...")
         fenwick_update_time = benchmark_updates(fenwick, update_ops)
         segment_update_time = benchmark_updates(segment, update_ops)
+        block_sparse_update_time = benchmark_updates(block_sparse, update_ops)
         
         update_results["Fenwick Tree"]["sizes"].append(size)
         update_results["Fenwick Tree"]["times"].append(fenwick_update_time)
         update_results["Segment Tree"]["sizes"].append(size)
         update_results["Segment Tree"]["times"].append(segment_update_time)
+        update_results["Block Sparse Table"]["sizes"].append(size)
+        update_results["Block Sparse Table"]["times"].append(block_sparse_update_time)
         
         # Benchmark sum queries
         print("Benchmarking sum queries...")
@@ -138,17 +169,60 @@ def main():
         print("Benchmarking max queries...")
         segment_max_time = benchmark_queries(segment, max_query_ops, "max")
         sparse_max_time = benchmark_queries(sparse, max_query_ops, "max")
+        block_sparse_max_time = benchmark_queries(block_sparse, max_query_ops, "max")
         
         query_results["Segment Tree (Max)"]["sizes"].append(size)
         query_results["Segment Tree (Max)"]["times"].append(segment_max_time)
         query_results["Sparse Table (Max)"]["sizes"].append(size)
         query_results["Sparse Table (Max)"]["times"].append(sparse_max_time)
+        query_results["Block Sparse Table (Max)"]["sizes"].append(size)
+        query_results["Block Sparse Table (Max)"]["times"].append(block_sparse_max_time)
+        
+        # Benchmark batched queries
+        print("Benchmarking batched queries...")
+        batched_times = {
+            "Fenwick Tree (Sum, Batch)": benchmark_queries(fenwick, sum_query_ops, "sum", batched=True),
+            "Segment Tree (Sum, Batch)": benchmark_queries(segment, sum_query_ops, "sum", batched=True),
+            "Segment Tree (Max, Batch)": benchmark_queries(segment, max_query_ops, "max", batched=True),
+            "Sparse Table (Max, Batch)": benchmark_queries(sparse, max_query_ops, "max", batched=True),
+            "Block Sparse Table (Max, Batch)": benchmark_queries(block_sparse, max_query_ops, "max", batched=True)
+        }
+        for name, elapsed in batched_times.items():
+            query_results[name]["sizes"].append(size)
+            query_results[name]["times"].append(elapsed)
         
         # Print current benchmark results
         print_results(update_results, query_results, size)
+        
+        # Benchmark shared-memory query serving across worker counts
+        if args.workers:
+            print("Benchmarking shared-memory query scaling...")
+            ls = np.random.randint(0, size, size=scaling_queries)
+            rs = np.minimum(ls + np.random.randint(1, 100, size=scaling_queries), size - 1)
+            scaling_results = {
+                "Segment Tree (Sum)": benchmark_worker_scaling(segment, ls, rs, "sum", args.workers),
+                "Segment Tree (Max)": benchmark_worker_scaling(segment, ls, rs, "max", args.workers),
+                "Sparse Table (Max)": benchmark_worker_scaling(sparse, ls, rs, "max", args.workers)
+            }
+            print_scaling_results(scaling_results)
+        
+        # Benchmark interleaved read/write workloads across query ratios
+        if args.mixed:
+            print("Benchmarking mixed read/write workloads...")
+            mixed_results = {
+                "Fenwick Tree (Sum)": benchmark_mixed_workload(
+                    lambda: FenwickTree(data), size, args.mixed, num_operations, "sum"),
+                "Segment Tree (Sum)": benchmark_mixed_workload(
+                    lambda: SegmentTree(data), size, args.mixed, num_operations, "sum"),
+                "Block Sparse Table (Max)": benchmark_mixed_workload(
+                    lambda: BlockSparseTable(data), size, args.mixed, num_operations, "max")
+            }
+            print_mixed_results(mixed_results)
     
     # Generate plots only in full mode
     if args.full:
+        import matplotlib.pyplot as plt
+        
         # Plot update results
         plt.figure(figsize=(10, 6))
         for name, data in update_results.items():
@@ -0,0 +1,193 @@
+#
+#  array_utils.py
+#  Advanced Data Structure
+#
+#  Vectorized helpers shared by the data structures.
+#
+
+import numpy as np
+
+# Smallest slice worth handing to another thread during a parallel build
+PARALLEL_MIN_CHUNK = 1 << 16
+
+
+def dedupe_updates(indices: np.ndarray, values: np.ndarray):
+    """
+    Collapse a batch of point updates so every index appears once.
+    
+    When an index is written more than once, the last write wins.
+    
+    Args:
+        indices (np.ndarray): Indices to update (0-based).
+        values (np.ndarray): New values, aligned with `indices`.
+    
+    Returns:
+        tuple: Sorted unique indices and the value that survives for each.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    values = np.asarray(values)
+    if len(indices) != len(values):
+        raise ValueError("indices and values must have the same length")
+    # np.unique reports the first occurrence, so search the reversed batch
+    unique, first = np.unique(indices[::-1], return_index=True)
+    return unique, values[::-1][first]
+
+
+def lowest_value(dtype):
+    """
+    Return the smallest value representable by `dtype` (the identity of max).
+    """
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).min
+    return -np.inf
+
+
+def highest_value(dtype):
+    """
+    Return the largest value representable by `dtype` (the identity of min).
+    """
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).max
+    return np.inf
+
+
+def check_fits(values: np.ndarray, dtype, what: str):
+    """
+    Raise OverflowError if integer values do not fit `dtype`.
+    
+    Array assignment would silently wrap them; scalar assignment already raises.
+    
+    Args:
+        values (np.ndarray): Values about to be stored.
+        dtype: Dtype of the array they are stored in.
+        what (str): Name of that array, for the error message.
+    """
+    if len(values) == 0 or np.can_cast(values.dtype, dtype) or not np.issubdtype(dtype, np.integer):
+        return
+    info = np.iinfo(dtype)
+    if values.min() < info.min or values.max() > info.max:
+        raise OverflowError(f"Values out of range for {np.dtype(dtype)} {what}")
+
+
+# Operations that may be applied to overlapping ranges (x op x == x)
+IDEMPOTENT_OPS = (np.maximum, np.minimum, np.fmax, np.fmin, np.gcd, np.bitwise_and, np.bitwise_or)
+
+# Packed arg-modes: (value, index) pairs packed into one int64 and reduced with this op
+ARG_OPS = {"argmax": np.maximum, "argmin": np.minimum}
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+
+def monoid_identity(op, dtype):
+    """
+    Return the identity element of a binary ufunc for the given dtype.
+    
+    Args:
+        op (np.ufunc): Associative binary operation, e.g. np.add or np.maximum.
+        dtype: Dtype the operation is applied to.
+    
+    Returns:
+        The identity element of `op`.
+    """
+    if op in (np.add, np.bitwise_or, np.bitwise_xor, np.gcd):
+        return 0
+    if op is np.multiply:
+        return 1
+    if op in (np.maximum, np.fmax):
+        return lowest_value(dtype)
+    if op in (np.minimum, np.fmin):
+        return highest_value(dtype)
+    if op is np.bitwise_and:
+        return np.array(-1).astype(dtype)[()]  # All bits set
+    raise ValueError(f"No known identity for {op.__name__}; pass identity explicitly")
+
+
+def pack_arg(values: np.ndarray, indices: np.ndarray, mode: str) -> np.ndarray:
+    """
+    Pack (value, index) pairs into int64 so that max / min pick the leftmost extreme.
+    
+    The value goes in the high 32 bits. For "argmax" the low bits hold
+    INDEX_MASK - index, so ties go to the smaller index under max; for
+    "argmin" they hold the index itself.
+    
+    Args:
+        values (np.ndarray): Values, which must fit in int32.
+        indices (np.ndarray): Positions of the values (0-based, < 2^32).
+        mode (str): "argmax" or "argmin".
+    
+    Returns:
+        np.ndarray: Packed int64 keys.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    info = np.iinfo(np.int32)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        raise OverflowError("Packed arg modes need values that fit in int32")
+    if len(indices) and indices.max() > INDEX_MASK:
+        raise OverflowError("Packed arg modes support at most 2^32 elements")
+    low = INDEX_MASK - indices if mode == "argmax" else indices
+    return (values << INDEX_BITS) | low
+
+
+def unpack_arg(packed, mode: str):
+    """
+    Recover the index from keys produced by `pack_arg`.
+    
+    Args:
+        packed: Packed int64 key or array of keys.
+        mode (str): "argmax" or "argmin".
+    
+    Returns:
+        Index (or array of indices) of the selected element.
+    """
+    low = packed & INDEX_MASK
+    return INDEX_MASK - low if mode == "argmax" else low
+
+
+class ChunkRunner:
+    def __init__(self, workers: int = None, min_chunk: int = PARALLEL_MIN_CHUNK):
+        """
+        Run slice-wise build steps on a thread pool.
+        
+        NumPy releases the GIL inside large ufunc calls, so threads writing
+        disjoint output slices of one level run in parallel. Steps smaller than
+        two `min_chunk` slices run on the calling thread.
+        
+        Args:
+            workers (int): Number of threads; None or 1 runs everything serially.
+            min_chunk (int): Minimum number of elements per slice.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be a positive integer")
+        self.workers = workers or 1
+        self.min_chunk = min_chunk
+        self._pool = None
+        if self.workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="build")
+
+    def run(self, fn, lo: int, hi: int):
+        """
+        Call `fn(start, stop)` on slices that together cover [lo, hi), and wait for all of them.
+        """
+        parts = min(self.workers, (hi - lo) // self.min_chunk)
+        if self._pool is None or parts < 2:
+            fn(lo, hi)
+            return
+        bounds = np.linspace(lo, hi, parts + 1).astype(np.int64).tolist()
+        for future in [self._pool.submit(fn, start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]:
+            future.result()  # Re-raise errors from the workers
+
+    def close(self):
+        """
+        Stop the threads.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
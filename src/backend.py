@@ -0,0 +1,122 @@
+#
+#  backend.py
+#  Advanced Data Structure
+#
+#  Selection of the backend that runs the tree walk loops.
+#
+#  "numba": the loops in kernels.py compiled to native code with Numba.
+#  "python": the pure-Python methods of the data structures.
+#
+#  The backend is chosen at import time: Numba if it is installed, unless the
+#  ADS_BACKEND environment variable says otherwise. It can be switched later
+#  with `set_backend`. Numba itself is imported (and the kernels compiled) only
+#  when `kernels` is first read, so importing the data structures stays cheap.
+#
+
+import importlib.util
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+from src import kernels as _kernels
+
+AVAILABLE = ("python", "numba") if importlib.util.find_spec("numba") is not None else ("python",)
+KERNEL_NAMES = (
+    "fenwick_prefix", "fenwick_add", "fenwick_find",
+    "segment_update_sum", "segment_update_max", "segment_query_sum", "segment_query_max"
+)
+
+# `kernels` (compiled kernels, or None when the pure-Python code runs) is set
+# by `set_backend`; until then the module __getattr__ below selects the default
+_name = "python"
+_compiled = None
+
+
+def _compile():
+    """
+    JIT-compile the kernels once (compilation itself happens on first call).
+    """
+    global _compiled
+    if _compiled is None:
+        import numba
+        jit = numba.njit(cache=True)
+        compiled = {name: jit(getattr(_kernels, name)) for name in KERNEL_NAMES}
+        _compiled = SimpleNamespace(**compiled)
+    return _compiled
+
+
+def __getattr__(name: str):
+    """
+    Select the default backend on the first read of `kernels`.
+    """
+    if name == "kernels":
+        set_backend(_name)
+        return kernels
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def get_backend() -> str:
+    """
+    Name of the active backend.
+    """
+    return _name
+
+
+def set_backend(name: str) -> str:
+    """
+    Switch the active backend.
+    
+    Args:
+        name (str): "numba" or "python".
+    
+    Returns:
+        str: Name of the previously active backend.
+    """
+    global kernels, _name
+    if name not in AVAILABLE:
+        raise ValueError(f"Backend '{name}' is not available (available: {', '.join(AVAILABLE)})")
+    previous = _name
+    kernels = _compile() if name == "numba" else None
+    _name = name
+    return previous
+
+
+@contextmanager
+def use_backend(name: str):
+    """
+    Temporarily switch the active backend.
+    
+    Args:
+        name (str): "numba" or "python".
+    """
+    previous = set_backend(name)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+def warmup():
+    """
+    Trigger JIT compilation for the common dtypes so it is not timed later.
+    """
+    if get_backend() != "numba":
+        return
+    compiled = _compile()
+    for dtype in (np.int32, np.int64):
+        tree = np.zeros(4, dtype=dtype)
+        compiled.segment_update_max(tree, 2, 0, 1)
+        compiled.segment_query_max(tree, 2, 0, 1)
+    tree = np.zeros(4, dtype=np.int64)
+    compiled.fenwick_find(tree, 3, 1)
+    compiled.fenwick_add(tree, 3, 0, 1)
+    compiled.fenwick_prefix(tree, 2)
+    compiled.segment_update_sum(tree, 2, 0, 1)
+    compiled.segment_query_sum(tree, 2, 0, 1)
+
+
+_name = os.environ.get("ADS_BACKEND", AVAILABLE[-1])  # Numba when installed
+if _name not in AVAILABLE:
+    raise ValueError(f"Backend '{_name}' is not available (available: {', '.join(AVAILABLE)})")
@@ -0,0 +1,617 @@
+#
+#  benchmark.py
+#  Advanced Data Structure
+#
+#  Repeatable benchmark suite with machine-readable output.
+#
+#  Usage:
+#      python -m src.benchmark --sizes 1000000 --repeat 5 --json results.json
+#      python -m src.benchmark --json new.json --compare results.json
+#      python -m src.benchmark --profile --sizes 1000 10000 100000 --plot profile.png
+#      python -m src.benchmark --order-stats --range-lengths 100 10000 1000000
+#      python -m src.benchmark --build-scaling --sizes 10000000 --workers 1 2 4 8
+#      python -m src.benchmark --import-time
+#
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src import backend
+from src.fenwick_tree import FenwickTree
+from src.generate_data import DATASET_TYPES, DISTRIBUTIONS, generate_dataset, generate_operation_array
+from src.profiling import Profiler
+from src.segment_tree import SegmentTree
+from src.sparse_table import BlockSparseTable, SparseTable
+from src.wavelet_matrix import WaveletMatrix
+
+# Structure name -> (class, supported operations)
+STRUCTURES = {
+    "Fenwick Tree": (FenwickTree, ("update", "sum")),
+    "Segment Tree": (SegmentTree, ("update", "sum", "max")),
+    "Sparse Table": (SparseTable, ("max",)),
+    "Block Sparse Table": (BlockSparseTable, ("update", "max")),
+}
+OPERATIONS = ("update", "sum", "max")
+
+CSV_FIELDS = (
+    "structure", "operation", "batched", "dataset", "distribution", "size", "num_ops", "repeat",
+    "mean_us", "p50_us", "p99_us", "ops_per_sec", "build_s", "peak_mem_bytes"
+)
+
+
+def measure_build(cls, data, repeat: int = 3):
+    """
+    Time the construction of a structure and record its peak memory.
+    
+    Build time is the mean of `repeat` untraced builds; peak memory comes from
+    one extra build under tracemalloc (which NumPy reports its buffers to).
+    Returns: (structure, build_seconds, peak_bytes)
+    """
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        structure = cls(data)
+        times.append(time.perf_counter() - start_time)
+        del structure
+    
+    tracemalloc.start()
+    structure = cls(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, float(np.mean(times)), peak
+
+
+def time_scalar(fn, args, warmup: int, repeat: int):
+    """
+    Time one call per argument tuple, recording every call's latency.
+    
+    Returns: (per-call latencies in ns over all repetitions, total seconds per repetition)
+    """
+    clock = time.perf_counter_ns
+    for _ in range(warmup):
+        for a, b in args:
+            fn(a, b)
+    latencies = np.empty((repeat, len(args)), dtype=np.int64)
+    totals = []
+    for rep in range(repeat):
+        row = latencies[rep]
+        start_time = time.perf_counter()
+        for k, (a, b) in enumerate(args):
+            t0 = clock()
+            fn(a, b)
+            row[k] = clock() - t0
+        totals.append(time.perf_counter() - start_time)
+    return latencies.ravel(), totals
+
+
+def time_batched(fn, a, b, warmup: int, repeat: int):
+    """
+    Time one batched call per repetition.
+    
+    Latencies are per operation (batch time divided by the batch size), so
+    they compare directly with the per-call latencies of `time_scalar`.
+    Returns: (per-operation latencies in ns, total seconds per repetition)
+    """
+    for _ in range(warmup):
+        fn(a, b)
+    totals = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn(a, b)
+        totals.append(time.perf_counter() - start_time)
+    return np.array(totals) * 1e9 / max(len(a), 1), totals
+
+
+def summarize(latencies: np.ndarray, totals: list, num_ops: int) -> dict:
+    """
+    Reduce raw timings to mean / p50 / p99 latency and throughput.
+    """
+    return {
+        "mean_us": float(latencies.mean()) / 1e3,
+        "p50_us": float(np.percentile(latencies, 50)) / 1e3,
+        "p99_us": float(np.percentile(latencies, 99)) / 1e3,
+        "ops_per_sec": num_ops * len(totals) / sum(totals),
+    }
+
+
+def run_benchmark(sizes, dataset_type: str = "random", num_ops: int = 10_000,
+                  warmup: int = 1, repeat: int = 5, batched: bool = True,
+                  structures=None, max_val: int = 1000, seed: int = 0,
+                  distribution: str = "uniform") -> list:
+    """
+    Run every supported operation of every structure for each dataset size.
+    
+    Args:
+        sizes: Dataset sizes to benchmark.
+        dataset_type: Dataset type passed to `generate_dataset`.
+        num_ops: Operations per timed repetition.
+        warmup: Untimed repetitions before timing.
+        repeat: Timed repetitions.
+        batched: Also time the batched `*_many` APIs.
+        structures: Names from STRUCTURES to run (default: all).
+        max_val: Maximum value in the dataset.
+        seed: Seed for the dataset and operations.
+        distribution: Index distribution passed to `generate_operation_array`.
+    
+    Returns:
+        list: One result dict per (structure, operation, batched, size).
+    """
+    results = []
+    for size in sizes:
+        np.random.seed(seed)
+        data = generate_dataset(size, dataset_type, max_val)
+        update_ops = generate_operation_array(size, num_ops, 0.0, distribution=distribution, seed=seed)
+        query_ops = generate_operation_array(size, num_ops, 1.0, distribution=distribution, seed=seed + 1)
+        columns = {"update": (update_ops["a"], update_ops["b"]), "sum": (query_ops["a"], query_ops["b"])}
+        columns["max"] = columns["sum"]
+        args = {name: list(zip(a.tolist(), b.tolist())) for name, (a, b) in columns.items()}
+        
+        for name in structures or STRUCTURES:
+            cls, operations = STRUCTURES[name]
+            structure, build_s, peak = measure_build(cls, data)
+            for operation in operations:
+                scalar_fn = structure.update if operation == "update" else getattr(structure, f"query_{operation}")
+                batch_fn = structure.update_many if operation == "update" else getattr(structure, f"query_{operation}_many")
+                runs = [(False, time_scalar(scalar_fn, args[operation], warmup, repeat))]
+                if batched:
+                    runs.append((True, time_batched(batch_fn, *columns[operation], warmup, repeat)))
+                for is_batched, (latencies, totals) in runs:
+                    record = {
+                        "structure": name, "operation": operation, "batched": is_batched,
+                        "dataset": dataset_type, "distribution": distribution, "size": size, "num_ops": num_ops, "repeat": repeat,
+                        "build_s": build_s, "peak_mem_bytes": peak,
+                    }
+                    record.update(summarize(latencies, totals, num_ops))
+                    results.append(record)
+            del structure
+    return results
+
+
+def run_profile(sizes, dataset_types=DATASET_TYPES, num_ops: int = 1_000,
+                structures=None, max_val: int = 1000, seed: int = 0) -> list:
+    """
+    Record memory footprint, build phases and nodes visited per operation.
+    
+    Each structure is built with a Profiler attached, then runs `num_ops`
+    scalar calls of each supported operation.
+    
+    Args:
+        sizes: Dataset sizes to profile.
+        dataset_types: Dataset types passed to `generate_dataset`.
+        num_ops: Scalar calls per operation.
+        structures: Names from STRUCTURES to run (default: all).
+        max_val: Maximum value in the dataset.
+        seed: Seed for the dataset and operations.
+    
+    Returns:
+        list: One result dict per (structure, dataset, size).
+    """
+    results = []
+    for dataset_type in dataset_types:
+        for size in sizes:
+            np.random.seed(seed)
+            data = generate_dataset(size, dataset_type, max_val)
+            update_ops = generate_operation_array(size, num_ops, 0.0, seed=seed).tolist()
+            query_ops = generate_operation_array(size, num_ops, 1.0, seed=seed + 1).tolist()
+            for name in structures or STRUCTURES:
+                cls, operations = STRUCTURES[name]
+                profiler = Profiler()
+                structure = cls(data, profiler=profiler)
+                for operation in operations:
+                    if operation == "update":
+                        for _, index, value in update_ops:
+                            structure.update(index, value)
+                    else:
+                        fn = getattr(structure, f"query_{operation}")
+                        for _, l, r in query_ops:
+                            fn(l, r)
+                report = structure.memory_report()
+                results.append({
+                    "structure": name, "dataset": dataset_type, "size": size,
+                    "total_bytes": report["total_bytes"],
+                    "bytes_per_element": report["bytes_per_element"],
+                    "build_phases_s": dict(profiler.timings),
+                    "nodes_per_call": {op: profiler.nodes_per_call(op) for op in profiler.calls},
+                })
+                del structure
+    return results
+
+
+def plot_profile(results: list, path: str):
+    """
+    Plot bytes per element and nodes visited per call against n.
+    
+    One line per structure (and operation), one column per dataset type.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    
+    dataset_types = list(dict.fromkeys(r["dataset"] for r in results))
+    fig, axes = plt.subplots(2, len(dataset_types), figsize=(4 * len(dataset_types), 8), squeeze=False)
+    for col, dataset_type in enumerate(dataset_types):
+        rows = [r for r in results if r["dataset"] == dataset_type]
+        for name in dict.fromkeys(r["structure"] for r in rows):
+            series = sorted((r for r in rows if r["structure"] == name), key=lambda r: r["size"])
+            sizes = [r["size"] for r in series]
+            axes[0, col].plot(sizes, [r["bytes_per_element"] for r in series], marker="o", label=name)
+            for operation in series[0]["nodes_per_call"]:
+                axes[1, col].plot(sizes, [r["nodes_per_call"][operation] for r in series],
+                                  marker="o", label=f"{name} {operation}")
+        axes[0, col].set_title(dataset_type)
+        axes[1, col].set_xlabel("n")
+        for ax in axes[:, col]:
+            ax.set_xscale("log")
+            ax.grid(True, which="both", linestyle="--")
+    axes[0, 0].set_ylabel("Bytes per element")
+    axes[1, 0].set_ylabel("Nodes visited per call")
+    axes[0, -1].legend(fontsize="small")
+    axes[1, -1].legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def print_profile(results: list):
+    """
+    Print profile results in a tabular format.
+    """
+    header = "{:<20} {:<14} {:>12} {:>12} {:>14}  {}"
+    print(header.format("Data Structure", "Dataset", "Size", "Bytes/elem", "Total bytes", "Nodes per call"))
+    print("-" * 108)
+    for r in results:
+        nodes = ", ".join(f"{op}={value:.1f}" for op, value in r["nodes_per_call"].items())
+        print(header.format(r["structure"], r["dataset"], f"{r['size']:,}", f"{r['bytes_per_element']:.2f}",
+                            f"{r['total_bytes']:,}", nodes))
+
+
+# Structures whose constructor accepts workers=
+PARALLEL_STRUCTURES = {"Segment Tree": SegmentTree, "Sparse Table": SparseTable}
+
+
+def run_build_scaling(sizes, worker_counts=None, dataset_types=DATASET_TYPES, repeat: int = 3,
+                      structures=None, max_val: int = 1000, seed: int = 0) -> list:
+    """
+    Measure parallel build time and speedup over a serial build for each thread count.
+    
+    Args:
+        sizes: Dataset sizes to build.
+        worker_counts: Thread counts to try (default: powers of 2 up to the CPU count).
+        dataset_types: Dataset types passed to `generate_dataset`.
+        repeat: Builds per measurement (the fastest is kept).
+        structures: Names from PARALLEL_STRUCTURES to run (default: all).
+        max_val: Maximum value in the dataset.
+        seed: Seed for the dataset.
+    
+    Returns:
+        list: One result dict per (structure, dataset, size, workers).
+    """
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = [1 << i for i in range(cpus.bit_length()) if 1 << i < cpus] + [cpus]
+    results = []
+    for dataset_type in dataset_types:
+        for size in sizes:
+            np.random.seed(seed)
+            data = generate_dataset(size, dataset_type, max_val)
+            for name in structures or PARALLEL_STRUCTURES:
+                cls = PARALLEL_STRUCTURES[name]
+                serial_s = None
+                for workers in sorted(set(worker_counts)):
+                    times = []
+                    for _ in range(repeat):
+                        start_time = time.perf_counter()
+                        structure = cls(data, workers=workers)
+                        times.append(time.perf_counter() - start_time)
+                        del structure
+                    build_s = min(times)
+                    if serial_s is None:
+                        serial_s = build_s  # Smallest thread count is the baseline
+                    results.append({
+                        "structure": name, "dataset": dataset_type, "size": size, "workers": workers,
+                        "build_s": build_s, "speedup": serial_s / build_s,
+                    })
+    return results
+
+
+def print_build_scaling(results: list):
+    """
+    Print build scaling results in a tabular format.
+    """
+    header = "{:<20} {:<14} {:>12} {:>8} {:>12} {:>9}"
+    print(header.format("Data Structure", "Dataset", "Size", "Workers", "Build (s)", "Speedup"))
+    print("-" * 80)
+    for r in results:
+        print(header.format(r["structure"], r["dataset"], f"{r['size']:,}", r["workers"],
+                            f"{r['build_s']:.3f}", f"{r['speedup']:.2f}x"))
+
+
+def run_order_stats(sizes, range_lengths=(100, 10_000), num_ops: int = 1_000, warmup: int = 1,
+                    repeat: int = 3, max_val: int = 1000, seed: int = 0) -> list:
+    """
+    Compare Wavelet Matrix threshold counts and medians with sorting each slice.
+    
+    For every size and range length, `num_ops` random ranges of that length
+    are answered three ways: scalar Wavelet Matrix calls, one batched call,
+    and the baseline that sorts (or compares) a copy of each slice.
+    
+    Args:
+        sizes: Dataset sizes to run.
+        range_lengths: Query range lengths (clipped to the size).
+        num_ops: Ranges per timed repetition.
+        warmup: Untimed warmup repetitions.
+        repeat: Timed repetitions.
+        max_val: Maximum value in the dataset.
+        seed: Seed for the dataset and ranges.
+    
+    Returns:
+        list: One result dict per (size, range length, operation, method).
+    """
+    results = []
+    rng = np.random.default_rng(seed)
+    for size in sizes:
+        data = rng.integers(0, max_val + 1, size=size, dtype=np.int32)
+        start_time = time.perf_counter()
+        wavelet = WaveletMatrix(data)
+        build_s = time.perf_counter() - start_time
+        threshold = max_val // 2
+        for length in sorted({min(length, size) for length in range_lengths}):
+            ls = rng.integers(0, size - length + 1, size=num_ops)
+            rs = ls + length - 1
+            pairs = list(zip(ls.tolist(), rs.tolist()))
+            thresholds = np.full(num_ops, threshold)
+            methods = {
+                "count_greater": {
+                    "wavelet": lambda l, r: wavelet.count_greater(l, r, threshold),
+                    "sort slice": lambda l, r: np.count_nonzero(data[l:r + 1] > threshold),
+                },
+                "median": {
+                    "wavelet": lambda l, r: wavelet.quantile(l, r, 0.5),
+                    "sort slice": lambda l, r: np.sort(data[l:r + 1])[(r - l) // 2],
+                },
+            }
+            batched = {
+                "count_greater": lambda a, b: wavelet.count_greater_many(a, b, thresholds),
+                "median": lambda a, b: wavelet.quantile_many(a, b, 0.5),
+            }
+            for operation, fns in methods.items():
+                timings = {name: time_scalar(fn, pairs, warmup, repeat) for name, fn in fns.items()}
+                timings["wavelet batched"] = time_batched(batched[operation], ls, rs, warmup, repeat)
+                for method, (latencies, totals) in timings.items():
+                    stats = summarize(latencies, totals, num_ops)
+                    results.append({
+                        "operation": operation, "method": method, "size": size, "range_length": length,
+                        "num_ops": num_ops, "build_s": build_s if method.startswith("wavelet") else 0.0,
+                        "mean_us": stats["mean_us"], "ops_per_sec": stats["ops_per_sec"],
+                    })
+    return results
+
+
+def print_order_stats(results: list):
+    """
+    Print order-statistics results in a tabular format.
+    """
+    header = "{:<14} {:<16} {:>12} {:>12} {:>12} {:>14}"
+    print(header.format("Op", "Method", "Size", "Range", "Mean (us)", "Ops/s"))
+    print("-" * 86)
+    for r in results:
+        print(header.format(r["operation"], r["method"], f"{r['size']:,}", f"{r['range_length']:,}",
+                            f"{r['mean_us']:.2f}", f"{r['ops_per_sec']:,.0f}"))
+
+
+# Modules timed by --import-time, and dependencies they should not load eagerly
+IMPORT_MODULES = ("numpy", "src.query", "src.segment_tree", "src.helper", "src.service", "demo")
+HEAVY_MODULES = ("tqdm", "matplotlib", "numba", "argparse")
+
+
+def measure_import_time(module: str, repeat: int = 5) -> dict:
+    """
+    Time importing a module in fresh interpreters and list the heavy modules it loaded.
+    
+    Args:
+        module: Module to import.
+        repeat: Fresh interpreters to start (the fastest import is kept).
+    
+    Returns:
+        dict: Import time in ms and the names from HEAVY_MODULES left in sys.modules.
+    """
+    code = (f"import sys, time; start = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - start); print(*(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        seconds, loaded = out.split("\n")[:2]
+        times.append(float(seconds))
+    return {"module": module, "import_ms": min(times) * 1e3, "heavy_modules": loaded.split()}
+
+
+def print_import_times(results: list):
+    """
+    Print import-time results in a tabular format.
+    """
+    header = "{:<20} {:>12}  {}"
+    print(header.format("Module", "Import (ms)", "Heavy modules loaded"))
+    print("-" * 60)
+    for r in results:
+        print(header.format(r["module"], f"{r['import_ms']:.1f}", ", ".join(r["heavy_modules"]) or "-"))
+
+
+def environment() -> dict:
+    """
+    Describe the run so results from different commits can be compared.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "backend": backend.get_backend(),
+    }
+
+
+def write_json(path: str, results: list, meta: dict = None):
+    """
+    Write results and run metadata as JSON.
+    """
+    with open(path, "w") as f:
+        json.dump({"meta": meta or environment(), "results": results}, f, indent=2)
+
+
+def write_csv(path: str, results: list):
+    """
+    Write results as CSV, one row per result.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def compare_results(baseline: list, current: list, threshold: float = 0.1) -> list:
+    """
+    Find operations whose throughput dropped by more than `threshold`.
+    
+    Args:
+        baseline: Results of an earlier run.
+        current: Results of this run.
+        threshold: Allowed relative drop in ops/sec (0.1 = 10%).
+    
+    Returns:
+        list: (key, baseline ops/sec, current ops/sec, relative change) per regression.
+    """
+    def key(record):
+        return (record["structure"], record["operation"], record["batched"], record["dataset"],
+                record.get("distribution", "uniform"), record["size"])
+    
+    before = {key(record): record["ops_per_sec"] for record in baseline}
+    regressions = []
+    for record in current:
+        old = before.get(key(record))
+        if old:
+            change = record["ops_per_sec"] / old - 1
+            if change < -threshold:
+                regressions.append((key(record), old, record["ops_per_sec"], change))
+    return regressions
+
+
+def print_summary(results: list):
+    """
+    Print results in a tabular format.
+    """
+    header = "{:<20} {:<8} {:<6} {:>12} {:>10} {:>10} {:>10} {:>10} {:>12}"
+    row = "{:<20} {:<8} {:<6} {:>12,} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.3f} {:>12,.0f}"
+    print(header.format("Data Structure", "Op", "Batch", "Size", "Mean (us)", "p50 (us)", "p99 (us)", "Build (s)", "Ops/s"))
+    print("-" * 108)
+    for r in results:
+        print(row.format(r["structure"], r["operation"], "yes" if r["batched"] else "no", r["size"],
+                         r["mean_us"], r["p50_us"], r["p99_us"], r["build_s"], r["ops_per_sec"]))
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Repeatable benchmark suite for the data structures.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000], help="Dataset sizes.")
+    parser.add_argument("--dataset", choices=DATASET_TYPES, default="random", help="Dataset type for generate_dataset.")
+    parser.add_argument("--ops", type=int, default=10_000, help="Operations per timed repetition.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed warmup repetitions.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions.")
+    parser.add_argument("--structures", nargs="+", choices=list(STRUCTURES), help="Structures to run (default: all).")
+    parser.add_argument("--no-batched", action="store_true", help="Skip the batched APIs.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for data and operations.")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform",
+                        help="Distribution of update indices and query starts.")
+    parser.add_argument("--json", metavar="PATH", help="Write results to a JSON file.")
+    parser.add_argument("--csv", metavar="PATH", help="Write results to a CSV file.")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline JSON to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed throughput drop for --compare.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Report memory and nodes visited for every dataset type instead of timings.")
+    parser.add_argument("--plot", metavar="PATH", help="With --profile, save a plot of the results.")
+    parser.add_argument("--build-scaling", action="store_true",
+                        help="Report parallel build speedup for each thread count and dataset type.")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="With --build-scaling, thread counts (default: powers of 2 up to the CPU count).")
+    parser.add_argument("--import-time", action="store_true",
+                        help="Time module imports in fresh interpreters and list heavy dependencies loaded.")
+    parser.add_argument("--order-stats", action="store_true",
+                        help="Compare Wavelet Matrix counts and medians with sorting each slice.")
+    parser.add_argument("--range-lengths", type=int, nargs="+", default=[100, 10_000],
+                        help="With --order-stats, query range lengths.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.profile:
+        results = run_profile(args.sizes, num_ops=args.ops, structures=args.structures, seed=args.seed)
+        print_profile(results)
+        if args.json:
+            write_json(args.json, results)
+            print(f"Results written to '{args.json}'.")
+        if args.plot:
+            plot_profile(results, args.plot)
+            print(f"Plot saved to '{args.plot}'.")
+        return 0
+    if args.import_time:
+        results = [measure_import_time(module, args.repeat) for module in IMPORT_MODULES]
+        print_import_times(results)
+        if args.json:
+            write_json(args.json, results)
+            print(f"Results written to '{args.json}'.")
+        return 0
+    if args.build_scaling:
+        structures = [name for name in args.structures or PARALLEL_STRUCTURES if name in PARALLEL_STRUCTURES]
+        results = run_build_scaling(args.sizes, args.workers, repeat=args.repeat, structures=structures, seed=args.seed)
+        print_build_scaling(results)
+        if args.json:
+            write_json(args.json, results)
+            print(f"Results written to '{args.json}'.")
+        return 0
+    if args.order_stats:
+        results = run_order_stats(args.sizes, args.range_lengths, args.ops, args.warmup, args.repeat, seed=args.seed)
+        print_order_stats(results)
+        if args.json:
+            write_json(args.json, results)
+            print(f"Results written to '{args.json}'.")
+        return 0
+    backend.warmup()
+    results = run_benchmark(args.sizes, args.dataset, args.ops, args.warmup, args.repeat,
+                            batched=not args.no_batched, structures=args.structures, seed=args.seed,
+                            distribution=args.distribution)
+    print_summary(results)
+    if args.json:
+        write_json(args.json, results)
+        print(f"Results written to '{args.json}'.")
+    if args.csv:
+        write_csv(args.csv, results)
+        print(f"Results written to '{args.csv}'.")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_results(baseline, results, args.threshold)
+        for key, old, new, change in regressions:
+            print(f"REGRESSION {key}: {old:,.0f} -> {new:,.0f} ops/s ({change:+.1%})")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#
+#  external_segment_tree.py
+#  Advanced Data Structure
+#
+#  Disk-backed Segment Tree for series larger than RAM.
+#
+
+import itertools
+import operator
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from src.array_utils import check_fits, lowest_value
+from src.persistence import load_arrays, write_header
+from src.segment_tree import AGGREGATES
+
+class ExternalSegmentTree:
+    def __init__(self, path: str, cache_blocks: int = 1024, block_size: int = 4096, pinned_nodes: int = 1 << 16):
+        """
+        Open a disk-backed Segment Tree written by `ExternalSegmentTree.build`.
+        
+        The tree uses the power-of-two layout with one .npy file per aggregate
+        and level (level 0 is the root, level `height` the leaves). Levels with
+        at most `pinned_nodes` nodes are read into RAM once; the lower levels
+        are memory-mapped and read through an LRU cache of `block_size`-node
+        blocks. Updated blocks are written back when evicted or on `flush()`.
+        
+        RAM use is about `cache_blocks * block_size` nodes plus 2 * `pinned_nodes`
+        nodes per aggregate, independent of n.
+        
+        Args:
+            path (str): Directory holding the tree.
+            cache_blocks (int): Maximum number of blocks kept in the cache.
+            block_size (int): Nodes per cached block.
+            pinned_nodes (int): Levels with at most this many nodes stay in RAM.
+        """
+        if cache_blocks < 1 or block_size < 1:
+            raise ValueError("cache_blocks and block_size must be positive integers")
+        meta, arrays = load_arrays(path, type(self).__name__, writable=True)
+        self.path = path
+        self.n = meta["n"]
+        self.size = meta["size"]  # Number of leaves, a power of 2
+        self.height = meta["height"]  # Level of the leaves
+        self.aggregates = tuple(meta["aggregates"])
+        self.cache_blocks = cache_blocks
+        self.block_size = block_size
+        
+        self._files = {name: [arrays[f"{name}_{d}"] for d in range(self.height + 1)] for name in self.aggregates}
+        # Levels 0 .. pinned_depth - 1 stay in RAM
+        self.pinned_depth = min(self.height + 1, max(0, pinned_nodes).bit_length())
+        self._pinned = {name: [np.array(levels[d]) for d in range(self.pinned_depth)]
+                        for name, levels in self._files.items()}
+        # Aggregate -> (combine, identity)
+        self._ops = {"sum": (operator.add, 0)}
+        if "max" in self.aggregates:
+            self._ops["max"] = (max, lowest_value(self._files["max"][self.height].dtype))
+        
+        self._cache = OrderedDict()  # (aggregate, level, block) -> [nodes, dirty]
+        self.hits = 0  # Cache lookups served from RAM
+        self.misses = 0  # Cache lookups that read from disk
+        self.evictions = 0  # Blocks dropped from the cache
+
+    @classmethod
+    def build(cls, path: str, chunks, n: int, aggregates: tuple = AGGREGATES, chunk_size: int = 1 << 20,
+              progress: bool = False, **kwargs):
+        """
+        Build the tree on disk from a stream of input chunks, then open it.
+        
+        Only one chunk of input and one chunk of each level are in RAM at a time.
+        The sum levels are int64; the max levels keep the input dtype.
+        
+        Args:
+            path (str): Directory to write the tree to (created if missing).
+            chunks: Iterable of 1-D arrays whose concatenation is the input, or one array.
+            n (int): Total number of input values.
+            aggregates (tuple): Aggregates to build: any of "sum" and "max".
+            chunk_size (int): Nodes per step when building the upper levels
+                (and chunk length when `chunks` is a single array).
+            progress (bool): Show a progress bar over the build levels.
+            **kwargs: Passed to the constructor (cache and pinning settings).
+        
+        Returns:
+            ExternalSegmentTree: The opened tree.
+        """
+        unknown = set(aggregates) - set(AGGREGATES)
+        if unknown or not aggregates:
+            raise ValueError(f"aggregates must be a non-empty subset of {AGGREGATES}")
+        if n < 1:
+            raise ValueError("n must be a positive integer")
+        if isinstance(chunks, np.ndarray):
+            data = chunks
+            chunks = (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+        chunks = iter(chunks)
+        first = np.asarray(next(chunks))
+        chunks = itertools.chain([first], chunks)
+        
+        size = 1 << (n - 1).bit_length()  # Round up to a power of 2
+        height = size.bit_length() - 1
+        os.makedirs(path, exist_ok=True)
+        dtypes = {"sum": np.dtype(np.int64), "max": first.dtype}
+        files = {}
+        for name in aggregates:
+            files[name] = [np.lib.format.open_memmap(os.path.join(path, f"{name}_{d}.npy"), mode="w+",
+                                                     dtype=dtypes[name], shape=(1 << d,))
+                           for d in range(height + 1)]
+        
+        # Stream the input into the leaves
+        offset = 0
+        for chunk in chunks:
+            chunk = np.asarray(chunk)
+            if offset + len(chunk) > n:
+                raise ValueError(f"chunks hold more than n={n} values")
+            for name in aggregates:
+                files[name][height][offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        if offset != n:
+            raise ValueError(f"chunks hold {offset} values, expected n={n}")
+        if "max" in aggregates:
+            padding = lowest_value(first.dtype)  # Padding leaves never win a max
+            for start in range(n, size, chunk_size):
+                files["max"][height][start:min(start + chunk_size, size)] = padding
+        
+        # Bottom-up, one chunk of parents at a time
+        levels = range(height - 1, -1, -1)
+        if progress:
+            from tqdm import tqdm
+            levels = tqdm(levels, desc="Building External Segment Tree", leave=False)
+        for d in levels:
+            for name in aggregates:
+                op = np.add if name == "sum" else np.maximum
+                child, parent = files[name][d + 1], files[name][d]
+                for start in range(0, 1 << d, chunk_size):
+                    stop = min(start + chunk_size, 1 << d)
+                    op(child[2*start:2*stop:2], child[2*start+1:2*stop:2], out=parent[start:stop])
+        
+        arrays = {}
+        for name in aggregates:
+            for d, level in enumerate(files[name]):
+                level.flush()
+                arrays[f"{name}_{d}"] = level
+        meta = {"n": n, "size": size, "height": height, "aggregates": list(aggregates)}
+        write_header(path, cls.__name__, meta, arrays)
+        del files, arrays
+        return cls(path, **kwargs)
+
+    def _block(self, name: str, level: int, block: int) -> list:
+        """
+        Return the cache entry [nodes, dirty] for a block, reading it from disk on a miss.
+        """
+        key = (name, level, block)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)  # Mark as most recently used
+            return entry
+        self.misses += 1
+        start = block * self.block_size
+        entry = [np.array(self._files[name][level][start:start + self.block_size]), False]
+        self._cache[key] = entry
+        if len(self._cache) > self.cache_blocks:
+            self._evict()
+        return entry
+
+    def _evict(self):
+        """
+        Drop the least recently used block, writing it back if it was updated.
+        """
+        (name, level, block), (nodes, dirty) = self._cache.popitem(last=False)
+        if dirty:
+            start = block * self.block_size
+            self._files[name][level][start:start + len(nodes)] = nodes
+        self.evictions += 1
+
+    def _get(self, name: str, level: int, i: int):
+        """
+        Read node `i` of a level.
+        """
+        if level < self.pinned_depth:
+            return self._pinned[name][level][i]
+        return self._block(name, level, i // self.block_size)[0][i % self.block_size]
+
+    def _set(self, name: str, level: int, i: int, value):
+        """
+        Write node `i` of a level.
+        """
+        if level < self.pinned_depth:
+            self._pinned[name][level][i] = value
+            return
+        entry = self._block(name, level, i // self.block_size)
+        entry[0][i % self.block_size] = value
+        entry[1] = True  # Write back on eviction or flush
+
+    def _require(self, name: str):
+        """
+        Raise if the aggregate was not built.
+        """
+        if name not in self.aggregates:
+            raise ValueError(f"External Segment Tree was built without the '{name}' aggregate")
+
+    def _query(self, name: str, l: int, r: int):
+        """
+        Combine the nodes covering [l, r], walking from the leaf level up.
+        """
+        self._require(name)
+        op, res = self._ops[name]
+        level = self.height
+        while l <= r:
+            if l % 2 == 1:
+                res = op(res, self._get(name, level, l))  # Combine left child
+                l += 1
+            if r % 2 == 0:
+                res = op(res, self._get(name, level, r))  # Combine right child
+                r -= 1
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+            level -= 1
+        return res
+
+    def query_sum(self, l: int, r: int) -> int:
+        """
+        Compute the sum of values in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Sum of values in the range.
+        """
+        return self._query("sum", l, r)
+
+    def query_max(self, l: int, r: int) -> int:
+        """
+        Compute the maximum value in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Maximum value in the range.
+        """
+        return self._query("max", l, r)
+
+    def update(self, index: int, value: int):
+        """
+        Update the value at the specified index.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+        """
+        for name in self.aggregates:  # Check every dtype first so a rejected value changes nothing
+            check_fits(np.asarray([value]), self._files[name][self.height].dtype, f"{name} tree")
+        for name in self.aggregates:
+            op = self._ops[name][0]
+            i = index
+            self._set(name, self.height, i, value)  # Update leaf
+            for level in range(self.height - 1, -1, -1):
+                i >>= 1  # Move to parent
+                self._set(name, level, i, op(self._get(name, level + 1, 2*i), self._get(name, level + 1, 2*i+1)))
+
+    def cache_stats(self) -> dict:
+        """
+        Hit / miss counters of the block cache, for tuning `cache_blocks`.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cached_blocks": len(self._cache),
+            "pinned_levels": self.pinned_depth,
+        }
+
+    def reset_stats(self):
+        """
+        Reset the cache counters (the cached blocks are kept).
+        """
+        self.hits = self.misses = self.evictions = 0
+
+    def flush(self):
+        """
+        Write updated cached blocks and pinned levels back to disk.
+        """
+        for (name, level, block), entry in self._cache.items():
+            if entry[1]:
+                start = block * self.block_size
+                self._files[name][level][start:start + len(entry[0])] = entry[0]
+                entry[1] = False
+        for name, levels in self._pinned.items():
+            for level, nodes in enumerate(levels):
+                self._files[name][level][:] = nodes
+        for levels in self._files.values():
+            for level in levels:
+                level.flush()
+
+    def close(self):
+        """
+        Flush pending writes and release the memory maps.
+        """
+        self.flush()
+        self._cache.clear()
+        self._files = self._pinned = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -6,25 +6,75 @@
 #
 
 import numpy as np
-from tqdm import tqdm
 
-class FenwickTree:
-    def __init__(self, data: np.ndarray):
+from src import backend
+from src.array_utils import check_fits, dedupe_updates
+from src.persistence import SnapshotMixin
+from src.profiling import ProfiledMixin
+
+
+def _prefix_nodes(idx: int) -> int:
+    """
+    Number of nodes a prefix walk up to `idx` (0-based) reads.
+    """
+    return bin(idx + 1).count("1") if idx >= 0 else 0
+
+
+def _add_nodes(index: int, n: int) -> int:
+    """
+    Number of nodes an add at `index` (0-based) writes.
+    """
+    nodes = 0
+    i = index + 1
+    while i <= n:
+        nodes += 1
+        i += i & -i
+    return nodes
+
+
+class FenwickTree(SnapshotMixin, ProfiledMixin):
+    _meta_fields = ("n",)
+    _array_fields = ("tree", "values")
+
+    def __init__(self, data: np.ndarray, progress: bool = False, profiler=None):
         """
         Initialize the Fenwick Tree (Binary Indexed Tree) with the given data.
         
+        A copy of the raw values is kept next to the tree, in the input dtype,
+        so point reads and the delta of an update take O(1) instead of two
+        prefix walks. Updates must fit that dtype.
+        
         Args:
             data (np.ndarray): Input array to build the Fenwick Tree.
+            progress (bool): Show a progress bar over the build levels.
+            profiler (Profiler): Optional profiler for build timings and node counts.
         """
+        self.profiler = profiler
         self.n = len(data)
         self.tree = np.zeros(self.n + 1, dtype=np.int64)  # 1-based indexing
+        self.values = np.array(data)  # Raw values in the input dtype, 0-based
         
-        # O(n) initialization
-        self.tree[1:] = data  # Copy data into the tree (1-based indexing)
-        for i in tqdm(range(1, self.n + 1), desc="Initializing Fenwick Tree", leave=False):
-            parent = i + (i & -i)  # Calculate parent index using LSB
-            if parent <= self.n:
-                self.tree[parent] += self.tree[i]  # Propagate value to parent
+        # O(n) initialization: tree[i] = prefix[i] - prefix[i - lsb(i)]
+        with self._phase("prefix"):
+            prefix = np.zeros(self.n + 1, dtype=np.int64)
+            np.cumsum(data, dtype=np.int64, out=prefix[1:])
+        levels = range(self.n.bit_length())
+        if progress:
+            from tqdm import tqdm
+            levels = tqdm(levels, desc="Initializing Fenwick Tree", leave=False)
+        with self._phase("levels"):
+            for j in levels:
+                # Indices whose LSB is 2^j: step, 3 * step, 5 * step, ...
+                step = 1 << j
+                count = len(range(step, self.n + 1, 2 * step))
+                self.tree[step::2 * step] = prefix[step::2 * step] - prefix[0::2 * step][:count]
+
+    def _check_index(self, index: int, lowest: int = 0):
+        """
+        Raise if `index` is outside [lowest, n); the compiled kernels do not check bounds.
+        """
+        if not lowest <= index < self.n:
+            raise IndexError(f"Index {index} is outside [{lowest}, {self.n - 1}]")
 
     def update(self, index: int, new_val: int):
         """
@@ -34,12 +84,126 @@ class FenwickTree:
             index (int): Index to update (0-based).
             new_val (int): New value to set at the index.
         """
-        delta = new_val - (self.query_prefix(index) - self.query_prefix(index - 1))  # Calculate delta
+        self._check_index(index)
+        if self.profiler is not None:
+            self.profiler.count("update", _add_nodes(index, self.n))
+        delta = new_val - int(self.values[index])  # Calculate delta from the stored value
+        self.values[index] = new_val
+        self._add(index, delta)
+
+    def add(self, index: int, delta: int):
+        """
+        Add `delta` to the value at the specified index in the Fenwick Tree.
+        
+        Args:
+            index (int): Index to update (0-based).
+            delta (int): Amount to add to the value at the index.
+        """
+        self._check_index(index)
+        if self.profiler is not None:
+            self.profiler.count("add", _add_nodes(index, self.n))
+        self.values[index] = int(self.values[index]) + delta  # Raises if the result does not fit
+        self._add(index, delta)
+
+    def _add(self, index: int, delta: int):
+        """
+        Walk from `index` towards the root, adding `delta` to each node.
+        """
+        if backend.kernels is not None:
+            return backend.kernels.fenwick_add(self.tree, self.n, index, delta)
         i = index + 1  # Convert to 1-based index
         while i <= self.n:
             self.tree[i] += delta  # Update current node
             i += i & -i  # Move to next node using LSB
 
+    def update_many(self, indices: np.ndarray, values: np.ndarray):
+        """
+        Update a batch of values in the Fenwick Tree.
+        
+        Duplicate indices are collapsed (last write wins). Deltas that reach the
+        same node are summed before being applied, one level at a time.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+        """
+        indices, values = dedupe_updates(indices, values)
+        check_fits(values, self.values.dtype, "values")
+        delta = values.astype(np.int64) - self.values[indices]  # Calculate deltas from the stored values
+        self.values[indices] = values
+        i = indices + 1  # Convert to 1-based index
+        while len(i):
+            i, inverse = np.unique(i, return_inverse=True)  # Merge walks that met at the same node
+            merged = np.zeros(len(i), dtype=np.int64)
+            np.add.at(merged, inverse, delta)
+            self.tree[i] += merged  # Update current nodes
+            i = i + (i & -i)  # Move to next node using LSB
+            keep = i <= self.n
+            i, delta = i[keep], merged[keep]
+
+    def query_point(self, index: int) -> int:
+        """
+        Return the value at the specified index in O(1).
+        
+        Args:
+            index (int): Index to read (0-based).
+        
+        Returns:
+            int: Value at the index.
+        """
+        return int(self.values[index])
+
+    def find_prefix(self, target: int) -> int:
+        """
+        Find the first index whose prefix sum exceeds `target`.
+        
+        Uses binary lifting over the tree in O(log n), so it requires
+        non-negative values (non-decreasing prefix sums).
+        
+        Args:
+            target (int): Prefix sum to exceed.
+        
+        Returns:
+            int: Smallest index i (0-based) with query_prefix(i) > target, or n if there is none.
+        """
+        if self.profiler is not None:
+            self.profiler.count("find_prefix", self.n.bit_length())
+        if backend.kernels is not None:
+            return backend.kernels.fenwick_find(self.tree, self.n, target)
+        pos = 0  # Number of leading values whose sum is <= target
+        step = 1 << (self.n.bit_length() - 1) if self.n else 0  # Largest power of 2 <= n
+        while step:
+            if pos + step <= self.n and self.tree[pos + step] <= target:
+                pos += step  # Skip the whole node
+                target -= self.tree[pos]
+            step >>= 1
+        return pos
+
+    def find_prefix_many(self, targets: np.ndarray) -> np.ndarray:
+        """
+        Find the first index whose prefix sum exceeds each target.
+        
+        All targets descend the tree together, one vectorized step per level.
+        
+        Args:
+            targets (np.ndarray): Prefix sums to exceed.
+        
+        Returns:
+            np.ndarray: Smallest index (0-based) per target, or n where there is none.
+        """
+        rem = np.array(targets, dtype=np.int64)
+        pos = np.zeros(len(rem), dtype=np.int64)
+        step = 1 << (self.n.bit_length() - 1) if self.n else 0  # Largest power of 2 <= n
+        while step:
+            cand = pos + step
+            valid = cand <= self.n
+            node = self.tree[np.where(valid, cand, 0)]
+            take = valid & (node <= rem)
+            pos[take] = cand[take]  # Skip the whole node
+            rem[take] -= node[take]
+            step >>= 1
+        return pos
+
     def query_prefix(self, idx: int) -> int:
         """
         Compute the prefix sum up to the specified index.
@@ -50,6 +214,17 @@ class FenwickTree:
         Returns:
             int: Prefix sum up to the index.
         """
+        self._check_index(idx, lowest=-1)  # -1 is the empty prefix
+        if self.profiler is not None:
+            self.profiler.count("query_prefix", _prefix_nodes(idx))
+        return self._prefix(idx)
+
+    def _prefix(self, idx: int) -> int:
+        """
+        Walk from `idx` towards index 0, summing the nodes on the way.
+        """
+        if backend.kernels is not None:
+            return backend.kernels.fenwick_prefix(self.tree, idx)
         res = 0
         i = idx + 1  # Convert to 1-based index
         while i > 0:
@@ -68,4 +243,220 @@ class FenwickTree:
         Returns:
             int: Sum of values in the range.
         """
-        return self.query_prefix(r) - self.query_prefix(l - 1)  # Use prefix sums to compute range sum
+        if not 0 <= l <= r < self.n:
+            raise IndexError(f"Range [{l}, {r}] is outside [0, {self.n - 1}]")
+        if self.profiler is not None:
+            self.profiler.count("query_sum", _prefix_nodes(r) + _prefix_nodes(l - 1))
+        return self._prefix(r) - self._prefix(l - 1)  # Use prefix sums to compute range sum
+
+    def query_prefix_many(self, idxs: np.ndarray) -> np.ndarray:
+        """
+        Compute prefix sums for a batch of indices at once.
+        
+        All indices walk down the tree together, one vectorized gather per level.
+        
+        Args:
+            idxs (np.ndarray): Indices to compute prefix sums (0-based).
+        
+        Returns:
+            np.ndarray: Prefix sum up to each index.
+        """
+        i = np.asarray(idxs, dtype=np.int64) + 1  # Convert to 1-based index
+        res = np.zeros(len(i), dtype=np.int64)
+        while i.any():
+            res += self.tree[i]  # tree[0] is always 0, so finished walks add nothing
+            i -= i & -i  # Move to parent node using LSB
+        return res
+
+    def query_sum_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the sums of values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Sum of values in each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        return self.query_prefix_many(rs) - self.query_prefix_many(ls - 1)
+
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """
+        Load a Fenwick Tree from a snapshot directory without rebuilding it.
+        
+        Snapshots written before raw values were stored get them recomputed
+        from the tree.
+        
+        Args:
+            path (str): Snapshot directory.
+            mmap (bool): Memory-map the arrays instead of reading them into RAM.
+        
+        Returns:
+            FenwickTree: The restored tree.
+        """
+        obj = super().load(path, mmap=mmap)
+        if obj.values is None:
+            idxs = np.arange(obj.n)
+            obj.values = obj.query_sum_many(idxs, idxs)
+        return obj
+
+
+class RangeFenwickTree:
+    def __init__(self, data: np.ndarray, progress: bool = False):
+        """
+        Initialize a Fenwick Tree supporting range add and range sum queries.
+        
+        Two Fenwick Trees are kept over the difference array d of the data:
+        B1 stores d[p] and B2 stores p * d[p] (1-based p), so that
+        prefix(p) = (p + 1) * B1.prefix(p) - B2.prefix(p).
+        
+        Args:
+            data (np.ndarray): Input array to build the Fenwick Trees.
+            progress (bool): Show a progress bar over the build levels.
+        """
+        self.n = len(data)
+        diff = np.diff(np.asarray(data, dtype=np.int64), prepend=0)  # Difference array
+        self.b1 = FenwickTree(diff, progress=progress)
+        self.b2 = FenwickTree(diff * np.arange(1, self.n + 1, dtype=np.int64), progress=progress)
+
+    def range_add(self, l: int, r: int, delta: int):
+        """
+        Add `delta` to every value in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            delta (int): Amount to add to each value in the range.
+        """
+        self.b1.add(l, delta)
+        self.b2.add(l, delta * (l + 1))
+        if r + 1 < self.n:
+            self.b1.add(r + 1, -delta)
+            self.b2.add(r + 1, -delta * (r + 2))
+
+    def update(self, index: int, new_val: int):
+        """
+        Update the value at the specified index.
+        
+        Args:
+            index (int): Index to update (0-based).
+            new_val (int): New value to set at the index.
+        """
+        self.range_add(index, index, new_val - self.query_sum(index, index))
+
+    def query_point(self, index: int) -> int:
+        """
+        Return the value at the specified index in O(log n).
+        
+        The value is the prefix sum of the difference array, i.e. B1.prefix.
+        
+        Args:
+            index (int): Index to read (0-based).
+        
+        Returns:
+            int: Value at the index.
+        """
+        return self.b1.query_prefix(index)
+
+    def find_prefix(self, target: int) -> int:
+        """
+        Find the first index whose prefix sum exceeds `target`.
+        
+        Binary lifting descends B1 and B2 together, accumulating both prefix
+        sums, and takes a node while (p + 1) * B1.prefix(p) - B2.prefix(p)
+        stays <= target. Requires non-negative values (non-decreasing prefix sums).
+        
+        Args:
+            target (int): Prefix sum to exceed.
+        
+        Returns:
+            int: Smallest index i (0-based) with query_prefix(i) > target, or n if there is none.
+        """
+        tree1, tree2 = self.b1.tree, self.b2.tree
+        pos = 0  # Number of leading values whose sum is <= target
+        s1 = s2 = 0  # B1 and B2 prefix sums up to pos
+        step = 1 << (self.n.bit_length() - 1) if self.n else 0  # Largest power of 2 <= n
+        while step:
+            cand = pos + step
+            if cand <= self.n:
+                t1, t2 = s1 + int(tree1[cand]), s2 + int(tree2[cand])
+                if (cand + 1) * t1 - t2 <= target:
+                    pos, s1, s2 = cand, t1, t2  # Skip the whole node
+            step >>= 1
+        return pos
+
+    def find_prefix_many(self, targets: np.ndarray) -> np.ndarray:
+        """
+        Find the first index whose prefix sum exceeds each target.
+        
+        All targets descend both trees together, one vectorized step per level.
+        
+        Args:
+            targets (np.ndarray): Prefix sums to exceed.
+        
+        Returns:
+            np.ndarray: Smallest index (0-based) per target, or n where there is none.
+        """
+        targets = np.asarray(targets, dtype=np.int64)
+        pos = np.zeros(len(targets), dtype=np.int64)
+        s1 = np.zeros(len(targets), dtype=np.int64)
+        s2 = np.zeros(len(targets), dtype=np.int64)
+        step = 1 << (self.n.bit_length() - 1) if self.n else 0  # Largest power of 2 <= n
+        while step:
+            cand = pos + step
+            valid = cand <= self.n
+            node = np.where(valid, cand, 0)
+            t1 = s1 + self.b1.tree[node]
+            t2 = s2 + self.b2.tree[node]
+            take = valid & ((cand + 1) * t1 - t2 <= targets)
+            pos[take] = cand[take]  # Skip the whole node
+            s1[take] = t1[take]
+            s2[take] = t2[take]
+            step >>= 1
+        return pos
+
+    def query_prefix(self, idx: int) -> int:
+        """
+        Compute the prefix sum up to the specified index.
+        
+        Args:
+            idx (int): Index to compute prefix sum (0-based).
+        
+        Returns:
+            int: Prefix sum up to the index.
+        """
+        return (idx + 2) * self.b1.query_prefix(idx) - self.b2.query_prefix(idx)
+
+    def query_sum(self, l: int, r: int) -> int:
+        """
+        Compute the sum of values in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Sum of values in the range.
+        """
+        return self.query_prefix(r) - self.query_prefix(l - 1)
+
+    def query_sum_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the sums of values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Sum of values in each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64) - 1
+        rs = np.asarray(rs, dtype=np.int64)
+        right = (rs + 2) * self.b1.query_prefix_many(rs) - self.b2.query_prefix_many(rs)
+        left = (ls + 2) * self.b1.query_prefix_many(ls) - self.b2.query_prefix_many(ls)
+        return right - left
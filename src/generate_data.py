@@ -8,6 +8,8 @@
 
 import numpy as np
 
+DATASET_TYPES = ("random", "sparse_peaks", "increasing", "decreasing", "all_equal")
+
 def generate_dataset(n: int, dataset_type: str = "random", max_val: int = 1000) -> np.ndarray:
     """
     Generate a dataset of size `n` with values up to `max_val`.
@@ -41,12 +43,68 @@ def generate_dataset(n: int, dataset_type: str = "random", max_val: int = 1000)
     else:
         raise ValueError(f"Unknown dataset type: {dataset_type}")
 
-def generate_operations(n: int, num_ops: int = 1000, 
-                       query_ratio: float = 0.7, 
-                       max_query_range: int = 100,
-                       query_type: str = "sum") -> list:
+# Operation codes of the `op` field in operation arrays
+OP_UPDATE = 0
+OP_QUERY_SUM = 1
+OP_QUERY_MAX = 2
+OP_NAMES = ("update", "query_sum", "query_max")
+
+# One operation per record: queries use (a, b) = (l, r), updates use (a, b) = (index, value)
+OPERATION_DTYPE = np.dtype([("op", np.int8), ("a", np.int64), ("b", np.int64)])
+
+DISTRIBUTIONS = ("uniform", "zipf", "hotspot")
+
+
+def _sample_indices(rng: np.random.Generator, n: int, size: int, distribution: str,
+                    zipf_a: float, hot_fraction: float, hot_prob: float) -> np.ndarray:
     """
-    Generate a workload of operations (updates or queries).
+    Draw `size` indices in [0, n) from the given distribution.
+    
+    "zipf" makes index i the (i + 1)-th most popular, so low indices are hot.
+    "hotspot" sends `hot_prob` of the draws to the first `hot_fraction` of
+    the indices and the rest uniformly over [0, n).
+    """
+    if distribution == "uniform":
+        return rng.integers(0, n, size=size)
+    if distribution == "zipf":
+        return (rng.zipf(zipf_a, size=size) - 1) % n
+    if distribution == "hotspot":
+        hot_n = max(1, int(n * hot_fraction))
+        hot = rng.random(size) < hot_prob
+        return np.where(hot, rng.integers(0, hot_n, size=size), rng.integers(0, n, size=size))
+    raise ValueError(f"distribution must be one of {DISTRIBUTIONS}")
+
+
+def _fill_operations(rng: np.random.Generator, n: int, count: int, query_ratio: float,
+                     max_query_range: int, query_type: str, distribution: str, max_val: int,
+                     zipf_a: float, hot_fraction: float, hot_prob: float) -> np.ndarray:
+    """
+    Generate `count` interleaved operations as an OPERATION_DTYPE array.
+    """
+    ops = np.empty(count, dtype=OPERATION_DTYPE)
+    is_query = rng.random(count) < query_ratio  # Each operation independently, in order
+    ops["op"] = np.where(is_query, OP_QUERY_SUM if query_type == "sum" else OP_QUERY_MAX, OP_UPDATE)
+    
+    start = _sample_indices(rng, n, count, distribution, zipf_a, hot_fraction, hot_prob)
+    lengths = rng.integers(1, max(2, max_query_range), size=count)
+    values = rng.integers(0, max_val, size=count)
+    ops["a"] = start
+    ops["b"] = np.where(is_query, np.minimum(start + lengths, n - 1), values)
+    return ops
+
+
+def generate_operation_array(n: int, num_ops: int = 1000, query_ratio: float = 0.7,
+                             max_query_range: int = 100, query_type: str = "sum",
+                             distribution: str = "uniform", seed=None, max_val: int = 1000,
+                             zipf_a: float = 1.2, hot_fraction: float = 0.01,
+                             hot_prob: float = 0.9) -> np.ndarray:
+    """
+    Generate a workload of interleaved operations as a structured NumPy array.
+    
+    Each record has fields `op` (OP_UPDATE, OP_QUERY_SUM or OP_QUERY_MAX), `a`
+    and `b`: (l, r) for queries, (index, value) for updates. Whether an
+    operation is a query is drawn independently per position, so a mixed
+    `query_ratio` interleaves queries and updates.
     
     Args:
         n: Size of the dataset (for valid indices).
@@ -54,54 +112,77 @@ def generate_operations(n: int, num_ops: int = 1000,
         query_ratio: Fraction of operations that are queries (vs updates).
         max_query_range: Maximum range size for queries.
         query_type: Type of query to generate ("sum" or "max").
+        distribution: Distribution of update indices and query starts: "uniform",
+            "zipf" (low indices hot) or "hotspot".
+        seed: Seed (or np.random.Generator) for reproducible workloads.
+        max_val: Update values are drawn from [0, max_val).
+        zipf_a: Exponent of the "zipf" distribution (> 1).
+        hot_fraction: Fraction of indices in the "hotspot" region.
+        hot_prob: Probability that a "hotspot" draw lands in the hot region.
     
     Returns:
-        List of operations formatted as dictionaries.
-        Example: {"type": "query_sum", "l": 5, "r": 10}
+        np.ndarray: Operations with dtype OPERATION_DTYPE.
     """
     if query_type not in ["sum", "max"]:
         raise ValueError("query_type must be 'sum' or 'max'")
+    rng = np.random.default_rng(seed)
+    return _fill_operations(rng, n, num_ops, query_ratio, max_query_range, query_type, distribution,
+                            max_val, zipf_a, hot_fraction, hot_prob)
+
+
+def iter_operation_chunks(n: int, num_ops: int, chunk_size: int = 1 << 20, seed=None, **kwargs):
+    """
+    Yield a workload as OPERATION_DTYPE arrays of at most `chunk_size` operations.
     
-    # Generate operation types
-    if query_ratio == 1.0:
-        # Generate only queries
-        op_types = np.full(num_ops, "query")
-    elif query_ratio == 0.0:
-        # Generate only updates
-        op_types = np.full(num_ops, "update")
-    else:
-        # Generate a mix of queries and updates
-        op_types = np.random.choice(["query", "update"], size=num_ops, p=[query_ratio, 1 - query_ratio])
+    Takes the same keyword arguments as `generate_operation_array`, so workloads
+    too large to hold at once can be streamed. The chunks are reproducible for
+    a given seed and chunk size.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, num_ops, chunk_size):
+        yield generate_operation_array(n, min(chunk_size, num_ops - start), seed=rng, **kwargs)
+
+
+def as_operation_array(operations) -> np.ndarray:
+    """
+    Convert a list of operation dicts (from `generate_operations`) to OPERATION_DTYPE.
     
-    # Initialize lists to store operations
-    ops = []
+    Arrays that already have OPERATION_DTYPE are returned unchanged.
+    """
+    if isinstance(operations, np.ndarray):
+        return operations
+    ops = np.empty(len(operations), dtype=OPERATION_DTYPE)
+    for i, op in enumerate(operations):
+        if op["type"] == "update":
+            ops[i] = (OP_UPDATE, op["index"], op["value"])
+        else:
+            ops[i] = (OP_NAMES.index(op["type"]), op["l"], op["r"])
+    return ops
+
+
+def generate_operations(n: int, num_ops: int = 1000, 
+                       query_ratio: float = 0.7, 
+                       max_query_range: int = 100,
+                       query_type: str = "sum") -> list:
+    """
+    Generate a workload of operations (updates or queries).
     
-    # Generate queries
-    query_mask = op_types == "query"
-    num_queries = np.sum(query_mask)
-    if num_queries > 0:
-        query_l = np.random.randint(0, n, size=num_queries)
-        query_r = np.minimum(query_l + np.random.randint(1, max_query_range, size=num_queries), n-1)
-        
-        for i in range(num_queries):
-            ops.append({
-                "type": f"query_{query_type}",  # Only generate the specified query type
-                "l": int(query_l[i]),
-                "r": int(query_r[i])
-            })
+    This is a list-of-dicts view of `generate_operation_array`, seeded from
+    the global NumPy random state; prefer the array for large workloads.
     
-    # Generate updates
-    update_mask = op_types == "update"
-    num_updates = np.sum(update_mask)
-    if num_updates > 0:
-        update_indices = np.random.randint(0, n, size=num_updates)
-        update_values = np.random.randint(0, 1000, size=num_updates)
-        
-        for i in range(num_updates):
-            ops.append({
-                "type": "update",
-                "index": int(update_indices[i]),
-                "value": int(update_values[i])
-            })
+    Args:
+        n: Size of the dataset (for valid indices).
+        num_ops: Total number of operations to generate.
+        query_ratio: Fraction of operations that are queries (vs updates).
+        max_query_range: Maximum range size for queries.
+        query_type: Type of query to generate ("sum" or "max").
     
-    return ops
\ No newline at end of file
+    Returns:
+        List of operations formatted as dictionaries, in execution order.
+        Example: {"type": "query_sum", "l": 5, "r": 10}
+    """
+    ops = generate_operation_array(n, num_ops, query_ratio, max_query_range, query_type,
+                                   seed=np.random.randint(2**31))
+    return [{"type": "update", "index": a, "value": b} if op == OP_UPDATE
+            else {"type": OP_NAMES[op], "l": a, "r": b}
+            for op, a, b in zip(ops["op"].tolist(), ops["a"].tolist(), ops["b"].tolist())]
@@ -7,57 +7,102 @@
 
 
 import time
-import argparse
 import numpy as np
-from tqdm import tqdm
+
+from src.generate_data import OP_UPDATE, as_operation_array, generate_operation_array
 
 
 def parse_args():
     """
     Parse command-line arguments.
     """
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Benchmark data structures.")
     parser.add_argument(
         "--full",
         action="store_true",
         help="Run the full benchmark with multiple rounds and generate plots."
     )
+    parser.add_argument(
+        "--mixed",
+        type=float,
+        nargs="+",
+        metavar="RATIO",
+        help="Also run interleaved read/write workloads for each query ratio."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        metavar="N",
+        help="Also measure shared-memory query throughput for each worker count."
+    )
     return parser.parse_args()
 
 
-def benchmark_updates(data_structure, operations):
+def _operation_columns(operations, updates: bool):
+    """
+    Return the (a, b) columns of the updates, or of the queries, in a workload.
+    
+    `operations` is an operation array or a list of operation dicts.
+    """
+    ops = as_operation_array(operations)
+    ops = ops[(ops["op"] == OP_UPDATE) == updates]
+    return ops["a"], ops["b"]
+
+
+def benchmark_updates(data_structure, operations, progress=False):
     """
     Benchmark update operations for a data structure.
+    
+    The updates are taken from `operations` (an operation array or list of
+    dicts) and unpacked before timing starts, so only the update calls are
+    timed. A progress bar (`progress=True`) adds per-operation overhead.
     Returns: total_time
     """
-    start_time = time.perf_counter()
-    
-    # Progress bar for updates
-    with tqdm(total=len(operations), desc="Performing updates", leave=False) as pbar:
-        for op in operations:
-            data_structure.update(op["index"], op["value"])
-            pbar.update(1)
+    indices, values = _operation_columns(operations, updates=True)
+    args = list(zip(indices.tolist(), values.tolist()))
+    if progress:
+        from tqdm import tqdm
+        args = tqdm(args, desc="Performing updates", leave=False)
+    update = data_structure.update
     
+    start_time = time.perf_counter()
+    for index, value in args:
+        update(index, value)
     total_time = time.perf_counter() - start_time
     return total_time
 
 
-def benchmark_queries(data_structure, operations, query_type):
+def benchmark_queries(data_structure, operations, query_type, batched=False, progress=False):
     """
     Benchmark query operations for a data structure.
+    
+    The queries are taken from `operations` (an operation array or list of
+    dicts). In batched mode all ranges are answered by a single call to
+    `query_sum_many` / `query_max_many` instead of one call per query.
+    The ranges are unpacked before timing starts. A progress bar
+    (`progress=True`) adds per-operation overhead.
     Returns: total_time
     """
-    start_time = time.perf_counter()
+    ls, rs = _operation_columns(operations, updates=False)
+    if batched:
+        # The ranges are already collected, so only the batched call is timed
+        query = data_structure.query_sum_many if query_type == "sum" else data_structure.query_max_many
+        start_time = time.perf_counter()
+        query(ls, rs)
+        return time.perf_counter() - start_time
     
-    # Progress bar for queries
-    with tqdm(total=len(operations), desc=f"Performing {query_type} queries", leave=False) as pbar:
-        for op in operations:
-            if query_type == "sum":
-                data_structure.query_sum(op["l"], op["r"])
-            elif query_type == "max":
-                data_structure.query_max(op["l"], op["r"])
-            pbar.update(1)
+    args = list(zip(ls.tolist(), rs.tolist()))
+    if progress:
+        from tqdm import tqdm
+        args = tqdm(args, desc=f"Performing {query_type} queries", leave=False)
+    query = data_structure.query_sum if query_type == "sum" else data_structure.query_max
     
+    start_time = time.perf_counter()
+    for l, r in args:
+        query(l, r)
     total_time = time.perf_counter() - start_time
     return total_time
 
@@ -68,20 +113,90 @@ def print_results(update_results, query_results, dataset_size):
     """
     print("\nCurrent Benchmark Results:")
     print(f"Dataset Size: {dataset_size:,}")
-    print("-" * 60)
-    print("{:<20} {:<20} {:<20}".format("Data Structure", "Update Time (s)", "Query Time (s)"))
-    print("-" * 60)
+    print("-" * 72)
+    print("{:<32} {:<20} {:<20}".format("Data Structure", "Update Time (s)", "Query Time (s)"))
+    print("-" * 72)
     
     # Print update results
     for name, data in update_results.items():
         if data["sizes"] and data["sizes"][-1] == dataset_size:
             update_time = data["times"][-1]
-            print("{:<20} {:<20.4f} {:<20}".format(name, update_time, "N/A"))
+            print("{:<32} {:<20.4f} {:<20}".format(name, update_time, "N/A"))
     
     # Print query results
     for name, data in query_results.items():
         if data["sizes"] and data["sizes"][-1] == dataset_size:
             query_time = data["times"][-1]
-            print("{:<20} {:<20} {:<20.4f}".format(name, "N/A", query_time))
+            print("{:<32} {:<20} {:<20.4f}".format(name, "N/A", query_time))
     
-    print("-" * 60)
\ No newline at end of file
+    print("-" * 72)
+
+
+def benchmark_worker_scaling(data_structure, ls, rs, query_type, worker_counts):
+    """
+    Benchmark batched queries served by a SharedQueryPool for each worker count.
+    Returns: dict mapping worker count to queries per second
+    """
+    from src.shared_pool import SharedQueryPool
+    
+    results = {}
+    for workers in worker_counts:
+        with SharedQueryPool(data_structure, workers=workers) as pool:
+            query = pool.query_sum_many if query_type == "sum" else pool.query_max_many
+            query(ls[:workers], rs[:workers])  # Warm up so every worker has attached
+            start_time = time.perf_counter()
+            query(ls, rs)
+            results[workers] = len(ls) / (time.perf_counter() - start_time)
+    return results
+
+
+def print_scaling_results(scaling_results):
+    """
+    Print shared-memory query throughput per worker count in a tabular format.
+    """
+    print("\nShared-Memory Query Scaling:")
+    print("-" * 72)
+    print("{:<32} {:<10} {:<16} {:<12}".format("Data Structure", "Workers", "Queries/s", "Speedup"))
+    print("-" * 72)
+    for name, results in scaling_results.items():
+        baseline = results[min(results)]
+        for workers, throughput in results.items():
+            print("{:<32} {:<10} {:<16,.0f} {:<12.2f}".format(name, workers, throughput, throughput / baseline))
+    print("-" * 72)
+
+
+def benchmark_mixed_workload(make_structure, n, query_ratios, num_ops, query_type="sum", max_pending=4096, seed=0):
+    """
+    Run an interleaved operation stream through a MixedWorkloadExecutor for each query ratio.
+    
+    Each ratio starts from a freshly built structure (`make_structure()`).
+    Returns: dict mapping query ratio to the `summarize_run` summary
+    """
+    from src.workload import MixedWorkloadExecutor, summarize_run
+    
+    results = {}
+    for ratio in query_ratios:
+        operations = generate_operation_array(n, num_ops, query_ratio=ratio, query_type=query_type, seed=seed)
+        executor = MixedWorkloadExecutor(make_structure(), max_pending=max_pending)
+        results[ratio] = summarize_run(operations, executor.run(operations))
+    return results
+
+
+def print_mixed_results(mixed_results):
+    """
+    Print mixed-workload throughput and latency per query ratio in a tabular format.
+    """
+    print("\nMixed Read/Write Workloads:")
+    print("-" * 96)
+    print("{:<32} {:<8} {:<14} {:<10} {:<14} {:<14}".format(
+        "Data Structure", "Ratio", "Ops/s", "Flushes", "Query p99 (us)", "Update p99 (us)"))
+    print("-" * 96)
+    for name, results in mixed_results.items():
+        for ratio, summary in results.items():
+            query_p99 = next((v for k, v in summary.items() if k.startswith("query") and k.endswith("p99_us")), None)
+            update_p99 = summary.get("update_p99_us")
+            print("{:<32} {:<8.2f} {:<14,.0f} {:<10} {:<14} {:<14}".format(
+                name, ratio, summary["ops_per_sec"], summary["flushes"],
+                "N/A" if query_p99 is None else f"{query_p99:.2f}",
+                "N/A" if update_p99 is None else f"{update_p99:.2f}"))
+    print("-" * 96)
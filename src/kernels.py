@@ -0,0 +1,108 @@
+#
+#  kernels.py
+#  Advanced Data Structure
+#
+#  Tree walk loops written for JIT compilation (see backend.py).
+#
+#  The functions only use plain loops over NumPy arrays and do not call each
+#  other, so that Numba can compile each of them to native code on its own. They mirror the pure-Python methods of
+#  FenwickTree and SegmentTree, which remain the fallback.
+#
+
+
+def fenwick_prefix(tree, idx):
+    """
+    Prefix sum up to `idx` (0-based) of a 1-based Fenwick tree.
+    """
+    res = 0
+    i = idx + 1  # Convert to 1-based index
+    while i > 0:
+        res += tree[i]  # Add current node value
+        i -= i & -i  # Move to parent node using LSB
+    return res
+
+
+def fenwick_add(tree, n, index, delta):
+    """
+    Add `delta` at `index` (0-based) of a 1-based Fenwick tree.
+    """
+    i = index + 1  # Convert to 1-based index
+    while i <= n:
+        tree[i] += delta  # Update current node
+        i += i & -i  # Move to next node using LSB
+
+
+def fenwick_find(tree, n, target):
+    """
+    Number of leading values of a 1-based Fenwick tree whose sum is <= `target`.
+    """
+    pos = 0
+    step = 1
+    while step * 2 <= n:
+        step *= 2  # Largest power of 2 <= n
+    while step > 0 and n > 0:
+        if pos + step <= n and tree[pos + step] <= target:
+            pos += step  # Skip the whole node
+            target -= tree[pos]
+        step >>= 1
+    return pos
+
+
+def segment_update_sum(tree, size, index, value):
+    """
+    Set a leaf of a sum segment tree and recompute its ancestors.
+    """
+    pos = index + size  # Convert to leaf position
+    tree[pos] = value
+    while pos > 1:
+        pos >>= 1  # Move to parent
+        tree[pos] = tree[2*pos] + tree[2*pos+1]
+
+
+def segment_update_max(tree, size, index, value):
+    """
+    Set a leaf of a max segment tree and recompute its ancestors.
+    """
+    pos = index + size  # Convert to leaf position
+    tree[pos] = value
+    while pos > 1:
+        pos >>= 1  # Move to parent
+        tree[pos] = max(tree[2*pos], tree[2*pos+1])
+
+
+def segment_query_sum(tree, size, l, r):
+    """
+    Sum over leaves [l, r] (0-based) of a sum segment tree.
+    """
+    res = 0
+    l += size  # Convert to leaf position
+    r += size  # Convert to leaf position
+    while l <= r:
+        if l % 2 == 1:
+            res += tree[l]  # Add left child
+            l += 1
+        if r % 2 == 0:
+            res += tree[r]  # Add right child
+            r -= 1
+        l >>= 1  # Move to parent
+        r >>= 1  # Move to parent
+    return res
+
+
+def segment_query_max(tree, size, l, r):
+    """
+    Max over leaves [l, r] (0-based, l <= r) of a max segment tree.
+    """
+    l += size  # Convert to leaf position
+    r += size  # Convert to leaf position
+    max_val = tree[l]  # The leftmost leaf is always part of the range
+    while l <= r:
+        if l % 2 == 1:
+            max_val = max(max_val, tree[l])  # Update max with left child
+            l += 1
+        if r % 2 == 0:
+            max_val = max(max_val, tree[r])  # Update max with right child
+            r -= 1
+        l >>= 1  # Move to parent
+        r >>= 1  # Move to parent
+    return max_val
@@ -0,0 +1,211 @@
+#
+#  lazy_segment_tree.py
+#  Advanced Data Structure
+#
+#  Segment Tree with lazy propagation for range updates.
+#
+
+import numpy as np
+
+class LazySegmentTree:
+    def __init__(self, data: np.ndarray, progress: bool = False):
+        """
+        Initialize the lazy Segment Tree with the given data.
+        
+        Internal nodes carry a pending tag that is either "add delta" or
+        "assign value" (an add arriving after an assign is folded into it).
+        Tags are pushed to the children only when a later operation needs them.
+        
+        Args:
+            data (np.ndarray): Input array to build the Segment Tree.
+            progress (bool): Show a progress bar over the build levels.
+        """
+        self.n = len(data)
+        self.size = 1
+        while self.size < self.n:
+            self.size <<= 1  # Find the next power of 2 >= n
+        self.log = self.size.bit_length() - 1  # Height of the tree
+        
+        self.tree_sum = np.zeros(2 * self.size, dtype=np.int64)  # Sum tree
+        self.tree_max = np.full(2 * self.size, np.iinfo(np.int64).min, dtype=np.int64)  # Max tree (padding never wins)
+        self.tag_add = np.zeros(self.size, dtype=np.int64)  # Pending add per internal node
+        self.tag_assign = np.zeros(self.size, dtype=np.int64)  # Pending assign per internal node
+        self.has_assign = np.zeros(self.size, dtype=bool)  # Whether tag_assign is set
+        
+        # Bottom-up initialization, one level at a time
+        self.tree_sum[self.size:self.size + self.n] = data  # Fill leaves with data
+        self.tree_max[self.size:self.size + self.n] = data  # Fill leaves with data
+        levels = range(self.log)
+        if progress:
+            from tqdm import tqdm
+            levels = tqdm(levels, desc="Initializing Lazy Segment Tree", leave=False)
+        hi = self.size
+        for _ in levels:
+            lo = hi >> 1  # Nodes [lo, hi) form the level above [hi, 2 * hi)
+            np.add(self.tree_sum[2*lo:2*hi:2], self.tree_sum[2*lo+1:2*hi:2], out=self.tree_sum[lo:hi])  # Compute sums
+            np.maximum(self.tree_max[2*lo:2*hi:2], self.tree_max[2*lo+1:2*hi:2], out=self.tree_max[lo:hi])  # Compute maxes
+            hi = lo
+
+    def _apply(self, k: int, assign: bool, value: int):
+        """
+        Apply an add or assign to node k and record it as a pending tag.
+        """
+        length = self.size >> (k.bit_length() - 1)  # Number of leaves under node k
+        if assign:
+            self.tree_sum[k] = value * length
+            self.tree_max[k] = value
+            if k < self.size:
+                self.tag_assign[k] = value
+                self.has_assign[k] = True
+                self.tag_add[k] = 0
+        else:
+            self.tree_sum[k] += value * length
+            self.tree_max[k] += value
+            if k < self.size:
+                if self.has_assign[k]:
+                    self.tag_assign[k] += value  # Fold the add into the pending assign
+                else:
+                    self.tag_add[k] += value
+
+    def _push(self, k: int):
+        """
+        Push the pending tag of node k down to its children.
+        """
+        if self.has_assign[k]:
+            value = int(self.tag_assign[k])
+            self._apply(2*k, True, value)
+            self._apply(2*k+1, True, value)
+            self.has_assign[k] = False
+        elif self.tag_add[k]:
+            value = int(self.tag_add[k])
+            self._apply(2*k, False, value)
+            self._apply(2*k+1, False, value)
+            self.tag_add[k] = 0
+
+    def _pull(self, k: int):
+        """
+        Recompute node k from its children.
+        """
+        self.tree_sum[k] = self.tree_sum[2*k] + self.tree_sum[2*k+1]
+        self.tree_max[k] = max(self.tree_max[2*k], self.tree_max[2*k+1])
+
+    def _push_boundaries(self, l: int, r: int):
+        """
+        Push tags on the paths above the half-open leaf range [l, r).
+        """
+        for i in range(self.log, 0, -1):
+            if ((l >> i) << i) != l:
+                self._push(l >> i)
+            if ((r >> i) << i) != r:
+                self._push((r - 1) >> i)
+
+    def _range_apply(self, l: int, r: int, assign: bool, value: int):
+        """
+        Apply an add or assign to every value in the range [l, r].
+        """
+        l += self.size  # Convert to leaf position
+        r += self.size + 1  # Convert to (exclusive) leaf position
+        self._push_boundaries(l, r)
+        
+        l2, r2 = l, r
+        while l < r:
+            if l & 1:
+                self._apply(l, assign, value)  # Tag left child
+                l += 1
+            if r & 1:
+                r -= 1
+                self._apply(r, assign, value)  # Tag right child
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+        
+        # Recompute the ancestors of the two boundary leaves
+        l, r = l2, r2
+        for i in range(1, self.log + 1):
+            if ((l >> i) << i) != l:
+                self._pull(l >> i)
+            if ((r >> i) << i) != r:
+                self._pull((r - 1) >> i)
+
+    def range_add(self, l: int, r: int, delta: int):
+        """
+        Add `delta` to every value in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            delta (int): Amount to add to each value in the range.
+        """
+        self._range_apply(l, r, False, delta)
+
+    def range_assign(self, l: int, r: int, value: int):
+        """
+        Set every value in the range [l, r] to `value`.
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            value (int): New value for each index in the range.
+        """
+        self._range_apply(l, r, True, value)
+
+    def update(self, index: int, value: int):
+        """
+        Update the value at the specified index in the Segment Tree.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+        """
+        self._range_apply(index, index, True, value)
+
+    def query_sum(self, l: int, r: int) -> int:
+        """
+        Compute the sum of values in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Sum of values in the range.
+        """
+        res = 0
+        l += self.size  # Convert to leaf position
+        r += self.size + 1  # Convert to (exclusive) leaf position
+        self._push_boundaries(l, r)
+        while l < r:
+            if l & 1:
+                res += self.tree_sum[l]  # Add left child
+                l += 1
+            if r & 1:
+                r -= 1
+                res += self.tree_sum[r]  # Add right child
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+        return res
+
+    def query_max(self, l: int, r: int) -> int:
+        """
+        Compute the maximum value in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Maximum value in the range.
+        """
+        max_val = -np.inf
+        l += self.size  # Convert to leaf position
+        r += self.size + 1  # Convert to (exclusive) leaf position
+        self._push_boundaries(l, r)
+        while l < r:
+            if l & 1:
+                max_val = max(max_val, self.tree_max[l])  # Update max with left child
+                l += 1
+            if r & 1:
+                r -= 1
+                max_val = max(max_val, self.tree_max[r])  # Update max with right child
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+        return max_val
@@ -0,0 +1,133 @@
+#
+#  persistence.py
+#  Advanced Data Structure
+#
+#  On-disk snapshots of built data structures.
+#
+
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+
+
+def save_arrays(path: str, kind: str, meta: dict, arrays: dict):
+    """
+    Write a snapshot directory: one .npy file per array plus a JSON header.
+    
+    Args:
+        path (str): Directory to write the snapshot to (created if missing).
+        kind (str): Name of the data structure class.
+        meta (dict): Scalar attributes needed to restore the structure.
+        arrays (dict): Backing NumPy arrays, keyed by attribute name.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    write_header(path, kind, meta, arrays)
+
+
+def write_header(path: str, kind: str, meta: dict, arrays: dict):
+    """
+    Write the JSON header describing the .npy files already in a snapshot directory.
+    
+    Args:
+        path (str): Snapshot directory.
+        kind (str): Name of the data structure class.
+        meta (dict): Scalar attributes needed to restore the structure.
+        arrays (dict): Arrays stored in the directory, keyed by file name (without .npy).
+    """
+    header = {
+        "format": FORMAT_VERSION,
+        "kind": kind,
+        "meta": meta,
+        "arrays": {name: {"dtype": array.dtype.str, "shape": list(array.shape)} for name, array in arrays.items()}
+    }
+    # Write the header last so a complete header implies complete arrays
+    with open(os.path.join(path, HEADER_FILE), "w") as f:
+        json.dump(header, f, indent=2)
+
+
+def snapshot_kind(path: str) -> str:
+    """
+    Name of the data structure class stored in a snapshot directory.
+    """
+    with open(os.path.join(path, HEADER_FILE)) as f:
+        return json.load(f).get("kind")
+
+
+def load_arrays(path: str, kind: str, mmap: bool = True, writable: bool = False):
+    """
+    Read a snapshot directory written by `save_arrays`.
+    
+    Args:
+        path (str): Snapshot directory.
+        kind (str): Expected name of the data structure class.
+        mmap (bool): Memory-map the arrays read-only instead of reading them into RAM.
+        writable (bool): With `mmap`, map the files read-write so changes reach disk.
+    
+    Returns:
+        tuple: The `meta` dict and a dict of arrays keyed by attribute name.
+    """
+    with open(os.path.join(path, HEADER_FILE)) as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {header.get('format')}")
+    if header.get("kind") != kind:
+        raise ValueError(f"Snapshot holds a {header.get('kind')}, not a {kind}")
+    
+    mmap_mode = ("r+" if writable else "r") if mmap else None
+    arrays = {}
+    for name in header["arrays"]:
+        arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+    return header["meta"], arrays
+
+
+class SnapshotMixin:
+    """
+    Adds `save` / `load` to a data structure.
+    
+    Subclasses list their scalar attributes in `_meta_fields` and their backing
+    NumPy arrays in `_array_fields`. Array attributes set to None are skipped.
+    """
+    _meta_fields = ()
+    _array_fields = ()
+
+    def save(self, path: str):
+        """
+        Save the built structure to a snapshot directory.
+        
+        Args:
+            path (str): Directory to write the snapshot to (created if missing).
+        """
+        meta = {name: getattr(self, name) for name in self._meta_fields}
+        arrays = {name: getattr(self, name) for name in self._array_fields if getattr(self, name) is not None}
+        save_arrays(path, type(self).__name__, meta, arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """
+        Load a structure from a snapshot directory without rebuilding it.
+        
+        With `mmap=True` the arrays are memory-mapped read-only: loading is
+        near-instant, pages are read on demand, and processes loading the same
+        snapshot share one copy through the page cache. Updates on such an
+        instance raise an error; load with `mmap=False` to get a writable copy.
+        
+        Args:
+            path (str): Snapshot directory.
+            mmap (bool): Memory-map the arrays instead of reading them into RAM.
+        
+        Returns:
+            The restored data structure.
+        """
+        meta, arrays = load_arrays(path, cls.__name__, mmap=mmap)
+        obj = cls.__new__(cls)
+        for name, value in meta.items():
+            setattr(obj, name, value)
+        for name in cls._array_fields:
+            setattr(obj, name, arrays.get(name))  # Arrays that were not built stay None
+        return obj
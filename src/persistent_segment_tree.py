@@ -0,0 +1,257 @@
+#
+#  persistent_segment_tree.py
+#  Advanced Data Structure
+#
+#  Versioned Segment Tree with path copying in flat NumPy node pools.
+#
+
+import numpy as np
+
+from src.array_utils import dedupe_updates, lowest_value
+from src.profiling import ProfiledMixin
+
+class PersistentSegmentTree(ProfiledMixin):
+    _array_fields = ("left", "right", "tree_sum", "tree_max")
+
+    def __init__(self, data: np.ndarray, capacity: int = None):
+        """
+        Initialize a persistent Segment Tree whose updates create new versions.
+        
+        Nodes live in flat NumPy pools (child ids, sum and max) instead of
+        Python objects. Version 0 is the power-of-two tree over `data`, built
+        bottom-up like SegmentTree, with node 1 as its root and node 0 as the
+        null child of the leaves. An update copies only the O(log n) nodes on
+        the path to the changed leaf; all other nodes are shared with the
+        previous version.
+        
+        Args:
+            data (np.ndarray): Input array to build the tree.
+            capacity (int): Initial pool size in nodes (grows by doubling when full).
+        """
+        data = np.asarray(data)
+        self.n = len(data)
+        if self.n < 1:
+            raise ValueError("data must not be empty")
+        self.size = 1 << (self.n - 1).bit_length()  # Number of leaves, a power of 2
+        self.height = self.size.bit_length() - 1  # Depth of the leaves
+        capacity = max(capacity or 0, 4 * self.size)
+        index_dtype = np.int32 if capacity < 2**31 else np.int64
+        
+        self.left = np.zeros(capacity, dtype=index_dtype)  # Left child id, 0 for leaves
+        self.right = np.zeros(capacity, dtype=index_dtype)  # Right child id, 0 for leaves
+        self.tree_sum = np.zeros(capacity, dtype=np.int64)
+        self.tree_max = np.full(capacity, lowest_value(data.dtype), dtype=data.dtype)  # Padding never wins
+        
+        # Version 0 uses the implicit heap layout: node i has children 2i and 2i+1
+        internal = np.arange(1, self.size)
+        self.left[1:self.size] = 2 * internal
+        self.right[1:self.size] = 2 * internal + 1
+        self.tree_sum[self.size:self.size + self.n] = data
+        self.tree_max[self.size:self.size + self.n] = data
+        lo = self.size
+        while lo > 1:
+            lo >>= 1  # Nodes [lo, 2 * lo) form one level
+            self.tree_sum[lo:2*lo] = self.tree_sum[2*lo:4*lo:2] + self.tree_sum[2*lo+1:4*lo:2]
+            self.tree_max[lo:2*lo] = np.maximum(self.tree_max[2*lo:4*lo:2], self.tree_max[2*lo+1:4*lo:2])
+        self.used = 2 * self.size  # Nodes [0, used) are allocated
+        self.roots = [1]  # Root node of each version, -1 once released
+
+    def _grow(self, count: int):
+        """
+        Make room for `count` more nodes, doubling the pools if needed.
+        """
+        if self.used + count <= len(self.left):
+            return
+        capacity = max(2 * len(self.left), self.used + count)
+        if capacity >= 2**31 and self.left.dtype != np.int64:
+            self.left = self.left.astype(np.int64)
+            self.right = self.right.astype(np.int64)
+        for name in self._array_fields:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.used] = old[:self.used]
+            setattr(self, name, new)
+
+    def _root(self, version: int) -> int:
+        """
+        Return the root node of a retained version.
+        """
+        if not 0 <= version < len(self.roots) or self.roots[version] < 0:
+            raise ValueError(f"Version {version} does not exist or was released")
+        return self.roots[version]
+
+    @property
+    def latest(self) -> int:
+        """
+        Most recently created version.
+        """
+        return len(self.roots) - 1
+
+    @property
+    def versions(self) -> list:
+        """
+        Versions that can still be queried.
+        """
+        return [version for version, root in enumerate(self.roots) if root >= 0]
+
+    def update(self, index: int, value: int, version: int = None) -> int:
+        """
+        Create a new version with the value at `index` replaced.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+            version (int): Version to derive from (default: the latest).
+        
+        Returns:
+            int: The new version.
+        """
+        return self.update_many(np.array([index]), np.array([value]), version)
+
+    def update_many(self, indices: np.ndarray, values: np.ndarray, version: int = None) -> int:
+        """
+        Create one new version with a batch of values replaced.
+        
+        Duplicate indices are collapsed (last write wins). Nodes on the paths of
+        several updates are copied once, so the version costs at most
+        k * (log n + 1) new nodes for k distinct indices.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+            version (int): Version to derive from (default: the latest).
+        
+        Returns:
+            int: The new version.
+        """
+        root = self._root(self.latest if version is None else version)
+        indices, values = dedupe_updates(indices, values)
+        if len(indices) and (indices.min() < 0 or indices.max() >= self.n):
+            raise IndexError(f"Indices must lie in [0, {self.n - 1}]")
+        self._grow(len(indices) * (self.height + 1) + 1)
+        first_new = self.used  # Nodes at or after this id belong to the new version
+        
+        def copy(node):
+            # Copy a node of an older version into the new one
+            new = self.used
+            self.used += 1
+            self.left[new] = self.left[node]
+            self.right[new] = self.right[node]
+            self.tree_sum[new] = self.tree_sum[node]
+            self.tree_max[new] = self.tree_max[node]
+            return new
+        
+        new_root = copy(root)
+        for index, value in zip(indices.tolist(), values.tolist()):
+            path = [new_root]
+            node = new_root
+            for depth in range(self.height - 1, -1, -1):
+                children = self.right if (index >> depth) & 1 else self.left
+                child = int(children[node])
+                if child < first_new:  # Shared with an older version: copy it
+                    child = copy(child)
+                    children[node] = child
+                path.append(child)
+                node = child
+            self.tree_sum[node] = value  # Update leaf
+            self.tree_max[node] = value
+            for node in reversed(path[:-1]):
+                l, r = self.left[node], self.right[node]
+                self.tree_sum[node] = self.tree_sum[l] + self.tree_sum[r]  # Recompute sum
+                self.tree_max[node] = max(self.tree_max[l], self.tree_max[r])  # Recompute max
+        self.roots.append(new_root)
+        return self.latest
+
+    def _query(self, tree: np.ndarray, version: int, l: int, r: int, op, res):
+        """
+        Combine the nodes of a version covering [l, r], walking down from its root.
+        """
+        if not 0 <= l <= r < self.n:
+            raise IndexError(f"Range [{l}, {r}] is outside [0, {self.n - 1}]")
+        stack = [(self._root(version), 0, self.size - 1)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if l <= lo and hi <= r:
+                res = op(res, tree[node])  # Node lies inside the range
+                continue
+            mid = (lo + hi) // 2
+            if l <= mid:
+                stack.append((self.left[node], lo, mid))
+            if r > mid:
+                stack.append((self.right[node], mid + 1, hi))
+        return res
+
+    def query_sum(self, version: int, l: int, r: int) -> int:
+        """
+        Compute the sum of values in the range [l, r] as of `version`.
+        
+        Args:
+            version (int): Version to query.
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Sum of values in the range.
+        """
+        return int(self._query(self.tree_sum, version, l, r, lambda a, b: a + b, 0))
+
+    def query_max(self, version: int, l: int, r: int) -> int:
+        """
+        Compute the maximum value in the range [l, r] as of `version`.
+        
+        Args:
+            version (int): Version to query.
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Maximum value in the range.
+        """
+        return self._query(self.tree_max, version, l, r, max, -np.inf)
+
+    def release(self, version: int):
+        """
+        Mark a version as no longer needed; its nodes are reclaimed by `compact`.
+        
+        Args:
+            version (int): Version to release.
+        """
+        self._root(version)  # Raise if it does not exist
+        self.roots[version] = -1
+
+    def compact(self) -> int:
+        """
+        Drop the nodes reachable only from released versions and renumber the rest.
+        
+        Live nodes are found one tree level at a time with vectorized gathers,
+        then moved to the front of the pools in their original order.
+        
+        Returns:
+            int: Number of nodes freed.
+        """
+        live = np.zeros(self.used, dtype=bool)
+        live[0] = True  # Null child
+        frontier = np.unique([root for root in self.roots if root >= 0])
+        while len(frontier):
+            live[frontier] = True
+            children = np.concatenate((self.left[frontier], self.right[frontier]))
+            children = np.unique(children[children > 0])
+            frontier = children[~live[children]]  # Shared subtrees are visited once
+        
+        new_id = np.cumsum(live) - 1  # Old id -> new id for live nodes
+        keep = np.flatnonzero(live)
+        for name in self._array_fields:
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.left[:len(keep)] = new_id[self.left[:len(keep)]]
+        self.right[:len(keep)] = new_id[self.right[:len(keep)]]
+        self.roots = [int(new_id[root]) if root >= 0 else -1 for root in self.roots]
+        freed = self.used - len(keep)
+        self.used = len(keep)
+        return freed
+
+    def _memory_arrays(self) -> dict:
+        """
+        Allocated parts of the node pools.
+        """
+        return {name: getattr(self, name)[:self.used] for name in self._array_fields}
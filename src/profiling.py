@@ -0,0 +1,112 @@
+#
+#  profiling.py
+#  Advanced Data Structure
+#
+#  Memory reports and optional instrumentation hooks.
+#
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Collect nodes touched per operation and build-phase timings.
+        
+        Attach one to a structure with `structure.profiler = profiler` (or pass
+        `profiler=` to the constructor to also time the build phases). Scalar
+        operations then report how many tree nodes they read or wrote; batched
+        `*_many` calls are not counted.
+        """
+        self.calls = defaultdict(int)  # Operation -> number of calls
+        self.nodes = defaultdict(int)  # Operation -> nodes touched over all calls
+        self.timings = defaultdict(float)  # Build phase -> seconds
+
+    def count(self, operation: str, nodes: int):
+        """
+        Record one call of `operation` that touched `nodes` nodes.
+        """
+        self.calls[operation] += 1
+        self.nodes[operation] += nodes
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a build phase; repeated phases accumulate.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start_time
+
+    def nodes_per_call(self, operation: str) -> float:
+        """
+        Average nodes touched per call of `operation`.
+        """
+        calls = self.calls.get(operation, 0)
+        return self.nodes[operation] / calls if calls else 0.0
+
+    def reset(self):
+        """
+        Clear all counters and timings.
+        """
+        self.calls.clear()
+        self.nodes.clear()
+        self.timings.clear()
+
+    def report(self) -> dict:
+        """
+        Summarize the collected counters and timings.
+        """
+        return {
+            "operations": {op: {"calls": self.calls[op], "nodes": self.nodes[op],
+                                "nodes_per_call": self.nodes_per_call(op)} for op in self.calls},
+            "build_phases_s": dict(self.timings),
+        }
+
+
+class ProfiledMixin:
+    """
+    Adds `nbytes`, `memory_report()` and an optional `profiler` to a structure.
+    
+    The arrays reported are the ones listed in `_array_fields`; subclasses with
+    other backing arrays override `_memory_arrays`.
+    """
+    _array_fields = ()
+    profiler = None
+
+    def _phase(self, name: str):
+        """
+        Context manager timing a build phase when a profiler is attached.
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(name)
+
+    def _memory_arrays(self) -> dict:
+        """
+        Backing arrays of the structure, keyed by name.
+        """
+        return {name: getattr(self, name) for name in self._array_fields if getattr(self, name) is not None}
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Total bytes held by the backing arrays.
+        """
+        return sum(array.nbytes for array in self._memory_arrays().values())
+
+    def memory_report(self) -> dict:
+        """
+        Bytes per backing array, their total, and bytes per input element.
+        """
+        arrays = {name: array.nbytes for name, array in self._memory_arrays().items()}
+        total = sum(arrays.values())
+        return {
+            "arrays": arrays,
+            "total_bytes": total,
+            "bytes_per_element": total / self.n if self.n else 0.0,
+        }
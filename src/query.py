@@ -0,0 +1,41 @@
+#
+#  query.py
+#  Advanced Data Structure
+#
+#  Query-only entry point for short-lived workers.
+#
+#  Importing this module loads NumPy and the structures that can be restored
+#  from snapshots, nothing heavier: progress bars, plotting, argument parsing
+#  and the Numba backend are imported only when something uses them.
+#
+#  Usage:
+#      from src.query import load
+#      tree = load("snapshots/segment")
+#      tree.query_sum_many(ls, rs)
+#
+
+from src.fenwick_tree import FenwickTree
+from src.persistence import snapshot_kind
+from src.segment_tree import SegmentTree
+from src.sparse_table import SparseTable
+from src.wavelet_matrix import WaveletMatrix
+
+# Class name stored in a snapshot header -> class
+STRUCTURES = {cls.__name__: cls for cls in (FenwickTree, SegmentTree, SparseTable, WaveletMatrix)}
+
+
+def load(path: str, mmap: bool = True):
+    """
+    Load whichever structure a snapshot directory holds.
+    
+    Args:
+        path (str): Snapshot directory written by `save`.
+        mmap (bool): Memory-map the arrays instead of reading them into RAM.
+    
+    Returns:
+        The restored data structure.
+    """
+    kind = snapshot_kind(path)
+    if kind not in STRUCTURES:
+        raise ValueError(f"Snapshot holds a {kind}, which src.query cannot load")
+    return STRUCTURES[kind].load(path, mmap=mmap)
@@ -0,0 +1,199 @@
+#
+#  query_cache.py
+#  Advanced Data Structure
+#
+#  LRU cache of range query results with range-aware invalidation.
+#
+
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+
+def _canonical_nodes(size: int, l: int, r: int) -> list:
+    """
+    Nodes of the iterative Segment Tree layout (leaves at [size, 2 * size)) covering [l, r].
+    
+    An index i lies in [l, r] exactly when one of these nodes is an ancestor of
+    (or equal to) leaf i + size.
+    """
+    nodes = []
+    l += size
+    r += size
+    while l <= r:
+        if l % 2 == 1:
+            nodes.append(l)
+            l += 1
+        if r % 2 == 0:
+            nodes.append(r)
+            r -= 1
+        l >>= 1
+        r >>= 1
+    return nodes
+
+
+class CachedQueries:
+    def __init__(self, structure, capacity: int = 1024):
+        """
+        Wrap a structure so repeated range queries are answered from an LRU cache.
+        
+        `query_sum`, `query_max` and `query_prefix` results are cached per range.
+        Every cached range is also registered at its O(log n) canonical nodes of
+        a Segment Tree over the indices, so an update at index i invalidates only
+        the ranges containing i, found by walking the O(log n) ancestors of leaf
+        i. Updates must go through the wrapper (`update`, `update_many`, `add`)
+        to keep the cache fresh. Other `query_*` methods (e.g. the batched ones)
+        pass through uncached.
+        
+        Args:
+            structure: Structure to wrap (FenwickTree, SegmentTree, SparseTable, ...).
+            capacity (int): Maximum number of cached ranges.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self.structure = structure
+        self.capacity = capacity
+        self.n = structure.n
+        self._cache = OrderedDict()  # (query, l, r) -> result
+        self._stabbing = defaultdict(set)  # Canonical node -> cached keys registered there
+        self.hits = 0  # Queries answered from the cache
+        self.misses = 0  # Queries forwarded to the structure
+        self.invalidations = 0  # Cached ranges dropped by updates
+        self.evictions = 0  # Cached ranges dropped to stay within capacity
+
+    def __getattr__(self, name: str):
+        """
+        Pass other queries through to the wrapped structure, uncached.
+        """
+        if name.startswith("query_"):
+            return getattr(self.structure, name)
+        raise AttributeError(f"{type(self).__name__} does not forward '{name}'; call it on .structure")
+
+    def _lookup(self, query: str, l: int, r: int, compute):
+        """
+        Return the cached result for a range, calling `compute()` and caching it on a miss.
+        """
+        key = (query, l, r)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)  # Mark as most recently used
+            return self._cache[key]
+        self.misses += 1
+        result = compute()
+        self._cache[key] = result
+        for node in _canonical_nodes(self.n, l, r):
+            self._stabbing[node].add(key)
+        if len(self._cache) > self.capacity:
+            self._drop(next(iter(self._cache)))  # Least recently used
+            self.evictions += 1
+        return result
+
+    def _drop(self, key: tuple):
+        """
+        Remove a cached range and its canonical-node registrations.
+        """
+        del self._cache[key]
+        for node in _canonical_nodes(self.n, key[1], key[2]):
+            keys = self._stabbing[node]
+            keys.discard(key)
+            if not keys:
+                del self._stabbing[node]
+
+    def invalidate(self, index: int):
+        """
+        Drop every cached range that contains `index`.
+        """
+        node = index + self.n  # Leaf of the index
+        while node >= 1:
+            keys = self._stabbing.get(node)
+            if keys:
+                for key in list(keys):
+                    self._drop(key)
+                    self.invalidations += 1
+            node >>= 1  # Move to parent
+
+    def clear(self):
+        """
+        Drop all cached ranges.
+        """
+        self.invalidations += len(self._cache)
+        self._cache.clear()
+        self._stabbing.clear()
+
+    def query_sum(self, l: int, r: int):
+        """
+        Compute the sum of values in the range [l, r], cached.
+        """
+        return self._lookup("query_sum", l, r, lambda: self.structure.query_sum(l, r))
+
+    def query_max(self, l: int, r: int):
+        """
+        Compute the maximum value in the range [l, r], cached.
+        """
+        return self._lookup("query_max", l, r, lambda: self.structure.query_max(l, r))
+
+    def query_prefix(self, idx: int):
+        """
+        Compute the prefix sum up to `idx` (inclusive), cached.
+        """
+        return self._lookup("query_prefix", 0, idx, lambda: self.structure.query_prefix(idx))
+
+    def update(self, index: int, value: int):
+        """
+        Update the value at the specified index and invalidate the ranges containing it.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+        """
+        self.invalidate(index)
+        self.structure.update(index, value)
+
+    def add(self, index: int, delta: int):
+        """
+        Add `delta` to the value at the specified index and invalidate the ranges containing it.
+        
+        Args:
+            index (int): Index to update (0-based).
+            delta (int): Amount to add to the value at the index.
+        """
+        self.invalidate(index)
+        self.structure.add(index, delta)
+
+    def update_many(self, indices: np.ndarray, values: np.ndarray):
+        """
+        Update a batch of values and invalidate the ranges containing any of them.
+        
+        When the batch touches more distinct indices than there are cached
+        ranges, the whole cache is dropped instead.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+        """
+        unique = np.unique(np.asarray(indices, dtype=np.int64))
+        if len(unique) > len(self._cache):
+            self.clear()
+        else:
+            for index in unique.tolist():
+                self.invalidate(index)
+        self.structure.update_many(indices, values)
+
+    def cache_stats(self) -> dict:
+        """
+        Hit / miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "cached_ranges": len(self._cache),
+        }
+
+    def reset_stats(self):
+        """
+        Reset the counters (the cached ranges are kept).
+        """
+        self.hits = self.misses = self.invalidations = self.evictions = 0
@@ -6,31 +6,201 @@
 #
 
 import numpy as np
-from tqdm import tqdm
 
-class SegmentTree:
-    def __init__(self, data: np.ndarray):
+from src import backend
+from src.array_utils import ARG_OPS, ChunkRunner, check_fits, dedupe_updates, lowest_value, monoid_identity, pack_arg, unpack_arg
+from src.persistence import SnapshotMixin
+from src.profiling import ProfiledMixin
+
+AGGREGATES = ("sum", "max")
+
+
+def _level_chunks(size: int) -> list:
+    """
+    Split the internal nodes [1, size) into bottom-up build steps.
+    
+    Nodes [lo, hi) only have children >= hi, which earlier steps have already
+    computed, so each step is one vectorized operation.
+    
+    Returns:
+        list: (lo, hi) node ranges, deepest first.
+    """
+    chunks = []
+    hi = size
+    while hi > 1:
+        lo = (hi + 1) >> 1
+        chunks.append((lo, hi))
+        hi = lo
+    return chunks
+
+
+def _ancestor_steps(pos: np.ndarray):
+    """
+    Yield the distinct ancestors of the given nodes, one step up at a time.
+    
+    Leaves may sit at two different depths, so a node can be yielded early,
+    before one of its children has been recomputed; it is then yielded again
+    one step after that child, so recomputing each yielded set in order leaves
+    every node correct once the walk reaches the root.
+    """
+    while True:
+        pos = np.unique(pos >> 1)  # Distinct parents of the nodes just written
+        pos = pos[pos >= 1]
+        if len(pos) == 0:
+            return
+        yield pos
+
+
+def _query_nodes(size: int, l: int, r: int) -> int:
+    """
+    Number of nodes the iterative walk over [l, r] combines.
+    """
+    nodes = 0
+    l += size
+    r += size
+    while l <= r:
+        nodes += (l & 1) + (1 - (r & 1))
+        l = (l + 1) >> 1
+        r = (r - 1) >> 1
+    return nodes
+
+
+def _query_many(tree: np.ndarray, size: int, ls: np.ndarray, rs: np.ndarray, op, init) -> np.ndarray:
+    """
+    Walk all ranges up the tree together, one vectorized gather per level.
+    
+    Args:
+        tree (np.ndarray): Tree to read from, leaves at [size, 2 * size).
+        size (int): Number of leaves.
+        ls (np.ndarray): Start indices (0-based).
+        rs (np.ndarray): End indices (0-based).
+        op (np.ufunc): Binary operation combining node values.
+        init: Identity element of `op`.
+    
+    Returns:
+        np.ndarray: Aggregated value for each range.
+    """
+    l = np.asarray(ls, dtype=np.int64) + size  # Convert to leaf positions
+    r = np.asarray(rs, dtype=np.int64) + size  # Convert to leaf positions
+    res = np.full(len(l), init, dtype=tree.dtype)
+    active = l <= r
+    while active.any():
+        left = active & (l % 2 == 1)  # Ranges that take the left node
+        res[left] = op(res[left], tree[l[left]])
+        l[left] += 1
+        right = active & (r % 2 == 0)  # Ranges that take the right node
+        res[right] = op(res[right], tree[r[right]])
+        r[right] -= 1
+        l[active] >>= 1  # Move to parent (finished ranges stay put)
+        r[active] >>= 1  # Move to parent (finished ranges stay put)
+        active &= l <= r
+    return res
+
+
+class SegmentTree(SnapshotMixin, ProfiledMixin):
+    _meta_fields = ("n", "size")
+    _array_fields = ("tree_sum", "tree_max")
+
+    def __init__(self, data: np.ndarray, aggregates: tuple = AGGREGATES, progress: bool = False,
+                 profiler=None, workers: int = None):
         """
         Initialize the Segment Tree with the given data.
         
+        The tree uses the iterative non-power-of-two layout: leaves live at
+        [n, 2n) and node i combines nodes 2i and 2i+1, so each aggregate takes
+        2n entries. Only the requested aggregates are built. The max tree keeps
+        the input dtype (e.g. int32); the sum tree is int64 and the build fails
+        if the sum of n values could overflow it.
+        
+        With `workers`, the leaf copy and every large level are split into
+        slices built on that many threads (nodes of one level only read deeper
+        levels, so the slices are independent); the small top levels run
+        serially.
+        
         Args:
             data (np.ndarray): Input array to build the Segment Tree.
+            aggregates (tuple): Aggregates to build: any of "sum" and "max".
+            progress (bool): Show a progress bar over the build levels.
+            profiler (Profiler): Optional profiler for build timings and node counts.
+            workers (int): Number of build threads (default: build serially).
         """
+        unknown = set(aggregates) - set(AGGREGATES)
+        if unknown or not aggregates:
+            raise ValueError(f"aggregates must be a non-empty subset of {AGGREGATES}")
+        data = np.asarray(data)
+        self.profiler = profiler
         self.n = len(data)
-        self.size = 1
-        while self.size < self.n:
-            self.size <<= 1  # Find the next power of 2 >= n
+        self.size = self.n  # Leaves start at index size
+        self.tree_sum = None  # Sum tree
+        self.tree_max = None  # Max tree
         
-        # Initialize with zeros (sum and max)
-        self.tree_sum = np.zeros(2 * self.size, dtype=np.int64)  # Sum tree
-        self.tree_max = np.zeros(2 * self.size, dtype=np.int64)  # Max tree
+        trees = []  # (tree, combine) per requested aggregate
+        if "sum" in aggregates:
+            if self.n and np.issubdtype(data.dtype, np.integer):
+                bound = self.n * max(abs(int(data.min())), abs(int(data.max())))
+                if bound > np.iinfo(np.int64).max:
+                    raise OverflowError("Range sums could overflow int64")
+            self.tree_sum = np.zeros(2 * self.size, dtype=np.int64)
+            trees.append((self.tree_sum, np.add))
+        if "max" in aggregates:
+            self.tree_max = np.zeros(2 * self.size, dtype=data.dtype)
+            trees.append((self.tree_max, np.maximum))
         
-        # Bottom-up initialization
-        self.tree_sum[self.size:self.size + self.n] = data  # Fill leaves with data
-        self.tree_max[self.size:self.size + self.n] = data  # Fill leaves with data
-        for i in tqdm(range(self.size - 1, 0, -1), desc="Initializing Segment Tree", leave=False):
-            self.tree_sum[i] = self.tree_sum[2*i] + self.tree_sum[2*i+1]  # Compute sum for internal nodes
-            self.tree_max[i] = max(self.tree_max[2*i], self.tree_max[2*i+1])  # Compute max for internal nodes
+        def fill_leaves(start, stop):
+            for tree, _ in trees:
+                tree[self.size + start:self.size + stop] = data[start:stop]  # Fill leaves with data
+        
+        def build_nodes(start, stop):
+            for tree, op in trees:
+                op(tree[2*start:2*stop:2], tree[2*start+1:2*stop:2], out=tree[start:stop])  # Compute sums / maxes
+        
+        # Bottom-up initialization, one vectorized step per chunk of nodes
+        chunks = _level_chunks(self.size)
+        if progress:
+            from tqdm import tqdm
+            chunks = tqdm(chunks, desc="Initializing Segment Tree", leave=False)
+        with ChunkRunner(workers) as runner:
+            with self._phase("leaves"):
+                runner.run(fill_leaves, 0, self.n)
+            with self._phase("levels"):
+                for lo, hi in chunks:
+                    runner.run(build_nodes, lo, hi)
+
+    @property
+    def aggregates(self) -> tuple:
+        """
+        Aggregates this tree was built with.
+        """
+        return tuple(name for name, tree in zip(AGGREGATES, (self.tree_sum, self.tree_max)) if tree is not None)
+
+    def _require(self, tree: np.ndarray, name: str) -> np.ndarray:
+        """
+        Return `tree`, or raise if its aggregate was not built.
+        """
+        if tree is None:
+            raise ValueError(f"Segment Tree was built without the '{name}' aggregate")
+        return tree
+
+    def _check_index(self, index: int):
+        """
+        Raise if `index` is outside [0, n); the compiled kernels do not check bounds.
+        """
+        if not 0 <= index < self.n:
+            raise IndexError(f"Index {index} is outside [0, {self.n - 1}]")
+
+    def _check_range(self, l: int, r: int):
+        """
+        Raise if [l, r] is not a valid range; the compiled kernels do not check bounds.
+        """
+        if not 0 <= l <= r < self.n:
+            raise IndexError(f"Range [{l}, {r}] is outside [0, {self.n - 1}]")
+
+    def _check_values(self, values: np.ndarray):
+        """
+        Raise if new values do not fit the dtype of the max tree.
+        """
+        if self.tree_max is not None:
+            check_fits(values, self.tree_max.dtype, "max tree")
 
     def update(self, index: int, value: int):
         """
@@ -40,13 +210,54 @@ class SegmentTree:
             index (int): Index to update (0-based).
             value (int): New value to set at the index.
         """
-        pos = index + self.size  # Convert to leaf position
-        self.tree_sum[pos] = value  # Update sum tree
-        self.tree_max[pos] = value  # Update max tree
-        while pos > 1:
-            pos >>= 1  # Move to parent
-            self.tree_sum[pos] = self.tree_sum[2*pos] + self.tree_sum[2*pos+1]  # Recompute sum
-            self.tree_max[pos] = max(self.tree_max[2*pos], self.tree_max[2*pos+1])  # Recompute max
+        self._check_index(index)
+        if self.profiler is not None:
+            # Leaf plus one recomputed node per ancestor, for each built aggregate
+            self.profiler.count("update", (index + self.size).bit_length() * len(self.aggregates))
+        if backend.kernels is not None:
+            if self.tree_max is not None:
+                self._check_values(np.asarray([value]))  # Compiled kernels would wrap silently
+                backend.kernels.segment_update_max(self.tree_max, self.size, index, value)
+            if self.tree_sum is not None:
+                backend.kernels.segment_update_sum(self.tree_sum, self.size, index, value)
+            return
+        leaf = index + self.size  # Convert to leaf position
+        if self.tree_max is not None:
+            pos = leaf
+            self.tree_max[pos] = value  # Update max tree
+            while pos > 1:
+                pos >>= 1  # Move to parent
+                self.tree_max[pos] = max(self.tree_max[2*pos], self.tree_max[2*pos+1])  # Recompute max
+        if self.tree_sum is not None:
+            pos = leaf
+            self.tree_sum[pos] = value  # Update sum tree
+            while pos > 1:
+                pos >>= 1  # Move to parent
+                self.tree_sum[pos] = self.tree_sum[2*pos] + self.tree_sum[2*pos+1]  # Recompute sum
+
+    def update_many(self, indices: np.ndarray, values: np.ndarray):
+        """
+        Update a batch of values in the Segment Tree.
+        
+        Duplicate indices are collapsed (last write wins), all leaves are written
+        at once, and each affected ancestor is recomputed once per step.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+        """
+        indices, values = dedupe_updates(indices, values)
+        self._check_values(values)
+        pos = indices + self.size  # Convert to leaf positions
+        if self.tree_sum is not None:
+            self.tree_sum[pos] = values  # Update sum tree
+        if self.tree_max is not None:
+            self.tree_max[pos] = values  # Update max tree
+        for pos in _ancestor_steps(pos):
+            if self.tree_sum is not None:
+                self.tree_sum[pos] = self.tree_sum[2*pos] + self.tree_sum[2*pos+1]  # Recompute sum
+            if self.tree_max is not None:
+                self.tree_max[pos] = np.maximum(self.tree_max[2*pos], self.tree_max[2*pos+1])  # Recompute max
 
     def query_sum(self, l: int, r: int) -> int:
         """
@@ -59,15 +270,21 @@ class SegmentTree:
         Returns:
             int: Sum of values in the range.
         """
+        tree = self._require(self.tree_sum, "sum")
+        self._check_range(l, r)
+        if self.profiler is not None:
+            self.profiler.count("query_sum", _query_nodes(self.size, l, r))
+        if backend.kernels is not None:
+            return backend.kernels.segment_query_sum(tree, self.size, l, r)
         res = 0
         l += self.size  # Convert to leaf position
         r += self.size  # Convert to leaf position
         while l <= r:
             if l % 2 == 1:
-                res += self.tree_sum[l]  # Add left child
+                res += tree[l]  # Add left child
                 l += 1
             if r % 2 == 0:
-                res += self.tree_sum[r]  # Add right child
+                res += tree[r]  # Add right child
                 r -= 1
             l >>= 1  # Move to parent
             r >>= 1  # Move to parent
@@ -84,16 +301,182 @@ class SegmentTree:
         Returns:
             int: Maximum value in the range.
         """
+        tree = self._require(self.tree_max, "max")
+        self._check_range(l, r)
+        if self.profiler is not None:
+            self.profiler.count("query_max", _query_nodes(self.size, l, r))
+        if backend.kernels is not None:
+            return backend.kernels.segment_query_max(tree, self.size, l, r)
         max_val = -np.inf
         l += self.size  # Convert to leaf position
         r += self.size  # Convert to leaf position
         while l <= r:
             if l % 2 == 1:
-                max_val = max(max_val, self.tree_max[l])  # Update max with left child
+                max_val = max(max_val, tree[l])  # Update max with left child
                 l += 1
             if r % 2 == 0:
-                max_val = max(max_val, self.tree_max[r])  # Update max with right child
+                max_val = max(max_val, tree[r])  # Update max with right child
                 r -= 1
             l >>= 1  # Move to parent
             r >>= 1  # Move to parent
         return max_val
+
+    def query_sum_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the sums of values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Sum of values in each range.
+        """
+        return _query_many(self._require(self.tree_sum, "sum"), self.size, ls, rs, np.add, 0)
+
+    def query_max_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the maximum values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Maximum value in each range.
+        """
+        tree = self._require(self.tree_max, "max")
+        return _query_many(tree, self.size, ls, rs, np.maximum, lowest_value(tree.dtype))
+
+
+
+class MonoidSegmentTree:
+    def __init__(self, data: np.ndarray, op=np.add, identity=None, progress: bool = False):
+        """
+        Initialize a Segment Tree over an arbitrary associative operation.
+        
+        `op` is a commutative, associative NumPy ufunc such as np.add,
+        np.maximum, np.minimum or np.gcd, so the build, batched query and batched
+        update paths stay vectorized. Passing "argmax" / "argmin" packs each
+        value with its index into one int64 (see `pack_arg`) and reduces with
+        max / min; queries then return the index of the leftmost extreme.
+        Other aggregates reduce to these, e.g. counting values above a
+        threshold t is np.add over `(data > t).astype(np.int64)`.
+        
+        Args:
+            data (np.ndarray): Input array to build the Segment Tree.
+            op: Binary ufunc, or "argmax" / "argmin".
+            identity: Identity element of `op` (inferred for common ufuncs).
+            progress (bool): Show a progress bar over the build levels.
+        """
+        data = np.asarray(data)
+        self.n = len(data)
+        self.size = self.n  # Leaves start at index size
+        self.mode = op if isinstance(op, str) else None
+        if self.mode is not None:
+            if self.mode not in ARG_OPS:
+                raise ValueError(f"Unknown mode: {self.mode}")
+            self.op = ARG_OPS[self.mode]
+            leaves = pack_arg(data, np.arange(self.n), self.mode)
+        else:
+            self.op = op
+            # Sums and products accumulate in 64 bits, other ops keep the input dtype
+            wide = op in (np.add, np.multiply) and np.issubdtype(data.dtype, np.integer)
+            leaves = data.astype(np.int64) if wide else data
+        self.identity = monoid_identity(self.op, leaves.dtype) if identity is None else identity
+        
+        self.tree = np.empty(2 * self.size, dtype=leaves.dtype)
+        self.tree[self.size:] = leaves  # Fill leaves with data
+        chunks = _level_chunks(self.size)
+        if progress:
+            from tqdm import tqdm
+            chunks = tqdm(chunks, desc="Initializing Monoid Segment Tree", leave=False)
+        for lo, hi in chunks:
+            self.op(self.tree[2*lo:2*hi:2], self.tree[2*lo+1:2*hi:2], out=self.tree[lo:hi])
+
+    def _encode(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Convert new leaf values into the tree's representation.
+        """
+        if self.mode is not None:
+            return pack_arg(values, indices, self.mode)  # Raises if a value does not fit int32
+        values = np.asarray(values)
+        check_fits(values, self.tree.dtype, "tree")
+        return values
+
+    def _decode(self, result):
+        """
+        Convert query results back to values (or indices in arg modes).
+        """
+        if self.mode is not None:
+            return unpack_arg(result, self.mode)
+        return result
+
+    def update(self, index: int, value):
+        """
+        Update the value at the specified index in the Segment Tree.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value: New value to set at the index.
+        """
+        pos = index + self.size  # Convert to leaf position
+        self.tree[pos] = self._encode(np.array([index]), np.array([value]))[0]
+        while pos > 1:
+            pos >>= 1  # Move to parent
+            self.tree[pos] = self.op(self.tree[2*pos], self.tree[2*pos+1])  # Recompute node
+
+    def update_many(self, indices: np.ndarray, values: np.ndarray):
+        """
+        Update a batch of values in the Segment Tree.
+        
+        Duplicate indices are collapsed (last write wins), all leaves are written
+        at once, and each affected ancestor is recomputed once per step.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+        """
+        indices, values = dedupe_updates(indices, values)
+        pos = indices + self.size  # Convert to leaf positions
+        self.tree[pos] = self._encode(indices, values)
+        for pos in _ancestor_steps(pos):
+            self.tree[pos] = self.op(self.tree[2*pos], self.tree[2*pos+1])  # Recompute nodes
+
+    def query(self, l: int, r: int):
+        """
+        Combine the values in the range [l, r] with the tree's operation.
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            Aggregated value (index of the extreme in arg modes).
+        """
+        res = self.identity
+        l += self.size  # Convert to leaf position
+        r += self.size  # Convert to leaf position
+        while l <= r:
+            if l % 2 == 1:
+                res = self.op(res, self.tree[l])  # Combine left child
+                l += 1
+            if r % 2 == 0:
+                res = self.op(res, self.tree[r])  # Combine right child
+                r -= 1
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+        return self._decode(res)
+
+    def query_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Combine the values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Aggregated value (index in arg modes) for each range.
+        """
+        return self._decode(_query_many(self.tree, self.size, ls, rs, self.op, self.identity))
@@ -0,0 +1,370 @@
+#
+#  service.py
+#  Advanced Data Structure
+#
+#  Asyncio query service with micro-batching, a socket front-end and a load client.
+#
+#  Usage:
+#      python -m src.service --size 1000000 --clients 1 8 64 --delays-ms 0 2
+#
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.generate_data import generate_operation_array
+
+QUERY_TYPES = ("sum", "max")
+
+
+class QueryService:
+    def __init__(self, structure, max_delay: float = 0.002, max_batch: int = 4096):
+        """
+        Serve range queries from asyncio code without blocking the event loop.
+        
+        Queries are collected for up to `max_delay` seconds (or until `max_batch`
+        are waiting), answered with one `query_sum_many` / `query_max_many` call
+        on a single worker thread, and each caller's future is resolved with its
+        own result. Updates run on the same thread after any queries submitted
+        before them, so every answer reflects exactly the updates that preceded
+        it.
+        
+        Args:
+            structure: Structure with batched queries (SegmentTree, FenwickTree, SparseTable, ...).
+            max_delay (float): Seconds to wait for more queries before evaluating a batch.
+            max_batch (int): Evaluate as soon as this many queries are waiting.
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be a positive integer")
+        self.structure = structure
+        self.n = structure.n
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending = []  # (query type, l, r, future) waiting for the next batch
+        self._executor = None
+        self._batcher = None
+        self._wakeup = None
+        self._full = None
+        self._closing = False  # Tells the batching task to stop after its current batch
+        self.batches = 0  # Number of batched evaluations
+        self.queries = 0  # Number of queries answered
+
+    async def start(self):
+        """
+        Start the worker thread and the batching task.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-service")
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closing = False
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    async def close(self):
+        """
+        Answer the queries still waiting, then stop the batching task and worker thread.
+        
+        The batching task is not cancelled: a batch it has already taken is
+        answered before it exits, so no caller is left waiting.
+        """
+        if self._batcher is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        self._full.set()  # Skip the batching delay
+        await self._batcher
+        await self._evaluate(self._take())
+        self._executor.shutdown(wait=True)
+        self._batcher = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _check_range(self, l: int, r: int):
+        """
+        Raise if [l, r] is not a valid range, so one bad request cannot fail a whole batch.
+        """
+        if not 0 <= l <= r < self.n:
+            raise IndexError(f"Range [{l}, {r}] is outside [0, {self.n - 1}]")
+
+    def _submit(self, query_type: str, l: int, r: int) -> asyncio.Future:
+        """
+        Queue a query for the next batch and return its future.
+        """
+        self._check_range(l, r)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((query_type, l, r, future))
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return future
+
+    def _take(self) -> list:
+        """
+        Remove and return every waiting query.
+        """
+        batch, self._pending = self._pending, []
+        self._full.clear()
+        return batch
+
+    async def _run_batcher(self):
+        """
+        Wait for queries, give the batch up to `max_delay` to fill, then evaluate it.
+        """
+        while not self._closing:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.max_delay > 0 and len(self._pending) < self.max_batch and not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self._evaluate(self._take())
+
+    def _answer(self, groups: dict) -> dict:
+        """
+        Run one vectorized query per query type; called on the worker thread.
+        """
+        results = {}
+        for query_type, (ls, rs) in groups.items():
+            try:
+                results[query_type] = getattr(self.structure, f"query_{query_type}_many")(ls, rs).tolist()
+            except Exception as exc:
+                results[query_type] = exc  # Fail only this group's callers
+        return results
+
+    def _dispatch(self, batch: list) -> asyncio.Future:
+        """
+        Hand a batch to the worker thread; jobs run in the order they are dispatched.
+        """
+        groups = {}
+        for query_type in QUERY_TYPES:
+            group = [item for item in batch if item[0] == query_type]
+            if group:
+                groups[query_type] = (np.fromiter((item[1] for item in group), dtype=np.int64, count=len(group)),
+                                      np.fromiter((item[2] for item in group), dtype=np.int64, count=len(group)))
+        self.batches += 1
+        return asyncio.get_running_loop().run_in_executor(self._executor, self._answer, groups)
+
+    async def _resolve(self, batch: list, answered: asyncio.Future):
+        """
+        Wait for a dispatched batch and resolve each caller's future with its result.
+        """
+        results = {query_type: iter(values) if isinstance(values, list) else values
+                   for query_type, values in (await answered).items()}
+        for query_type, _, _, future in batch:
+            values = results[query_type]
+            result = values if isinstance(values, Exception) else next(values)
+            if future.done():  # The caller may have given up
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self.queries += len(batch)
+
+    async def _evaluate(self, batch: list):
+        """
+        Answer a batch with one vectorized call per query type on the worker thread.
+        """
+        if batch:
+            await self._resolve(batch, self._dispatch(batch))
+
+    async def query_sum(self, l: int, r: int) -> int:
+        """
+        Compute the sum of values in the range [l, r].
+        """
+        return await self._submit("sum", l, r)
+
+    async def query_max(self, l: int, r: int) -> int:
+        """
+        Compute the maximum value in the range [l, r].
+        """
+        return await self._submit("max", l, r)
+
+    async def update(self, index: int, value: int):
+        """
+        Update the value at the specified index, after all queries submitted so far.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+        """
+        self._check_range(index, index)
+        batch = self._take()  # Queue earlier queries ahead of the update on the worker thread
+        answered = self._dispatch(batch) if batch else None
+        updated = asyncio.get_running_loop().run_in_executor(self._executor, self.structure.update, index, value)
+        if answered is not None:
+            await self._resolve(batch, answered)
+        await updated
+
+    def stats(self) -> dict:
+        """
+        Number of batches and queries served, and the mean batch size.
+        """
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch": self.queries / self.batches if self.batches else 0.0,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve one connection: one request per line, one reply per line.
+        
+        Requests are `SUM l r`, `MAX l r` or `UPDATE index value`; replies are
+        the result, `OK`, or `ERR <message>`.
+        """
+        handlers = {"SUM": self.query_sum, "MAX": self.query_max, "UPDATE": self.update}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    command, a, b = line.split()
+                    result = await handlers[command.decode().upper()](int(a), int(b))
+                    reply = "OK" if result is None else str(result)
+                except Exception as exc:  # Any failed request gets a reply; the connection stays open
+                    reply = f"ERR {exc!r}"
+                writer.write(f"{reply}\n".encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """
+        Start a line-protocol socket server on the given address.
+        
+        Args:
+            host (str): Address to bind (local only by default).
+            port (int): Port to bind; 0 picks a free port (see `server.sockets`).
+        
+        Returns:
+            asyncio.AbstractServer: The running server.
+        """
+        return await asyncio.start_server(self._handle, host, port)
+
+
+async def run_load(host: str, port: int, n: int, clients: int, requests: int,
+                   query_type: str = "sum", seed: int = 0) -> dict:
+    """
+    Send queries from `clients` concurrent connections, each waiting for every reply.
+
+    Args:
+        host (str): Server address.
+        port (int): Server port.
+        n (int): Size of the served structure (for valid ranges).
+        clients (int): Number of concurrent connections.
+        requests (int): Queries sent per connection.
+        query_type (str): "sum" or "max".
+        seed (int): Seed for the query ranges.
+
+    Returns:
+        dict: Throughput and latency percentiles over all queries.
+    """
+    ops = generate_operation_array(n, clients * requests, query_ratio=1.0, query_type=query_type, seed=seed)
+    command = "SUM" if query_type == "sum" else "MAX"
+    lines = [f"{command} {l} {r}\n".encode() for l, r in zip(ops["a"].tolist(), ops["b"].tolist())]
+    latencies = np.empty(len(lines), dtype=np.int64)
+
+    async def client(k: int):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in range(k * requests, (k + 1) * requests):
+                t0 = time.perf_counter_ns()
+                writer.write(lines[i])
+                await writer.drain()
+                reply = await reader.readline()
+                latencies[i] = time.perf_counter_ns() - t0
+                if reply.startswith(b"ERR"):
+                    raise RuntimeError(reply.decode().strip())
+        finally:
+            writer.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    total_s = time.perf_counter() - start_time
+    return {
+        "clients": clients,
+        "queries": len(lines),
+        "queries_per_sec": len(lines) / total_s,
+        "p50_us": float(np.percentile(latencies, 50)) / 1e3,
+        "p99_us": float(np.percentile(latencies, 99)) / 1e3,
+    }
+
+
+async def benchmark_service(structure, client_counts, requests: int = 200, delays=(0.002,),
+                            query_type: str = "sum") -> list:
+    """
+    Measure latency versus throughput of a local QueryService for each batching delay and client count.
+
+    Returns:
+        list: One `run_load` result per (delay, client count), with the delay and mean batch size.
+    """
+    results = []
+    for delay in delays:
+        async with QueryService(structure, max_delay=delay) as service:
+            server = await service.serve()
+            host, port = server.sockets[0].getsockname()[:2]
+            for clients in client_counts:
+                batches, queries = service.batches, service.queries
+                result = await run_load(host, port, structure.n, clients, requests, query_type)
+                result["delay_ms"] = delay * 1e3
+                result["mean_batch"] = (service.queries - queries) / max(1, service.batches - batches)
+                results.append(result)
+            server.close()
+            await server.wait_closed()
+    return results
+
+
+def print_service_results(results: list):
+    """
+    Print service benchmark results in a tabular format.
+    """
+    header = "{:<12} {:<10} {:>14} {:>12} {:>12} {:>12}"
+    print(header.format("Delay (ms)", "Clients", "Queries/s", "p50 (us)", "p99 (us)", "Mean batch"))
+    print("-" * 76)
+    for r in results:
+        print(header.format(f"{r['delay_ms']:.1f}", r["clients"], f"{r['queries_per_sec']:,.0f}",
+                            f"{r['p50_us']:.1f}", f"{r['p99_us']:.1f}", f"{r['mean_batch']:.1f}"))
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Latency versus throughput of the asyncio query service.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Dataset size.")
+    parser.add_argument("--structure", choices=("segment", "fenwick", "sparse"), default="segment",
+                        help="Structure to serve.")
+    parser.add_argument("--query", choices=QUERY_TYPES, default="sum", help="Query type to send.")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64], help="Concurrent client counts.")
+    parser.add_argument("--requests", type=int, default=200, help="Queries per client.")
+    parser.add_argument("--delays-ms", type=float, nargs="+", default=[0.0, 2.0], help="Batching delays to compare.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from src.fenwick_tree import FenwickTree
+    from src.segment_tree import SegmentTree
+    from src.sparse_table import SparseTable
+
+    args = parse_args(argv)
+    structures = {"segment": SegmentTree, "fenwick": FenwickTree, "sparse": SparseTable}
+    data = np.random.default_rng(0).integers(0, 1000, size=args.size, dtype=np.int32)
+    structure = structures[args.structure](data)
+    results = asyncio.run(benchmark_service(structure, args.clients, args.requests,
+                                            [delay / 1e3 for delay in args.delays_ms], args.query))
+    print_service_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#
+#  shared_pool.py
+#  Advanced Data Structure
+#
+#  Multi-process query serving over one built structure in shared memory.
+#
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Per-worker state, set once by `_attach` when the worker starts
+_worker_structure = None
+_worker_version = None
+_worker_blocks = []
+
+
+def _attach(cls, meta: dict, spec: dict, version_name: str):
+    """
+    Worker initializer: wrap the shared arrays in a structure without copying them.
+    """
+    global _worker_structure, _worker_version
+    _worker_structure = cls.__new__(cls)
+    for name, value in meta.items():
+        setattr(_worker_structure, name, value)
+    for name in cls._array_fields:
+        setattr(_worker_structure, name, None)  # Arrays that were not built stay None
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)  # Keep the mapping alive for the worker's lifetime
+        setattr(_worker_structure, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    block = shared_memory.SharedMemory(name=version_name)
+    _worker_blocks.append(block)
+    _worker_version = np.ndarray(1, dtype=np.int64, buffer=block.buf)
+
+
+def _serve(method: str, ls: np.ndarray, rs: np.ndarray):
+    """
+    Worker task: answer one chunk of a batched query against a single version.
+    
+    Returns:
+        tuple: The version the answers were computed against, and the answers.
+    """
+    while True:
+        before = int(_worker_version[0])
+        if before & 1:
+            time.sleep(0)  # A write batch is in progress; yield and retry
+            continue
+        res = getattr(_worker_structure, method)(ls, rs)
+        if int(_worker_version[0]) == before:
+            return before, res  # No write batch started while we were reading
+
+
+class SharedQueryPool:
+    def __init__(self, structure, workers: int = None):
+        """
+        Serve batched range queries from a pool of worker processes.
+        
+        The backing arrays of `structure` (e.g. a SegmentTree or SparseTable)
+        are copied once into shared memory; every worker maps the same pages,
+        so no data is copied per query.
+        
+        Consistency model: the creating process is the single writer. Each call
+        to `update_many` is one write batch and bumps a shared version counter
+        to an odd value before writing and to the next even value afterwards.
+        Workers read the counter before and after answering a chunk and retry if
+        it was odd or has changed, so every chunk reflects either all or none of
+        each write batch (per-batch versioning). A batched query whose chunks
+        were answered at different versions is re-run for the older chunks, so
+        every answer of one `query_*_many` call reflects the same version.
+        
+        Args:
+            structure: Built data structure exposing `_meta_fields` / `_array_fields`.
+            workers (int): Number of worker processes (defaults to the CPU count).
+        """
+        self.workers = workers or mp.cpu_count()
+        self._blocks = []
+        cls = type(structure)
+        meta = {name: getattr(structure, name) for name in structure._meta_fields}
+        
+        # Copy each backing array into its own shared memory block
+        spec = {}
+        self.structure = cls.__new__(cls)  # Writer-side view over the shared arrays
+        for name, value in meta.items():
+            setattr(self.structure, name, value)
+        for name in structure._array_fields:
+            if getattr(structure, name) is None:
+                setattr(self.structure, name, None)  # Aggregate not built
+                continue
+            array = np.ascontiguousarray(getattr(structure, name))
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            setattr(self.structure, name, view)
+            spec[name] = (block.name, array.shape, array.dtype.str)
+        
+        block = shared_memory.SharedMemory(create=True, size=8)
+        self._blocks.append(block)
+        self._version = np.ndarray(1, dtype=np.int64, buffer=block.buf)
+        self._version[0] = 0
+        self.last_version = 0  # Version the last batched query was answered at
+        
+        self._pool = mp.Pool(self.workers, initializer=_attach, initargs=(cls, meta, spec, block.name))
+
+    @property
+    def version(self) -> int:
+        """
+        Number of write batches applied so far.
+        """
+        return int(self._version[0]) >> 1
+
+    def update_many(self, indices: np.ndarray, values: np.ndarray):
+        """
+        Apply one write batch of point updates, visible to workers atomically.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+        """
+        if not hasattr(self.structure, "update_many"):
+            raise TypeError(f"{type(self.structure).__name__} does not support updates")
+        self._version[0] += 1  # Odd: write in progress
+        try:
+            self.structure.update_many(indices, values)
+        finally:
+            self._version[0] += 1  # Even: batch complete
+
+    def _map(self, method: str, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Split a batch of ranges across the workers and gather the answers.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        chunks = [(method, l, r) for l, r in zip(np.array_split(ls, self.workers), np.array_split(rs, self.workers)) if len(l)]
+        if not chunks:
+            return getattr(self.structure, method)(ls, rs)
+        results = self._pool.starmap(_serve, chunks)
+        while True:
+            # Re-run chunks answered before the newest write batch seen by any chunk
+            latest = max(version for version, _ in results)
+            stale = [k for k, (version, _) in enumerate(results) if version != latest]
+            if not stale:
+                break
+            for k, result in zip(stale, self._pool.starmap(_serve, [chunks[k] for k in stale])):
+                results[k] = result
+        self.last_version = latest >> 1
+        return np.concatenate([res for _, res in results])
+
+    def query_sum_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the sums of values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Sum of values in each range.
+        """
+        return self._map("query_sum_many", ls, rs)
+
+    def query_max_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the maximum values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Maximum value in each range.
+        """
+        return self._map("query_max_many", ls, rs)
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory.
+        """
+        self._pool.terminate()
+        self._pool.join()
+        self.structure = None
+        self._version = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
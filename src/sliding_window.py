@@ -0,0 +1,157 @@
+#
+#  sliding_window.py
+#  Advanced Data Structure
+#
+#  Streaming bandwidth monitor over the last W intervals.
+#
+
+import numpy as np
+
+from src.fenwick_tree import FenwickTree
+from src.segment_tree import SegmentTree
+
+class SlidingWindowMonitor:
+    def __init__(self, capacity: int, backend: str = "segment"):
+        """
+        Initialize a monitor that keeps only the most recent `capacity` values.
+        
+        Values are stored in a fixed-size tree used as a ring buffer: the value
+        appended at stream position t lives at slot t % capacity, so memory
+        stays fixed no matter how long the stream runs.
+        
+        Args:
+            capacity (int): Window size W (number of most recent intervals kept).
+            backend (str): "segment" (sum and max) or "fenwick" (sum only).
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        if backend == "segment":
+            self.tree = SegmentTree(np.zeros(capacity, dtype=np.int64))
+        elif backend == "fenwick":
+            self.tree = FenwickTree(np.zeros(capacity, dtype=np.int64))
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.capacity = capacity
+        self.backend = backend
+        self.count = 0  # Total number of values appended so far
+
+    def __len__(self) -> int:
+        """
+        Number of values currently in the window.
+        """
+        return min(self.count, self.capacity)
+
+    def append(self, value: int):
+        """
+        Append one value to the stream, evicting the oldest if the window is full.
+        
+        Args:
+            value (int): New value (e.g. bandwidth of the latest interval).
+        """
+        self.tree.update(self.count % self.capacity, value)
+        self.count += 1
+
+    def extend(self, values: np.ndarray):
+        """
+        Append a batch of values to the stream in one batched update.
+        
+        Args:
+            values (np.ndarray): New values, oldest first.
+        """
+        values = np.asarray(values)
+        if len(values) > self.capacity:
+            # Only the last `capacity` values can still be in the window
+            self.count += len(values) - self.capacity
+            values = values[-self.capacity:]
+        slots = (self.count + np.arange(len(values))) % self.capacity
+        self.tree.update_many(slots, values)
+        self.count += len(values)
+
+    def _slots(self, l: np.ndarray, r: np.ndarray):
+        """
+        Map window-relative ranges to ring-buffer slots.
+        
+        Returns:
+            tuple: Physical start and end slots, and a mask of ranges that wrap around.
+        """
+        if np.any(l < 0) or np.any(r < l) or np.any(r >= len(self)):
+            raise IndexError(f"Range out of window (window holds {len(self)} values)")
+        start = (self.count - len(self)) % self.capacity  # Slot of the oldest value
+        pl = (start + l) % self.capacity
+        pr = (start + r) % self.capacity
+        return pl, pr, pl > pr
+
+    def query_sum(self, l: int, r: int) -> int:
+        """
+        Compute the sum of values in the window range [l, r].
+        
+        Args:
+            l (int): Start index (0 = oldest value in the window).
+            r (int): End index (len(self) - 1 = newest value).
+        
+        Returns:
+            int: Sum of values in the range.
+        """
+        pl, pr, wraps = self._slots(l, r)
+        if wraps:
+            return self.tree.query_sum(pl, self.capacity - 1) + self.tree.query_sum(0, pr)  # Split at the end of the buffer
+        return self.tree.query_sum(pl, pr)
+
+    def query_max(self, l: int, r: int) -> int:
+        """
+        Compute the maximum value in the window range [l, r].
+        
+        Args:
+            l (int): Start index (0 = oldest value in the window).
+            r (int): End index (len(self) - 1 = newest value).
+        
+        Returns:
+            int: Maximum value in the range.
+        """
+        self._require_max()
+        pl, pr, wraps = self._slots(l, r)
+        if wraps:
+            return max(self.tree.query_max(pl, self.capacity - 1), self.tree.query_max(0, pr))  # Split at the end of the buffer
+        return self.tree.query_max(pl, pr)
+
+    def query_sum_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the sums of values for a batch of window ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0 = oldest value in the window).
+            rs (np.ndarray): End indices (len(self) - 1 = newest value).
+        
+        Returns:
+            np.ndarray: Sum of values in each range.
+        """
+        pl, pr, wraps = self._slots(np.asarray(ls, dtype=np.int64), np.asarray(rs, dtype=np.int64))
+        res = self.tree.query_sum_many(pl, np.where(wraps, self.capacity - 1, pr))
+        if wraps.any():
+            res[wraps] += self.tree.query_sum_many(np.zeros(wraps.sum(), dtype=np.int64), pr[wraps])
+        return res
+
+    def query_max_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the maximum values for a batch of window ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0 = oldest value in the window).
+            rs (np.ndarray): End indices (len(self) - 1 = newest value).
+        
+        Returns:
+            np.ndarray: Maximum value in each range.
+        """
+        self._require_max()
+        pl, pr, wraps = self._slots(np.asarray(ls, dtype=np.int64), np.asarray(rs, dtype=np.int64))
+        res = self.tree.query_max_many(pl, np.where(wraps, self.capacity - 1, pr))
+        if wraps.any():
+            res[wraps] = np.maximum(res[wraps], self.tree.query_max_many(np.zeros(wraps.sum(), dtype=np.int64), pr[wraps]))
+        return res
+
+    def _require_max(self):
+        """
+        Max queries need the segment tree backend.
+        """
+        if self.backend != "segment":
+            raise ValueError("Max queries require the 'segment' backend")
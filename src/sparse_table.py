@@ -7,31 +7,62 @@
 
 import numpy as np
 import math
-from tqdm import tqdm
 
-class SparseTable:
-    def __init__(self, data: np.ndarray):
+from src.array_utils import ARG_OPS, IDEMPOTENT_OPS, ChunkRunner, check_fits, dedupe_updates, lowest_value, pack_arg, unpack_arg
+from src.persistence import SnapshotMixin
+from src.profiling import ProfiledMixin
+
+def _floor_log2(values: np.ndarray) -> np.ndarray:
+    """
+    Compute floor(log2(x)) element-wise for positive integers.
+    """
+    k = np.log2(values).astype(np.int64)
+    k -= (1 << k) > values  # Guard against log2 rounding up just below a power of 2
+    return k
+
+
+class SparseTable(SnapshotMixin, ProfiledMixin):
+    _meta_fields = ("n", "k")
+    _array_fields = ("st",)
+
+    def __init__(self, data: np.ndarray, progress: bool = False, profiler=None, workers: int = None):
         """
         Initialize the Sparse Table with the given data.
         
+        With `workers`, each level is split into column slices built on that
+        many threads; a level only reads the previous one, so the slices are
+        independent.
+        
         Args:
             data (np.ndarray): Input array to build the Sparse Table.
+            progress (bool): Show a progress bar over the build levels.
+            profiler (Profiler): Optional profiler for build timings and node counts.
+            workers (int): Number of build threads (default: build serially).
         """
+        self.profiler = profiler
         self.n = len(data)
         self.k = math.floor(math.log2(self.n)) + 1
         self.st = np.zeros((self.k, self.n), dtype=data.dtype)
         
-        # Fill the first level (j=0)
-        self.st[0] = data
+        def fill_first(start, stop):
+            self.st[0, start:stop] = data[start:stop]
+        
+        def build_windows(j, start, stop):
+            # Each level is the max of two shifted slices of the previous level
+            half = 1 << (j - 1)
+            np.maximum(self.st[j-1, start:stop], self.st[j-1, start + half:stop + half], out=self.st[j, start:stop])
         
-        # Initialize progress bar for levels
-        with tqdm(total=self.k - 1, desc="Initializing Sparse Table", leave=False) as pbar:
-            for j in range(1, self.k):
-                # Calculate the maximum i for current j
-                max_i = self.n - (1 << j)
-                for i in range(max_i + 1):
-                    self.st[j, i] = max(self.st[j-1, i], self.st[j-1, i + (1 << (j-1))])
-                pbar.update(1)
+        levels = range(1, self.k)
+        if progress:
+            from tqdm import tqdm
+            levels = tqdm(levels, desc="Initializing Sparse Table", leave=False)
+        with ChunkRunner(workers) as runner:
+            # Fill the first level (j=0)
+            runner.run(fill_first, 0, self.n)
+            with self._phase("levels"):
+                for j in levels:
+                    width = self.n - (1 << j) + 1  # Number of valid windows of length 2^j
+                    runner.run(lambda start, stop: build_windows(j, start, stop), 0, width)
 
 
     def query_max(self, l: int, r: int) -> int:
@@ -45,8 +76,282 @@ class SparseTable:
         Returns:
             int: Maximum value in the range.
         """
+        if self.profiler is not None:
+            self.profiler.count("query_max", 2)  # Two overlapping windows
         length = r - l + 1  # Length of the range
         k = math.floor(math.log2(length))  # Find the largest power of 2 <= length
         # Compute max of two overlapping ranges covering [l, r]
         return max(self.st[k, l], self.st[k, r - (1 << k) + 1])
 
+    def query_max_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the maximum values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Maximum value in each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        k = _floor_log2(rs - ls + 1)  # Largest power of 2 <= length, per range
+        return np.maximum(self.st[k, ls], self.st[k, rs - (1 << k) + 1])
+
+    def _refresh_windows(self, lo: int, hi: int) -> int:
+        """
+        Number of windows `_refresh(lo, hi)` recomputes.
+        """
+        windows = 0
+        for j in range(1, self.k):
+            width = self.n - (1 << j) + 1
+            windows += max(0, min(hi, width - 1) + 1 - max(0, lo - (1 << j) + 1))
+        return windows
+
+    def _refresh(self, lo: int, hi: int):
+        """
+        Recompute every window that covers a changed entry of level 0.
+        
+        The caller has already written the new values to st[0, lo:hi + 1].
+        Level j has up to 2^j + (hi - lo) affected windows, so this is
+        O(n) in the worst case and meant for small tables.
+        """
+        for j in range(1, self.k):
+            half = 1 << (j - 1)
+            width = self.n - (1 << j) + 1  # Number of valid windows of length 2^j
+            i0 = max(0, lo - (1 << j) + 1)  # First window that reaches lo
+            i1 = min(hi, width - 1) + 1  # One past the last window that starts <= hi
+            if i0 < i1:
+                np.maximum(self.st[j-1, i0:i1], self.st[j-1, i0 + half:i1 + half], out=self.st[j, i0:i1])
+
+
+class BlockSparseTable(ProfiledMixin):
+    def __init__(self, data: np.ndarray, block_size: int = 64, profiler=None):
+        """
+        Initialize a block-decomposed Sparse Table with O(n) extra space.
+        
+        The data is split into blocks of `block_size` elements. Each block keeps
+        its in-block prefix and suffix maxima, and a regular Sparse Table is built
+        over the per-block maxima only.
+        
+        Unlike SparseTable it accepts point updates: only the affected block and
+        the summary windows covering it are recomputed, in O(block_size + n / block_size).
+        
+        Args:
+            data (np.ndarray): Input array to build the Sparse Table.
+            block_size (int): Number of elements per block.
+            profiler (Profiler): Optional profiler for build timings and node counts.
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be a positive integer")
+        self.profiler = profiler
+        self.n = len(data)
+        self.block_size = block_size
+        self.num_blocks = -(-self.n // block_size)  # Ceiling division
+        self.data = np.array(data, copy=True)
+        
+        # Pad the last block with the smallest representable value so it never wins a max
+        padded = np.full(self.num_blocks * block_size, lowest_value(self.data.dtype), dtype=self.data.dtype)
+        padded[:self.n] = self.data
+        blocks = padded.reshape(self.num_blocks, block_size)
+        
+        with self._phase("blocks"):
+            prefix = np.maximum.accumulate(blocks, axis=1)  # Max from block start to i
+            suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]  # Max from i to block end
+            self.prefix_max = prefix.reshape(-1)[:self.n].copy()
+            self.suffix_max = suffix.reshape(-1)[:self.n].copy()
+        
+        # Sparse Table over the per-block maxima (its level 0 holds the block maxima)
+        with self._phase("summary"):
+            self.summary = SparseTable(prefix[:, -1].copy())
+
+    def _memory_arrays(self) -> dict:
+        """
+        Backing arrays, including the summary table over block maxima.
+        """
+        return {"data": self.data, "prefix_max": self.prefix_max,
+                "suffix_max": self.suffix_max, "summary": self.summary.st}
+
+    def _rebuild_blocks(self, blocks: np.ndarray):
+        """
+        Recompute prefix/suffix maxima and summary entries for the given blocks.
+        
+        Args:
+            blocks (np.ndarray): Sorted, distinct block numbers.
+        """
+        offsets = blocks[:, None] * self.block_size + np.arange(self.block_size)  # Positions, one row per block
+        valid = offsets < self.n  # The last block may be partial
+        values = np.where(valid, self.data[np.minimum(offsets, self.n - 1)], lowest_value(self.data.dtype))
+        prefix = np.maximum.accumulate(values, axis=1)
+        suffix = np.maximum.accumulate(values[:, ::-1], axis=1)[:, ::-1]
+        self.prefix_max[offsets[valid]] = prefix[valid]
+        self.suffix_max[offsets[valid]] = suffix[valid]
+        
+        self.summary.st[0, blocks] = prefix[:, -1]  # New block maxima
+        self.summary._refresh(int(blocks[0]), int(blocks[-1]))
+
+    def update(self, index: int, value: int):
+        """
+        Update the value at the specified index.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+        """
+        if self.profiler is not None:
+            block = index // self.block_size
+            self.profiler.count("update", self.block_size + 1 + self.summary._refresh_windows(block, block))
+        self.data[index] = value
+        self._rebuild_blocks(np.array([index // self.block_size]))
+
+    def update_many(self, indices: np.ndarray, values: np.ndarray):
+        """
+        Update a batch of values; each affected block is rebuilt once.
+        
+        Args:
+            indices (np.ndarray): Indices to update (0-based).
+            values (np.ndarray): New values, aligned with `indices`.
+        """
+        indices, values = dedupe_updates(indices, values)
+        if len(indices) == 0:
+            return
+        check_fits(values, self.data.dtype, "data")
+        self.data[indices] = values
+        self._rebuild_blocks(np.unique(indices // self.block_size))
+
+    def query_max(self, l: int, r: int) -> int:
+        """
+        Compute the maximum value in the range [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            int: Maximum value in the range.
+        """
+        bl = l // self.block_size  # Block containing l
+        br = r // self.block_size  # Block containing r
+        if self.profiler is not None:
+            # Scanned elements inside one block, else two partial-block entries plus two summary windows
+            self.profiler.count("query_max", r - l + 1 if bl == br else 2 + 2 * (br - bl > 1))
+        if bl == br:
+            return self.data[l:r + 1].max()  # Range lies inside a single block
+        res = max(self.suffix_max[l], self.prefix_max[r])  # Partial blocks at both ends
+        if br - bl > 1:
+            res = max(res, self.summary.query_max(bl + 1, br - 1))  # Whole blocks in between
+        return res
+
+    def query_max_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Compute the maximum values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Maximum value in each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        bl = ls // self.block_size
+        br = rs // self.block_size
+        res = np.empty(len(ls), dtype=self.data.dtype)
+        
+        # Ranges inside a single block: gather block_size positions per range,
+        # clipped to r so positions past the range just repeat data[r]
+        inner = bl == br
+        if inner.any():
+            li, ri = ls[inner], rs[inner]
+            positions = np.minimum(li[:, None] + np.arange(self.block_size), ri[:, None])
+            res[inner] = self.data[positions].max(axis=1)
+        
+        # Ranges crossing blocks: partial blocks at both ends plus whole blocks in between
+        outer = ~inner
+        res[outer] = np.maximum(self.suffix_max[ls[outer]], self.prefix_max[rs[outer]])
+        middle = br - bl > 1
+        if middle.any():
+            res[middle] = np.maximum(res[middle], self.summary.query_max_many(bl[middle] + 1, br[middle] - 1))
+        return res
+
+
+class MonoidSparseTable:
+    def __init__(self, data: np.ndarray, op=np.maximum, progress: bool = False):
+        """
+        Initialize a Sparse Table over an arbitrary idempotent operation.
+        
+        Queries combine two overlapping windows, so `op` must satisfy
+        x op x == x: np.maximum, np.minimum, np.gcd, np.bitwise_and, ...
+        Passing "argmax" / "argmin" packs each value with its index (see
+        `pack_arg`); queries then return the index of the leftmost extreme.
+        
+        Args:
+            data (np.ndarray): Input array to build the Sparse Table.
+            op: Idempotent binary ufunc, or "argmax" / "argmin".
+            progress (bool): Show a progress bar over the build levels.
+        """
+        data = np.asarray(data)
+        self.mode = op if isinstance(op, str) else None
+        if self.mode is not None:
+            if self.mode not in ARG_OPS:
+                raise ValueError(f"Unknown mode: {self.mode}")
+            self.op = ARG_OPS[self.mode]
+            data = pack_arg(data, np.arange(len(data)), self.mode)
+        elif op in IDEMPOTENT_OPS:
+            self.op = op
+        else:
+            raise ValueError(f"{op.__name__} is not idempotent; use MonoidSegmentTree instead")
+        
+        self.n = len(data)
+        self.k = math.floor(math.log2(self.n)) + 1
+        self.st = np.zeros((self.k, self.n), dtype=data.dtype)
+        self.st[0] = data
+        levels = range(1, self.k)
+        if progress:
+            from tqdm import tqdm
+            levels = tqdm(levels, desc="Initializing Monoid Sparse Table", leave=False)
+        for j in levels:
+            half = 1 << (j - 1)
+            width = self.n - (1 << j) + 1  # Number of valid windows of length 2^j
+            self.op(self.st[j-1, :width], self.st[j-1, half:half + width], out=self.st[j, :width])
+
+    def _decode(self, result):
+        """
+        Convert query results back to values (or indices in arg modes).
+        """
+        if self.mode is not None:
+            return unpack_arg(result, self.mode)
+        return result
+
+    def query(self, l: int, r: int):
+        """
+        Combine the values in the range [l, r] with the table's operation.
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+        
+        Returns:
+            Aggregated value (index of the extreme in arg modes).
+        """
+        length = r - l + 1  # Length of the range
+        k = math.floor(math.log2(length))  # Find the largest power of 2 <= length
+        return self._decode(self.op(self.st[k, l], self.st[k, r - (1 << k) + 1]))
+
+    def query_many(self, ls: np.ndarray, rs: np.ndarray) -> np.ndarray:
+        """
+        Combine the values for a batch of ranges [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+        
+        Returns:
+            np.ndarray: Aggregated value (index in arg modes) for each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        k = _floor_log2(rs - ls + 1)  # Largest power of 2 <= length, per range
+        return self._decode(self.op(self.st[k, ls], self.st[k, rs - (1 << k) + 1]))
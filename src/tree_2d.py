@@ -0,0 +1,259 @@
+#
+#  tree_2d.py
+#  Advanced Data Structure
+#
+#  2D Fenwick Tree and 2D Segment Tree for host x interval matrices.
+#
+
+import operator
+
+import numpy as np
+
+from src.array_utils import lowest_value
+from src.segment_tree import AGGREGATES, _level_chunks
+
+
+def _lsb_difference(prefix: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Compute out[i] = prefix[i] - prefix[i - lsb(i)] along `axis` (1-based, out[0] = 0).
+    
+    Applied to a prefix-sum array this yields the Fenwick tree along that axis,
+    one vectorized step per LSB class.
+    """
+    prefix = np.moveaxis(prefix, axis, 0)
+    out = np.zeros_like(prefix)
+    n = len(prefix) - 1
+    for j in range(n.bit_length()):
+        # Indices whose LSB is 2^j: step, 3 * step, 5 * step, ...
+        step = 1 << j
+        count = len(range(step, n + 1, 2 * step))
+        out[step::2 * step] = prefix[step::2 * step] - prefix[0::2 * step][:count]
+    return np.moveaxis(out, 0, axis)
+
+
+class FenwickTree2D:
+    def __init__(self, data: np.ndarray):
+        """
+        Initialize a 2D Fenwick Tree over a (rows, cols) matrix.
+        
+        Node (i, j) (1-based) holds the sum of the block
+        (i - lsb(i), i] x (j - lsb(j), j], so the tree is built from the 2D
+        prefix sums with one LSB difference along each axis.
+        
+        Args:
+            data (np.ndarray): 2D input array, e.g. hosts x intervals.
+        """
+        data = np.asarray(data)
+        if data.ndim != 2:
+            raise ValueError("FenwickTree2D expects a 2D array")
+        self.rows, self.cols = data.shape
+        prefix = np.zeros((self.rows + 1, self.cols + 1), dtype=np.int64)  # 1-based indexing
+        np.cumsum(np.cumsum(data, axis=0, dtype=np.int64), axis=1, out=prefix[1:, 1:])
+        self.tree = _lsb_difference(_lsb_difference(prefix, 0), 1)
+
+    def add(self, row: int, col: int, delta: int):
+        """
+        Add `delta` to the value at (row, col).
+        
+        Args:
+            row (int): Row index (0-based).
+            col (int): Column index (0-based).
+            delta (int): Amount to add.
+        """
+        i = row + 1  # Convert to 1-based index
+        while i <= self.rows:
+            j = col + 1
+            while j <= self.cols:
+                self.tree[i, j] += delta  # Update current node
+                j += j & -j  # Move to next column node using LSB
+            i += i & -i  # Move to next row node using LSB
+
+    def update(self, row: int, col: int, value: int):
+        """
+        Update the value at (row, col).
+        
+        Args:
+            row (int): Row index (0-based).
+            col (int): Column index (0-based).
+            value (int): New value.
+        """
+        self.add(row, col, value - self.query_sum(row, row, col, col))
+
+    def query_prefix(self, row: int, col: int) -> int:
+        """
+        Compute the sum of the rectangle [0, row] x [0, col].
+        
+        Args:
+            row (int): Last row (0-based).
+            col (int): Last column (0-based).
+        
+        Returns:
+            int: Sum of the rectangle.
+        """
+        res = 0
+        i = row + 1  # Convert to 1-based index
+        while i > 0:
+            j = col + 1
+            while j > 0:
+                res += self.tree[i, j]  # Add current node value
+                j -= j & -j  # Move to parent column node using LSB
+            i -= i & -i  # Move to parent row node using LSB
+        return res
+
+    def query_sum(self, r1: int, r2: int, c1: int, c2: int) -> int:
+        """
+        Compute the sum of the rectangle [r1, r2] x [c1, c2].
+        
+        Args:
+            r1 (int): First row (0-based).
+            r2 (int): Last row (0-based).
+            c1 (int): First column (0-based).
+            c2 (int): Last column (0-based).
+        
+        Returns:
+            int: Sum of the rectangle.
+        """
+        return (self.query_prefix(r2, c2) - self.query_prefix(r1 - 1, c2)
+                - self.query_prefix(r2, c1 - 1) + self.query_prefix(r1 - 1, c1 - 1))
+
+
+class SegmentTree2D:
+    def __init__(self, data: np.ndarray, aggregates: tuple = AGGREGATES):
+        """
+        Initialize a 2D Segment Tree (a segment tree of segment trees).
+        
+        Both axes use the non-power-of-two layout: node (i, j) with
+        rows >= i >= 1 and cols >= j >= 1 covers the row range of row-node i
+        and the column range of column-node j. All nodes share one contiguous
+        (2 * rows, 2 * cols) array per aggregate.
+        
+        Args:
+            data (np.ndarray): 2D input array, e.g. hosts x intervals.
+            aggregates (tuple): Aggregates to build: any of "sum" and "max".
+        """
+        data = np.asarray(data)
+        if data.ndim != 2:
+            raise ValueError("SegmentTree2D expects a 2D array")
+        unknown = set(aggregates) - set(AGGREGATES)
+        if unknown or not aggregates:
+            raise ValueError(f"aggregates must be a non-empty subset of {AGGREGATES}")
+        self.rows, self.cols = data.shape
+        self.tree_sum = None  # Sum tree
+        self.tree_max = None  # Max tree
+        if "sum" in aggregates:
+            self.tree_sum = self._build(data.astype(np.int64), np.add)
+        if "max" in aggregates:
+            self.tree_max = self._build(data, np.maximum)
+
+    def _build(self, data: np.ndarray, op) -> np.ndarray:
+        """
+        Build one aggregate: column trees for the leaf rows, then combine rows.
+        """
+        R, C = self.rows, self.cols
+        tree = np.zeros((2 * R, 2 * C), dtype=data.dtype)
+        tree[R:, C:] = data  # Fill leaves with data
+        for lo, hi in _level_chunks(C):
+            op(tree[R:, 2*lo:2*hi:2], tree[R:, 2*lo+1:2*hi:2], out=tree[R:, lo:hi])  # Column trees of leaf rows
+        for lo, hi in _level_chunks(R):
+            op(tree[2*lo:2*hi:2], tree[2*lo+1:2*hi:2], out=tree[lo:hi])  # Whole column trees of internal rows
+        return tree
+
+    def _require(self, tree: np.ndarray, name: str) -> np.ndarray:
+        """
+        Return `tree`, or raise if its aggregate was not built.
+        """
+        if tree is None:
+            raise ValueError(f"Segment Tree was built without the '{name}' aggregate")
+        return tree
+
+    def update(self, row: int, col: int, value: int):
+        """
+        Update the value at (row, col).
+        
+        Args:
+            row (int): Row index (0-based).
+            col (int): Column index (0-based).
+            value (int): New value.
+        """
+        # Column nodes on the path from the leaf to the root
+        path = [col + self.cols]
+        while path[-1] > 1:
+            path.append(path[-1] >> 1)
+        path = np.array(path)
+        
+        for tree, op in ((self.tree_sum, np.add), (self.tree_max, np.maximum)):
+            if tree is None:
+                continue
+            pos = row + self.rows  # Leaf row
+            tree[pos, path[0]] = value
+            for c in path[1:]:
+                tree[pos, c] = op(tree[pos, 2*c], tree[pos, 2*c+1])  # Recompute column path in the leaf row
+            while pos > 1:
+                pos >>= 1  # Move to parent row
+                tree[pos, path] = op(tree[2*pos, path], tree[2*pos+1, path])  # Recompute the same column path
+
+    def _query(self, tree: np.ndarray, r1: int, r2: int, c1: int, c2: int, op, identity):
+        """
+        Combine every canonical row node's 1D column query.
+        """
+        res = identity
+        l, r = r1 + self.rows, r2 + self.rows  # Convert to leaf rows
+        while l <= r:
+            if l % 2 == 1:
+                res = op(res, self._query_row(tree[l], c1, c2, op, identity))  # Take left row node
+                l += 1
+            if r % 2 == 0:
+                res = op(res, self._query_row(tree[r], c1, c2, op, identity))  # Take right row node
+                r -= 1
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+        return res
+
+    def _query_row(self, row: np.ndarray, c1: int, c2: int, op, identity):
+        """
+        Standard 1D bottom-up query over one row's column tree.
+        """
+        res = identity
+        l, r = c1 + self.cols, c2 + self.cols  # Convert to leaf columns
+        while l <= r:
+            if l % 2 == 1:
+                res = op(res, row[l])  # Take left child
+                l += 1
+            if r % 2 == 0:
+                res = op(res, row[r])  # Take right child
+                r -= 1
+            l >>= 1  # Move to parent
+            r >>= 1  # Move to parent
+        return res
+
+    def query_sum(self, r1: int, r2: int, c1: int, c2: int) -> int:
+        """
+        Compute the sum of the rectangle [r1, r2] x [c1, c2].
+        
+        Args:
+            r1 (int): First row (0-based).
+            r2 (int): Last row (0-based).
+            c1 (int): First column (0-based).
+            c2 (int): Last column (0-based).
+        
+        Returns:
+            int: Sum of the rectangle.
+        """
+        tree = self._require(self.tree_sum, "sum")
+        return self._query(tree, r1, r2, c1, c2, operator.add, 0)
+
+    def query_max(self, r1: int, r2: int, c1: int, c2: int) -> int:
+        """
+        Compute the maximum value in the rectangle [r1, r2] x [c1, c2].
+        
+        Args:
+            r1 (int): First row (0-based).
+            r2 (int): Last row (0-based).
+            c1 (int): First column (0-based).
+            c2 (int): Last column (0-based).
+        
+        Returns:
+            int: Maximum value in the rectangle.
+        """
+        tree = self._require(self.tree_max, "max")
+        return self._query(tree, r1, r2, c1, c2, max, lowest_value(tree.dtype))
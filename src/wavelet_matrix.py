@@ -0,0 +1,267 @@
+#
+#  wavelet_matrix.py
+#  Advanced Data Structure
+#
+#  Wavelet Matrix for range counting and order statistics.
+#
+
+import numpy as np
+
+from src.persistence import SnapshotMixin
+from src.profiling import ProfiledMixin
+
+class WaveletMatrix(SnapshotMixin, ProfiledMixin):
+    _meta_fields = ("n", "bits")
+    _array_fields = ("sorted_values", "ones", "zeros")
+
+    def __init__(self, data: np.ndarray, progress: bool = False, profiler=None):
+        """
+        Initialize a Wavelet Matrix over the given data.
+        
+        Values are replaced by their rank among the distinct values (σ of
+        them), which takes `bits` = ceil(log2 σ) bits. Level j holds bit
+        `bits - 1 - j` of every rank, after the ranks were stably partitioned
+        by the higher bits, plus its prefix counts of ones, so every query
+        descends `bits` levels with O(1) work each: O(log σ) per query.
+        
+        Args:
+            data (np.ndarray): Input array to build the Wavelet Matrix.
+            progress (bool): Show a progress bar over the build levels.
+            profiler (Profiler): Optional profiler for build timings and node counts.
+        """
+        self.profiler = profiler
+        data = np.asarray(data)
+        self.n = len(data)
+        with self._phase("ranks"):
+            self.sorted_values, ranks = np.unique(data, return_inverse=True)  # Distinct values and ranks
+        self.bits = max(1, (len(self.sorted_values) - 1).bit_length())
+        count_dtype = np.int32 if self.n < 2**31 else np.int64
+        self.ones = np.zeros((self.bits, self.n + 1), dtype=count_dtype)  # ones[j, i]: ones in level j before i
+        self.zeros = np.zeros(self.bits, dtype=np.int64)  # Number of zeros in each level
+        
+        levels = range(self.bits)
+        if progress:
+            from tqdm import tqdm
+            levels = tqdm(levels, desc="Initializing Wavelet Matrix", leave=False)
+        x = ranks.astype(np.int64)
+        with self._phase("levels"):
+            for j in levels:
+                bit = (x >> (self.bits - 1 - j)) & 1
+                np.cumsum(bit, out=self.ones[j, 1:])
+                self.zeros[j] = self.n - self.ones[j, -1]
+                x = np.concatenate((x[bit == 0], x[bit == 1]))  # Stable partition: zeros first
+
+    def _rank(self, value) -> int:
+        """
+        Number of distinct values below `value` (the rank it would get).
+        """
+        return int(np.searchsorted(self.sorted_values, value, side="left"))
+
+    def _count_below(self, l: int, r: int, c: int) -> int:
+        """
+        Count ranks below `c` in positions [l, r).
+        """
+        if c >= 1 << self.bits:
+            return r - l
+        count = 0
+        for j in range(self.bits):
+            ones = self.ones[j]
+            ones_l, ones_r = int(ones[l]), int(ones[r])
+            if (c >> (self.bits - 1 - j)) & 1:
+                count += (r - l) - (ones_r - ones_l)  # Every rank with a 0 here is smaller
+                l, r = int(self.zeros[j]) + ones_l, int(self.zeros[j]) + ones_r  # Follow the ones
+            else:
+                l, r = l - ones_l, r - ones_r  # Follow the zeros
+        return count
+
+    def _count_below_many(self, ls: np.ndarray, rs: np.ndarray, cs: np.ndarray) -> np.ndarray:
+        """
+        Count ranks below cs[i] in positions [ls[i], rs[i]), all queries at once.
+        """
+        full = cs >= 1 << self.bits
+        count = np.zeros(len(ls), dtype=np.int64)
+        for j in range(self.bits):
+            ones_l = self.ones[j, ls].astype(np.int64)
+            ones_r = self.ones[j, rs].astype(np.int64)
+            bit = ((cs >> (self.bits - 1 - j)) & 1).astype(bool)
+            count += np.where(bit, (rs - ls) - (ones_r - ones_l), 0)
+            ls = np.where(bit, self.zeros[j] + ones_l, ls - ones_l)
+            rs = np.where(bit, self.zeros[j] + ones_r, rs - ones_r)
+        return np.where(full, rs - ls, count) if full.any() else count
+
+    def _check_range(self, l: int, r: int):
+        """
+        Raise if [l, r] is not a valid range.
+        """
+        if not 0 <= l <= r < self.n:
+            raise IndexError(f"Range [{l}, {r}] is outside [0, {self.n - 1}]")
+
+    def _check_ranges(self, ls: np.ndarray, rs: np.ndarray):
+        """
+        Raise if any [ls[i], rs[i]] is not a valid range.
+        """
+        bad = (ls < 0) | (ls > rs) | (rs >= self.n)
+        if bad.any():
+            i = int(np.argmax(bad))
+            raise IndexError(f"Range [{ls[i]}, {rs[i]}] is outside [0, {self.n - 1}]")
+
+    def count_less(self, l: int, r: int, threshold) -> int:
+        """
+        Count the values in [l, r] that are below `threshold`.
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            threshold: Value to compare against.
+        
+        Returns:
+            int: Number of values < threshold in the range.
+        """
+        self._check_range(l, r)
+        if self.profiler is not None:
+            self.profiler.count("count_less", self.bits)  # One rank lookup pair per level
+        return self._count_below(l, r + 1, self._rank(threshold))
+
+    def count_greater(self, l: int, r: int, threshold) -> int:
+        """
+        Count the values in [l, r] that exceed `threshold`.
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            threshold: Value to compare against.
+        
+        Returns:
+            int: Number of values > threshold in the range.
+        """
+        self._check_range(l, r)
+        if self.profiler is not None:
+            self.profiler.count("count_greater", self.bits)
+        at_most = int(np.searchsorted(self.sorted_values, threshold, side="right"))  # Ranks <= threshold
+        return (r - l + 1) - self._count_below(l, r + 1, at_most)
+
+    def count_greater_many(self, ls: np.ndarray, rs: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+        """
+        Count the values exceeding thresholds[i] in each range [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+            thresholds (np.ndarray): Value to compare against, per range.
+        
+        Returns:
+            np.ndarray: Number of values > threshold in each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        self._check_ranges(ls, rs)
+        rs = rs + 1  # Half-open
+        at_most = np.searchsorted(self.sorted_values, thresholds, side="right").astype(np.int64)
+        return (rs - ls) - self._count_below_many(ls, rs, at_most)
+
+    def kth_smallest(self, l: int, r: int, k: int):
+        """
+        Find the k-th smallest value (0-based k) in [l, r].
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            k (int): Order, 0 for the minimum up to r - l for the maximum.
+        
+        Returns:
+            The k-th smallest value in the range.
+        """
+        self._check_range(l, r)
+        if not 0 <= k <= r - l:
+            raise IndexError(f"k={k} is outside [0, {r - l}]")
+        if self.profiler is not None:
+            self.profiler.count("kth_smallest", self.bits)
+        r += 1  # Half-open
+        rank = 0
+        for j in range(self.bits):
+            ones = self.ones[j]
+            ones_l, ones_r = int(ones[l]), int(ones[r])
+            zeros = (r - l) - (ones_r - ones_l)  # Values with a 0 at this bit
+            if k < zeros:
+                l, r = l - ones_l, r - ones_r  # Answer is among the zeros
+            else:
+                k -= zeros
+                rank |= 1 << (self.bits - 1 - j)
+                l, r = int(self.zeros[j]) + ones_l, int(self.zeros[j]) + ones_r  # Among the ones
+        return self.sorted_values[rank]
+
+    def kth_largest(self, l: int, r: int, k: int):
+        """
+        Find the k-th largest value (0-based k) in [l, r].
+        """
+        self._check_range(l, r)
+        if not 0 <= k <= r - l:
+            raise IndexError(f"k={k} is outside [0, {r - l}]")
+        return self.kth_smallest(l, r, (r - l) - k)
+
+    def quantile(self, l: int, r: int, q: float):
+        """
+        Find the q-quantile of the values in [l, r] (lower value, no interpolation).
+        
+        Args:
+            l (int): Start index (0-based).
+            r (int): End index (0-based).
+            q (float): Quantile in [0, 1]; 0.5 gives the (lower) median.
+        
+        Returns:
+            The value at position floor(q * (r - l)) of the sorted range.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must lie in [0, 1]")
+        return self.kth_smallest(l, r, int(q * (r - l)))
+
+    def kth_smallest_many(self, ls: np.ndarray, rs: np.ndarray, ks: np.ndarray) -> np.ndarray:
+        """
+        Find the ks[i]-th smallest value (0-based) in each range [ls[i], rs[i]].
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+            ks (np.ndarray): Order per range, in [0, rs[i] - ls[i]].
+        
+        Returns:
+            np.ndarray: The k-th smallest value in each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        self._check_ranges(ls, rs)
+        rs = rs + 1  # Half-open
+        ks = np.array(ks, dtype=np.int64)
+        if np.any((ks < 0) | (ks >= rs - ls)):
+            raise IndexError("ks must lie in [0, rs - ls]")
+        rank = np.zeros(len(ls), dtype=np.int64)
+        for j in range(self.bits):
+            ones_l = self.ones[j, ls].astype(np.int64)
+            ones_r = self.ones[j, rs].astype(np.int64)
+            zeros = (rs - ls) - (ones_r - ones_l)
+            right = ks >= zeros  # Answer is among the ones
+            ks -= np.where(right, zeros, 0)
+            rank |= right.astype(np.int64) << (self.bits - 1 - j)
+            ls = np.where(right, self.zeros[j] + ones_l, ls - ones_l)
+            rs = np.where(right, self.zeros[j] + ones_r, rs - ones_r)
+        return self.sorted_values[rank]
+
+    def quantile_many(self, ls: np.ndarray, rs: np.ndarray, qs) -> np.ndarray:
+        """
+        Find the qs[i]-quantile of each range [ls[i], rs[i]] (lower value, no interpolation).
+        
+        Args:
+            ls (np.ndarray): Start indices (0-based).
+            rs (np.ndarray): End indices (0-based).
+            qs: Quantile per range in [0, 1], or one quantile for all ranges.
+        
+        Returns:
+            np.ndarray: The quantile of each range.
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        self._check_ranges(ls, rs)
+        qs = np.broadcast_to(np.asarray(qs, dtype=np.float64), ls.shape)
+        if np.any((qs < 0) | (qs > 1)):
+            raise ValueError("qs must lie in [0, 1]")
+        return self.kth_smallest_many(ls, rs, (qs * (rs - ls)).astype(np.int64))
@@ -0,0 +1,131 @@
+#
+#  workload.py
+#  Advanced Data Structure
+#
+#  Executor for interleaved read/write operation streams.
+#
+
+import time
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from src.generate_data import OP_NAMES, OP_QUERY_MAX, OP_QUERY_SUM, OP_UPDATE
+
+class MixedWorkloadExecutor:
+    def __init__(self, structure, max_pending: int = 4096):
+        """
+        Run interleaved updates and queries against a structure with batched writes.
+        
+        Updates are buffered and applied with one `update_many` call. A query
+        whose range contains a buffered index flushes the buffer first, so every
+        answer matches applying the stream one operation at a time; queries that
+        miss all buffered indices are answered immediately.
+        
+        Args:
+            structure: Structure with `update_many` and `query_sum` / `query_max`.
+            max_pending (int): Flush once this many distinct indices are buffered.
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be a positive integer")
+        self.structure = structure
+        self.max_pending = max_pending
+        self.pending = {}  # Buffered index -> latest value
+        self.pending_indices = []  # Sorted buffered indices, for overlap checks
+        self.flushes = 0  # Number of update_many calls
+
+    def update(self, index: int, value: int):
+        """
+        Buffer an update; flushes when the buffer is full.
+        
+        Args:
+            index (int): Index to update (0-based).
+            value (int): New value to set at the index.
+        """
+        if index not in self.pending:
+            insort(self.pending_indices, index)
+        self.pending[index] = value  # Last write wins
+        if len(self.pending) >= self.max_pending:
+            self.flush()
+
+    def overlaps(self, l: int, r: int) -> bool:
+        """
+        Check whether any buffered index lies in [l, r].
+        """
+        i = bisect_left(self.pending_indices, l)
+        return i < len(self.pending_indices) and self.pending_indices[i] <= r
+
+    def flush(self):
+        """
+        Apply all buffered updates with one batched call.
+        """
+        if not self.pending:
+            return
+        indices = np.array(self.pending_indices, dtype=np.int64)
+        values = np.array([self.pending[index] for index in self.pending_indices], dtype=np.int64)
+        self.structure.update_many(indices, values)
+        self.pending.clear()
+        self.pending_indices.clear()
+        self.flushes += 1
+
+    def query_sum(self, l: int, r: int) -> int:
+        """
+        Compute the sum of values in [l, r], flushing first if a buffered update overlaps.
+        """
+        if self.overlaps(l, r):
+            self.flush()
+        return self.structure.query_sum(l, r)
+
+    def query_max(self, l: int, r: int) -> int:
+        """
+        Compute the maximum value in [l, r], flushing first if a buffered update overlaps.
+        """
+        if self.overlaps(l, r):
+            self.flush()
+        return self.structure.query_max(l, r)
+
+    def run(self, operations: np.ndarray) -> dict:
+        """
+        Execute an operation array (see `generate_operation_array`) in order.
+        
+        The buffer is flushed at the end, so the structure reflects every update.
+        
+        Args:
+            operations (np.ndarray): Operations with dtype OPERATION_DTYPE.
+        
+        Returns:
+            dict: Query answers in stream order (`answers`), per-operation latencies
+            in ns (`latencies_ns`, aligned with `operations`), total seconds (`total_s`)
+            and the number of batched flushes (`flushes`).
+        """
+        flushes = self.flushes
+        handlers = {OP_UPDATE: self.update, OP_QUERY_SUM: self.query_sum, OP_QUERY_MAX: self.query_max}
+        clock = time.perf_counter_ns
+        latencies = np.empty(len(operations), dtype=np.int64)
+        answers = []
+        
+        start_time = time.perf_counter()
+        for k, (op, a, b) in enumerate(operations.tolist()):
+            t0 = clock()
+            result = handlers[op](a, b)
+            latencies[k] = clock() - t0
+            if op != OP_UPDATE:
+                answers.append(result)
+        self.flush()
+        total_s = time.perf_counter() - start_time
+        return {"answers": answers, "latencies_ns": latencies, "total_s": total_s,
+                "flushes": self.flushes - flushes}
+
+
+def summarize_run(operations: np.ndarray, run: dict) -> dict:
+    """
+    Reduce a `MixedWorkloadExecutor.run` result to throughput and latency per operation type.
+    """
+    summary = {"num_ops": len(operations), "ops_per_sec": len(operations) / run["total_s"],
+               "flushes": run["flushes"]}
+    for code, name in enumerate(OP_NAMES):
+        latencies = run["latencies_ns"][operations["op"] == code]
+        if len(latencies):
+            summary[f"{name}_p50_us"] = float(np.percentile(latencies, 50)) / 1e3
+            summary[f"{name}_p99_us"] = float(np.percentile(latencies, 99)) / 1e3
+    return summary
@@ -0,0 +1,73 @@
+#
+#  test_external_segment_tree.py
+#  Advanced Data Structure
+#
+#  Tests for the disk-backed Segment Tree.
+#
+
+import tempfile
+import unittest
+import numpy as np
+from src.external_segment_tree import ExternalSegmentTree
+
+class TestExternalSegmentTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        rng = np.random.default_rng(0)
+        self.data = rng.integers(0, 1000, size=300, dtype=np.int32)
+        # Small blocks, cache and pinned levels so most reads go through the cache
+        self.settings = {"cache_blocks": 4, "block_size": 8, "pinned_nodes": 4}
+        self.chunks = [self.data[i:i + 37] for i in range(0, 300, 37)]
+        self.tree = ExternalSegmentTree.build(self.tmp.name, self.chunks, 300, chunk_size=16, **self.settings)
+
+    def test_queries(self):
+        # Compare against brute force over ranges of every shape
+        for l, r in [(0, 299), (5, 5), (10, 200), (128, 255), (299, 299), (1, 298)]:
+            self.assertEqual(self.tree.query_sum(l, r), self.data[l:r + 1].sum())
+            self.assertEqual(self.tree.query_max(l, r), self.data[l:r + 1].max())
+
+    def test_update_and_reopen(self):
+        # Updates should survive eviction, flush and reopening
+        rng = np.random.default_rng(1)
+        expected = self.data.astype(np.int64)
+        for index, value in zip(rng.integers(0, 300, size=200), rng.integers(0, 5000, size=200)):
+            self.tree.update(int(index), int(value))
+            expected[index] = value
+        self.assertEqual(self.tree.query_sum(0, 299), expected.sum())
+        self.assertEqual(self.tree.query_max(17, 123), expected[17:124].max())
+        self.tree.close()
+        with ExternalSegmentTree(self.tmp.name, **self.settings) as tree:
+            self.assertEqual(tree.query_sum(3, 250), expected[3:251].sum())
+            self.assertEqual(tree.query_max(0, 299), expected.max())
+
+    def test_update_overflow(self):
+        # 2^40 fits the int64 sums but not the int32 maxima, so neither aggregate may change
+        with self.assertRaises(OverflowError):
+            self.tree.update(7, 2**40)
+        self.assertEqual(self.tree.query_sum(0, 299), self.data.astype(np.int64).sum())
+        self.assertEqual(self.tree.query_max(0, 299), self.data.max())
+        self.assertEqual(self.tree.query_sum(7, 7), self.data[7])
+
+    def test_cache_stats(self):
+        # Repeating a query should hit the cache
+        self.tree.query_sum(40, 60)
+        self.tree.reset_stats()
+        self.tree.query_sum(40, 60)
+        stats = self.tree.cache_stats()
+        self.assertEqual(stats["misses"], 0)
+        self.assertEqual(stats["hit_rate"], 1.0)
+        self.assertLessEqual(stats["cached_blocks"], 4)
+        self.assertEqual(stats["pinned_levels"], 3)
+
+    def test_build_from_array(self):
+        # A single array should be split into chunks; only requested aggregates are built
+        tree = ExternalSegmentTree.build(self.tmp.name + "/max", self.data, 300, aggregates=("max",), chunk_size=64)
+        self.assertEqual(tree.query_max(0, 299), self.data.max())
+        with self.assertRaises(ValueError):
+            tree.query_sum(0, 1)
+        with self.assertRaises(ValueError):
+            ExternalSegmentTree.build(self.tmp.name + "/bad", self.chunks, 301)
+
+if __name__ == "__main__":
+    unittest.main()
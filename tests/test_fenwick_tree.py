@@ -6,13 +6,19 @@
 #
 
 
+import tempfile
 import unittest
 import numpy as np
-from src.fenwick_tree import FenwickTree
+from src import backend
+from src.fenwick_tree import FenwickTree, RangeFenwickTree
 
 
 class TestFenwickTree(unittest.TestCase):
+    backend = "python"
+
     def setUp(self):
+        previous = backend.set_backend(self.backend)
+        self.addCleanup(backend.set_backend, previous)
         self.data = [1, 2, 3, 4, 5]
         self.fenwick = FenwickTree(np.array(self.data, dtype=np.int32))
 
@@ -28,3 +34,143 @@ class TestFenwickTree(unittest.TestCase):
         self.fenwick.update(2, 10)
         self.assertEqual(self.fenwick.query_sum(0, 4), 22)  # Sum of [1, 2, 10, 4, 5]
         self.assertEqual(self.fenwick.query_sum(2, 2), 10)  # Sum of [10]
+
+    def test_query_sum_many(self):
+        # Batched sums should match the scalar queries
+        ls = np.array([0, 0, 0, 2, 4])
+        rs = np.array([0, 1, 4, 4, 4])
+        np.testing.assert_array_equal(self.fenwick.query_sum_many(ls, rs), [1, 3, 15, 12, 5])
+
+    def test_update_many(self):
+        # Duplicate index 2: the last write (7) wins
+        self.fenwick.update_many(np.array([2, 0, 2, 4]), np.array([10, 6, 7, 0]))
+        np.testing.assert_array_equal(self.fenwick.query_sum_many(np.arange(5), np.arange(5)), [6, 2, 7, 4, 0])
+        self.assertEqual(self.fenwick.query_sum(0, 4), 19)  # Sum of [6, 2, 7, 4, 0]
+
+    def test_query_point(self):
+        # Point reads should follow update, add and update_many
+        self.fenwick.update(1, 9)
+        self.fenwick.add(3, -4)
+        self.fenwick.update_many(np.array([4]), np.array([8]))
+        self.assertEqual([self.fenwick.query_point(i) for i in range(5)], [1, 9, 3, 0, 8])
+        self.assertEqual(self.fenwick.query_sum(0, 4), 21)
+
+    def test_out_of_range(self):
+        # Bad indices and ranges raise on every backend instead of reading past the tree
+        for index in (-1, 5, 7):
+            with self.assertRaises(IndexError):
+                self.fenwick.update(index, 100)
+            with self.assertRaises(IndexError):
+                self.fenwick.add(index, 1)
+        for l, r in ((0, 7), (-1, 2), (3, 2)):
+            with self.assertRaises(IndexError):
+                self.fenwick.query_sum(l, r)
+        with self.assertRaises(IndexError):
+            self.fenwick.query_prefix(5)
+        self.assertEqual(self.fenwick.query_prefix(-1), 0)
+        self.assertEqual(self.fenwick.query_sum(0, 4), 15)
+
+    def test_values_dtype(self):
+        # Raw values keep the input dtype; updates that do not fit are rejected
+        self.assertEqual(self.fenwick.values.dtype, np.int32)
+        with self.assertRaises(OverflowError):
+            self.fenwick.update(0, 2**40)
+        with self.assertRaises(OverflowError):
+            self.fenwick.add(0, 2**31)
+        with self.assertRaises(OverflowError):
+            self.fenwick.update_many(np.array([1]), np.array([2**40]))
+        self.assertEqual([self.fenwick.query_point(i) for i in range(5)], self.data)
+        self.assertEqual(self.fenwick.query_sum(0, 4), 15)
+
+    def test_find_prefix(self):
+        # First index whose prefix sum exceeds the target; prefixes are [1, 3, 6, 10, 15]
+        targets = [-1, 0, 1, 2, 3, 5, 6, 14, 15, 100]
+        expected = [0, 0, 1, 1, 2, 2, 3, 4, 5, 5]
+        self.assertEqual([self.fenwick.find_prefix(t) for t in targets], expected)
+        np.testing.assert_array_equal(self.fenwick.find_prefix_many(targets), expected)
+
+    def test_find_prefix_random(self):
+        # Compare against a search over the prefix sums, with zeros and a non-power-of-2 size
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 5, size=77)
+        fenwick = FenwickTree(data)
+        prefix = np.cumsum(data)
+        targets = np.arange(-1, prefix[-1] + 2)
+        expected = np.searchsorted(prefix, targets, side="right")
+        np.testing.assert_array_equal(fenwick.find_prefix_many(targets), expected)
+        self.assertEqual([fenwick.find_prefix(int(t)) for t in targets], expected.tolist())
+
+    def test_save_load(self):
+        # A memory-mapped snapshot answers the same queries without a rebuild
+        with tempfile.TemporaryDirectory() as path:
+            self.fenwick.save(path)
+            loaded = FenwickTree.load(path, mmap=True)
+            self.assertEqual(loaded.query_sum(2, 4), 12)  # Sum of [3, 4, 5]
+            self.assertEqual(loaded.query_point(3), 4)
+            del loaded  # Release the memory map before the directory is removed
+
+    def test_load_without_values(self):
+        # Snapshots without the raw values get them recomputed from the tree
+        with tempfile.TemporaryDirectory() as path:
+            self.fenwick.values = None
+            self.fenwick.save(path)
+            loaded = FenwickTree.load(path, mmap=False)
+            np.testing.assert_array_equal(loaded.values, self.data)
+            loaded.update(0, 5)
+            self.assertEqual(loaded.query_sum(0, 4), 19)
+
+
+@unittest.skipUnless("numba" in backend.AVAILABLE, "Numba is not installed")
+class TestFenwickTreeNumba(TestFenwickTree):
+    # Rerun every test with the JIT-compiled kernels
+    backend = "numba"
+
+
+class TestRangeFenwickTree(unittest.TestCase):
+    def setUp(self):
+        self.data = [1, 2, 3, 4, 5]
+        self.fenwick = RangeFenwickTree(np.array(self.data, dtype=np.int32))
+
+    def test_query_sum(self):
+        # Test range sums before any update
+        self.assertEqual(self.fenwick.query_sum(0, 0), 1)  # Sum of [1]
+        self.assertEqual(self.fenwick.query_sum(0, 4), 15)  # Sum of [1, 2, 3, 4, 5]
+        self.assertEqual(self.fenwick.query_sum(2, 4), 12)  # Sum of [3, 4, 5]
+
+    def test_range_add(self):
+        # Add 10 to [1, 3], then set index 4 to 0
+        self.fenwick.range_add(1, 3, 10)
+        self.fenwick.update(4, 0)
+        self.assertEqual(self.fenwick.query_sum(0, 4), 40)  # Sum of [1, 12, 13, 14, 0]
+        self.assertEqual(self.fenwick.query_sum(2, 3), 27)  # Sum of [13, 14]
+        np.testing.assert_array_equal(self.fenwick.query_sum_many(np.arange(5), np.arange(5)), [1, 12, 13, 14, 0])
+
+    def test_query_point(self):
+        self.fenwick.range_add(1, 3, 10)
+        self.assertEqual([self.fenwick.query_point(i) for i in range(5)], [1, 12, 13, 14, 5])
+
+    def test_find_prefix(self):
+        # Prefixes after the range add are [1, 13, 26, 40, 45]
+        self.fenwick.range_add(1, 3, 10)
+        targets = [-1, 0, 1, 12, 13, 39, 40, 44, 45, 100]
+        expected = [0, 0, 1, 1, 2, 3, 4, 4, 5, 5]
+        self.assertEqual([self.fenwick.find_prefix(t) for t in targets], expected)
+        np.testing.assert_array_equal(self.fenwick.find_prefix_many(targets), expected)
+
+    def test_find_prefix_random(self):
+        # Compare against a search over the prefix sums after random range adds
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 5, size=77)
+        fenwick = RangeFenwickTree(data)
+        for _ in range(20):
+            l = int(rng.integers(0, 77))
+            r = int(rng.integers(l, 77))
+            delta = int(rng.integers(0, 4))
+            fenwick.range_add(l, r, delta)
+            data[l:r + 1] += delta
+        prefix = np.cumsum(data)
+        targets = np.arange(-1, prefix[-1] + 2)
+        expected = np.searchsorted(prefix, targets, side="right")
+        np.testing.assert_array_equal(fenwick.find_prefix_many(targets), expected)
+        self.assertEqual([fenwick.find_prefix(int(t)) for t in targets], expected.tolist())
+        self.assertEqual([fenwick.query_point(i) for i in range(77)], data.tolist())
@@ -0,0 +1,66 @@
+#
+#  test_generate_data.py
+#  Advanced Data Structure
+#
+#  Tests for dataset and workload generation.
+#
+
+import unittest
+import numpy as np
+from src.generate_data import (OP_QUERY_MAX, OP_QUERY_SUM, OP_UPDATE, OPERATION_DTYPE, as_operation_array,
+                               generate_operation_array, generate_operations, iter_operation_chunks)
+
+class TestOperationArray(unittest.TestCase):
+    def test_fields(self):
+        # Queries should be valid ranges and updates valid indices
+        ops = generate_operation_array(500, 2000, query_ratio=0.5, seed=0)
+        self.assertEqual(ops.dtype, OPERATION_DTYPE)
+        queries = ops[ops["op"] == OP_QUERY_SUM]
+        updates = ops[ops["op"] == OP_UPDATE]
+        self.assertEqual(len(queries) + len(updates), 2000)
+        self.assertTrue(np.all((queries["a"] <= queries["b"]) & (queries["b"] < 500)))
+        self.assertTrue(np.all((updates["a"] >= 0) & (updates["a"] < 500)))
+        self.assertTrue(np.all((updates["b"] >= 0) & (updates["b"] < 1000)))
+
+    def test_interleaved(self):
+        # A mixed workload should not put all queries before all updates
+        ops = generate_operation_array(100, 1000, query_ratio=0.5, query_type="max", seed=1)
+        is_query = ops["op"] == OP_QUERY_MAX
+        self.assertGreater(np.count_nonzero(np.diff(is_query.astype(np.int8))), 100)
+
+    def test_seeded(self):
+        # The same seed should give the same workload
+        a = generate_operation_array(100, 50, seed=7, distribution="hotspot")
+        b = generate_operation_array(100, 50, seed=7, distribution="hotspot")
+        np.testing.assert_array_equal(a, b)
+
+    def test_skewed(self):
+        # Skewed distributions should concentrate on the hot indices
+        zipf = generate_operation_array(10_000, 5000, query_ratio=0.0, distribution="zipf", seed=0)
+        hot = generate_operation_array(10_000, 5000, query_ratio=0.0, distribution="hotspot", seed=0)
+        self.assertGreater(np.mean(zipf["a"] < 100), 0.5)
+        self.assertGreater(np.mean(hot["a"] < 100), 0.85)
+        with self.assertRaises(ValueError):
+            generate_operation_array(100, 10, distribution="normal")
+
+    def test_chunks(self):
+        # Chunks should cover the workload and be reproducible
+        chunks = list(iter_operation_chunks(100, 25, chunk_size=10, seed=3, query_ratio=0.5))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        again = list(iter_operation_chunks(100, 25, chunk_size=10, seed=3, query_ratio=0.5))
+        np.testing.assert_array_equal(np.concatenate(chunks), np.concatenate(again))
+
+class TestOperationDicts(unittest.TestCase):
+    def test_round_trip(self):
+        # Dicts should convert back to the same operations, in order
+        np.random.seed(0)
+        ops = generate_operations(100, 30, query_ratio=0.5)
+        array = as_operation_array(ops)
+        for op, record in zip(ops, array.tolist()):
+            if op["type"] == "update":
+                self.assertEqual(record, (OP_UPDATE, op["index"], op["value"]))
+            else:
+                self.assertEqual(record, (OP_QUERY_SUM, op["l"], op["r"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+#
+#  test_imports.py
+#  Advanced Data Structure
+#
+#  Tests for lazy imports and the query-only entry point.
+#
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from src import backend
+from src.benchmark import measure_import_time
+from src.segment_tree import SegmentTree
+from src.sparse_table import SparseTable
+from src.query import load
+
+class TestImports(unittest.TestCase):
+    def test_no_heavy_imports(self):
+        # Importing these must not pull in progress bars, plotting, argparse or Numba
+        for module in ("src.query", "src.helper", "src.service", "demo"):
+            result = measure_import_time(module, repeat=1)
+            self.assertEqual(result["heavy_modules"], [], module)
+
+    @unittest.skipUnless("numba" in backend.AVAILABLE, "Numba is not installed")
+    def test_numba_loaded_on_first_use(self):
+        # The default backend is still Numba; it is imported by the first scalar operation
+        code = ("import sys; from src.segment_tree import SegmentTree; import numpy as np; "
+                "tree = SegmentTree(np.arange(8)); before = 'numba' in sys.modules; "
+                "tree.query_sum(0, 7); from src import backend; "
+                "print(before, 'numba' in sys.modules, backend.get_backend())")
+        env = {name: value for name, value in os.environ.items() if name != "ADS_BACKEND"}
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env).stdout
+        self.assertEqual(out.split(), ["False", "True", "numba"])
+
+    def test_load(self):
+        # src.query.load restores whichever structure a snapshot holds
+        data = np.array([3, 1, 4, 1, 5], dtype=np.int32)
+        with tempfile.TemporaryDirectory() as path:
+            SparseTable(data).save(path)
+            loaded = load(path)
+            self.assertIsInstance(loaded, SparseTable)
+            self.assertEqual(loaded.query_max(1, 3), 4)
+            del loaded  # Release the memory map before the directory is removed
+        with tempfile.TemporaryDirectory() as path:
+            SegmentTree(data).save(path)
+            self.assertEqual(load(path, mmap=False).query_sum(0, 4), 14)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#
+#  test_lazy_segment_tree.py
+#  Advanced Data Structure
+#
+
+
+import unittest
+import numpy as np
+from src.lazy_segment_tree import LazySegmentTree
+
+class TestLazySegmentTree(unittest.TestCase):
+    def setUp(self):
+        self.data = [1, 2, 3, 4, 5]
+        self.segment = LazySegmentTree(np.array(self.data, dtype=np.int32))
+
+    def test_query(self):
+        # Test sum and max queries before any range update
+        self.assertEqual(self.segment.query_sum(0, 4), 15)  # Sum of [1, 2, 3, 4, 5]
+        self.assertEqual(self.segment.query_sum(2, 4), 12)  # Sum of [3, 4, 5]
+        self.assertEqual(self.segment.query_max(0, 1), 2)  # Max of [1, 2]
+
+    def test_range_add(self):
+        # Add 10 to [1, 3]
+        self.segment.range_add(1, 3, 10)
+        self.assertEqual(self.segment.query_sum(0, 4), 45)  # Sum of [1, 12, 13, 14, 5]
+        self.assertEqual(self.segment.query_sum(3, 4), 19)  # Sum of [14, 5]
+        self.assertEqual(self.segment.query_max(0, 4), 14)  # Max of [1, 12, 13, 14, 5]
+
+    def test_range_assign(self):
+        # Zero out [0, 2], then add 1 to [2, 4]
+        self.segment.range_assign(0, 2, 0)
+        self.segment.range_add(2, 4, 1)
+        self.assertEqual(self.segment.query_sum(0, 4), 12)  # Sum of [0, 0, 1, 5, 6]
+        self.assertEqual(self.segment.query_max(0, 2), 1)  # Max of [0, 0, 1]
+        self.assertEqual(self.segment.query_max(3, 4), 6)  # Max of [5, 6]
+
+    def test_random_operations(self):
+        # Compare against a plain array under a random mix of operations
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 100, size=37)
+        segment = LazySegmentTree(data)
+        for _ in range(300):
+            l = int(rng.integers(0, 37))
+            r = int(rng.integers(l, 37))
+            value = int(rng.integers(-50, 50))
+            op = rng.integers(0, 4)
+            if op == 0:
+                segment.range_add(l, r, value)
+                data[l:r + 1] += value
+            elif op == 1:
+                segment.range_assign(l, r, value)
+                data[l:r + 1] = value
+            elif op == 2:
+                self.assertEqual(segment.query_sum(l, r), data[l:r + 1].sum())
+            else:
+                self.assertEqual(segment.query_max(l, r), data[l:r + 1].max())
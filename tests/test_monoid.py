@@ -0,0 +1,77 @@
+#
+#  test_monoid.py
+#  Advanced Data Structure
+#
+
+
+import unittest
+import numpy as np
+from src.segment_tree import MonoidSegmentTree
+from src.sparse_table import MonoidSparseTable
+
+class TestMonoidSegmentTree(unittest.TestCase):
+    def setUp(self):
+        self.data = np.array([4, 6, 3, 9, 9, 2, 12], dtype=np.int32)
+        self.ls = np.array([0, 0, 2, 5, 1])
+        self.rs = np.array([6, 1, 4, 6, 2])
+
+    def test_min(self):
+        # Min over each range
+        tree = MonoidSegmentTree(self.data, np.minimum)
+        self.assertEqual(tree.query(0, 6), 2)  # Min of [4, 6, 3, 9, 9, 2, 12]
+        np.testing.assert_array_equal(tree.query_many(self.ls, self.rs), [2, 4, 3, 2, 3])
+
+    def test_gcd(self):
+        # GCD over each range
+        tree = MonoidSegmentTree(self.data, np.gcd)
+        self.assertEqual(tree.query(0, 1), 2)  # gcd(4, 6)
+        np.testing.assert_array_equal(tree.query_many(self.ls, self.rs), [1, 2, 3, 2, 3])
+
+    def test_argmax(self):
+        # Index of the leftmost maximum, before and after updates
+        tree = MonoidSegmentTree(self.data, "argmax")
+        np.testing.assert_array_equal(tree.query_many(self.ls, self.rs), [6, 1, 3, 6, 1])
+        self.assertEqual(tree.query(2, 4), 3)  # Tie between 3 and 4 goes left
+        tree.update(4, 20)
+        tree.update_many(np.array([6, 0]), np.array([1, 7]))
+        self.assertEqual(tree.query(0, 6), 4)  # [7, 6, 3, 9, 20, 2, 1]
+        self.assertEqual(tree.query(0, 2), 0)  # Max of [7, 6, 3]
+
+    def test_count_above_threshold(self):
+        # Counting values above 5 is a sum over an indicator array
+        tree = MonoidSegmentTree((self.data > 5).astype(np.int64), np.add)
+        np.testing.assert_array_equal(tree.query_many(self.ls, self.rs), [4, 1, 2, 1, 1])
+
+    def test_update_overflow(self):
+        # Values that do not fit the tree's dtype are rejected instead of wrapping around
+        for op in (np.minimum, "argmax"):
+            tree = MonoidSegmentTree(self.data, op)
+            before = tree.query(0, 6)
+            with self.assertRaises(OverflowError):
+                tree.update_many(np.array([0]), np.array([2**40]))
+            with self.assertRaises(OverflowError):
+                tree.update(1, -2**40)
+            self.assertEqual(tree.query(0, 6), before)
+
+
+class TestMonoidSparseTable(unittest.TestCase):
+    def setUp(self):
+        self.data = np.array([4, 6, 3, 9, 9, 2, 12], dtype=np.int32)
+        self.ls = np.array([0, 0, 2, 5, 1])
+        self.rs = np.array([6, 1, 4, 6, 2])
+
+    def test_min(self):
+        # Min over each range
+        table = MonoidSparseTable(self.data, np.minimum)
+        self.assertEqual(table.query(0, 6), 2)  # Min of [4, 6, 3, 9, 9, 2, 12]
+        np.testing.assert_array_equal(table.query_many(self.ls, self.rs), [2, 4, 3, 2, 3])
+
+    def test_argmin(self):
+        # Index of the leftmost minimum
+        table = MonoidSparseTable(self.data, "argmin")
+        np.testing.assert_array_equal(table.query_many(self.ls, self.rs), [5, 0, 2, 5, 2])
+
+    def test_rejects_non_idempotent(self):
+        # Overlapping windows would double count a sum
+        with self.assertRaises(ValueError):
+            MonoidSparseTable(self.data, np.add)
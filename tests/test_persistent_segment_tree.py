@@ -0,0 +1,81 @@
+#
+#  test_persistent_segment_tree.py
+#  Advanced Data Structure
+#
+#  Tests for the persistent Segment Tree.
+#
+
+import unittest
+import numpy as np
+from src.persistent_segment_tree import PersistentSegmentTree
+
+class TestPersistentSegmentTree(unittest.TestCase):
+    def setUp(self):
+        self.data = [1, 2, 3, 4, 5]
+        self.tree = PersistentSegmentTree(np.array(self.data, dtype=np.int32))
+
+    def test_versions(self):
+        # Each update creates a version; earlier versions keep their answers
+        v1 = self.tree.update(2, 10)  # [1, 2, 10, 4, 5]
+        v2 = self.tree.update_many(np.array([0, 4, 0]), np.array([7, 0, 9]))  # [9, 2, 10, 4, 0]
+        self.assertEqual((v1, v2), (1, 2))
+        self.assertEqual([self.tree.query_sum(v, 0, 4) for v in (0, 1, 2)], [15, 22, 25])
+        self.assertEqual([self.tree.query_max(v, 3, 4) for v in (0, 1, 2)], [5, 5, 4])
+        self.assertEqual(self.tree.query_max(2, 0, 1), 9)
+
+    def test_branch(self):
+        # Updating an older version branches off it
+        self.tree.update(0, 100)
+        v2 = self.tree.update(4, 50, version=0)
+        self.assertEqual(self.tree.query_sum(v2, 0, 4), 60)  # [1, 2, 3, 4, 50]
+
+    def test_path_copying(self):
+        # An update allocates only the nodes on one root-to-leaf path
+        used = self.tree.used
+        self.tree.update(1, 0)
+        self.assertEqual(self.tree.used - used, self.tree.height + 1)
+
+    def test_random(self):
+        # Compare every version against brute force on random batches
+        rng = np.random.default_rng(0)
+        history = [np.arange(37)]
+        tree = PersistentSegmentTree(history[0], capacity=8)  # Forces the pools to grow
+        for _ in range(40):
+            indices = rng.integers(0, 37, size=3)
+            values = rng.integers(0, 100, size=3)
+            tree.update_many(indices, values)
+            current = history[-1].copy()
+            for i, v in zip(indices, values):
+                current[i] = v
+            history.append(current)
+        for version, values in enumerate(history):
+            for l, r in [(0, 36), (5, 5), (3, 30), (17, 20)]:
+                self.assertEqual(tree.query_sum(version, l, r), values[l:r + 1].sum())
+                self.assertEqual(tree.query_max(version, l, r), values[l:r + 1].max())
+
+    def test_release_and_compact(self):
+        # Released versions are rejected and their nodes reclaimed
+        for i in range(5):
+            self.tree.update(i, 0)
+        for version in (1, 2, 3):
+            self.tree.release(version)
+        self.assertEqual(self.tree.versions, [0, 4, 5])
+        freed = self.tree.compact()
+        self.assertGreater(freed, 0)
+        self.assertEqual(self.tree.query_sum(0, 0, 4), 15)
+        self.assertEqual(self.tree.query_sum(4, 0, 4), 5)
+        self.assertEqual(self.tree.query_max(5, 0, 4), 0)
+        with self.assertRaises(ValueError):
+            self.tree.query_sum(2, 0, 4)
+        self.assertEqual(self.tree.compact(), 0)
+        self.assertEqual(self.tree.query_sum(self.tree.update(2, 3), 0, 4), 3)
+
+    def test_invalid(self):
+        # Out-of-range indices and ranges should raise
+        with self.assertRaises(IndexError):
+            self.tree.update(5, 1)
+        with self.assertRaises(IndexError):
+            self.tree.query_sum(0, 2, 5)
+
+if __name__ == "__main__":
+    unittest.main()
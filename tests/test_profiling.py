@@ -0,0 +1,106 @@
+#
+#  test_profiling.py
+#  Advanced Data Structure
+#
+#  Tests for memory reports and profiler hooks.
+#
+
+import unittest
+import numpy as np
+from src import backend
+from src.fenwick_tree import FenwickTree
+from src.profiling import Profiler
+from src.segment_tree import SegmentTree
+from src.sparse_table import BlockSparseTable, SparseTable
+
+class TestMemoryReport(unittest.TestCase):
+    def setUp(self):
+        self.data = np.arange(1, 101, dtype=np.int32)
+
+    def test_nbytes(self):
+        # nbytes should add up the backing arrays
+        self.assertEqual(FenwickTree(self.data).nbytes, 101 * 8 + 100 * 4)  # Tree plus raw int32 values
+        self.assertEqual(SegmentTree(self.data).nbytes, 200 * 8 + 200 * 4)
+        self.assertEqual(SegmentTree(self.data, aggregates=("max",)).nbytes, 200 * 4)
+        self.assertEqual(SparseTable(self.data).nbytes, 7 * 100 * 4)
+
+    def test_memory_report(self):
+        # The report should list each array and the bytes per element
+        report = BlockSparseTable(self.data, block_size=10).memory_report()
+        self.assertEqual(set(report["arrays"]), {"data", "prefix_max", "suffix_max", "summary"})
+        self.assertEqual(report["total_bytes"], 3 * 100 * 4 + 4 * 10 * 4)
+        self.assertAlmostEqual(report["bytes_per_element"], report["total_bytes"] / 100)
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.data = np.arange(1, 17, dtype=np.int32)
+        self.profiler = Profiler()
+        previous = backend.set_backend("python")
+        self.addCleanup(backend.set_backend, previous)
+
+    def test_build_phases(self):
+        # Build phases should be timed when a profiler is passed in
+        FenwickTree(self.data, profiler=self.profiler)
+        SegmentTree(self.data, profiler=self.profiler)
+        self.assertEqual(set(self.profiler.timings), {"prefix", "levels", "leaves"})
+
+    def test_fenwick_nodes(self):
+        # A prefix walk visits one node per set bit of idx + 1
+        fenwick = FenwickTree(self.data, profiler=self.profiler)
+        fenwick.query_prefix(6)  # 7 = 0b111
+        fenwick.query_sum(4, 7)  # 8 = 0b1000 and 4 = 0b100
+        fenwick.add(0, 1)  # Nodes 1, 2, 4, 8, 16
+        self.assertEqual(self.profiler.nodes["query_prefix"], 3)
+        self.assertEqual(self.profiler.nodes["query_sum"], 2)
+        self.assertEqual(self.profiler.nodes["add"], 5)
+
+    def test_segment_nodes(self):
+        # The full range is a single node of a power-of-two tree
+        segment = SegmentTree(self.data, profiler=self.profiler)
+        segment.query_sum(0, 15)
+        segment.query_max(1, 1)
+        segment.update(0, 5)  # Leaf 16 and ancestors 8, 4, 2, 1, in both trees
+        self.assertEqual(self.profiler.nodes["query_sum"], 1)
+        self.assertEqual(self.profiler.nodes["query_max"], 1)
+        self.assertEqual(self.profiler.nodes["update"], 10)
+
+    def test_counts_match_walks(self):
+        # Counted nodes should equal the nodes the python loops actually combine
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 100, size=37, dtype=np.int32)
+        segment = SegmentTree(data, profiler=self.profiler)
+        for l, r in [(0, 36), (5, 5), (3, 30), (17, 20)]:
+            self.profiler.reset()
+            segment.query_sum(l, r)
+            combined = sum(1 for node in range(1, 2 * 37) if self._covers(node, 37, l, r))
+            self.assertEqual(self.profiler.nodes["query_sum"], combined)
+
+    @staticmethod
+    def _covers(node, size, l, r):
+        # Replay the iterative walk and check whether it combines `node`
+        l += size
+        r += size
+        while l <= r:
+            if l % 2 == 1:
+                if l == node:
+                    return True
+                l += 1
+            if r % 2 == 0:
+                if r == node:
+                    return True
+                r -= 1
+            l >>= 1
+            r >>= 1
+        return False
+
+    def test_report(self):
+        # The report should include averages per operation
+        sparse = SparseTable(self.data, profiler=self.profiler)
+        for l in range(4):
+            sparse.query_max(l, 15)
+        report = self.profiler.report()
+        self.assertEqual(report["operations"]["query_max"], {"calls": 4, "nodes": 8, "nodes_per_call": 2.0})
+        self.assertIn("levels", report["build_phases_s"])
+
+if __name__ == "__main__":
+    unittest.main()
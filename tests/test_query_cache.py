@@ -0,0 +1,78 @@
+#
+#  test_query_cache.py
+#  Advanced Data Structure
+#
+#  Tests for the range query cache.
+#
+
+import unittest
+import numpy as np
+from src.fenwick_tree import FenwickTree
+from src.query_cache import CachedQueries, _canonical_nodes
+from src.segment_tree import SegmentTree
+
+class TestCachedQueries(unittest.TestCase):
+    def setUp(self):
+        self.data = np.arange(1, 38, dtype=np.int64)
+        self.cached = CachedQueries(SegmentTree(self.data), capacity=8)
+
+    def test_canonical_nodes(self):
+        # An index lies in [l, r] exactly when a canonical node is one of its ancestors
+        n = 37
+        for l, r in [(0, 36), (5, 5), (3, 30), (17, 20)]:
+            nodes = set(_canonical_nodes(n, l, r))
+            for i in range(n):
+                node, hit = i + n, False
+                while node >= 1:
+                    hit |= node in nodes
+                    node >>= 1
+                self.assertEqual(hit, l <= i <= r)
+
+    def test_hits(self):
+        # Repeated windows should be served from the cache
+        self.assertEqual(self.cached.query_sum(3, 9), self.data[3:10].sum())
+        self.assertEqual(self.cached.query_sum(3, 9), self.data[3:10].sum())
+        self.assertEqual(self.cached.query_max(3, 9), 10)
+        stats = self.cached.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_invalidation(self):
+        # Only ranges containing the updated index should be dropped
+        self.cached.query_sum(0, 10)
+        self.cached.query_sum(20, 30)
+        self.cached.query_max(5, 5)
+        self.cached.update(5, 100)
+        self.assertEqual(self.cached.cache_stats()["invalidations"], 2)
+        self.assertEqual(self.cached.query_sum(0, 10), self.data[:11].sum() - 6 + 100)
+        self.assertEqual(self.cached.query_max(5, 5), 100)
+        self.cached.reset_stats()
+        self.cached.query_sum(20, 30)
+        self.assertEqual(self.cached.cache_stats()["hits"], 1)
+
+    def test_update_many_and_eviction(self):
+        # Batched updates should invalidate as well, and capacity should bound the cache
+        for l in range(10):
+            self.cached.query_sum(l, l + 20)
+        self.assertEqual(self.cached.cache_stats()["cached_ranges"], 8)
+        self.assertEqual(self.cached.cache_stats()["evictions"], 2)
+        self.cached.update_many(np.array([28, 28]), np.array([5, 0]))
+        self.assertEqual(self.cached.cache_stats()["cached_ranges"], 8 - 2)  # Ranges starting at 8 and 9
+        self.assertEqual(self.cached.query_sum(9, 29), self.data[9:30].sum() - 29)
+        self.cached.update_many(np.arange(37), np.zeros(37, dtype=np.int64))  # More indices than cached ranges
+        self.assertEqual(self.cached.query_sum(2, 22), 0)
+
+    def test_fenwick(self):
+        # Prefix queries and add should be cached and invalidated too
+        cached = CachedQueries(FenwickTree(self.data))
+        self.assertEqual(cached.query_prefix(4), 15)
+        cached.add(4, 10)
+        self.assertEqual(cached.query_prefix(4), 25)
+        cached.add(30, 10)
+        self.assertEqual(cached.query_prefix(4), 25)
+        self.assertEqual(cached.cache_stats()["hits"], 1)
+        np.testing.assert_array_equal(cached.query_sum_many([0], [1]), [3])  # Passed through
+        with self.assertRaises(AttributeError):
+            cached.range_add
+
+if __name__ == "__main__":
+    unittest.main()
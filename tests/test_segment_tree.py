@@ -6,12 +6,18 @@
 #
 
 
+import tempfile
 import unittest
 import numpy as np
+from src import backend
 from src.segment_tree import SegmentTree
 
 class TestSegmentTree(unittest.TestCase):
+    backend = "python"
+
     def setUp(self):
+        previous = backend.set_backend(self.backend)
+        self.addCleanup(backend.set_backend, previous)
         self.data = [1, 2, 3, 4, 5]
         self.segment = SegmentTree(np.array(self.data, dtype=np.int32))
 
@@ -34,3 +40,95 @@ class TestSegmentTree(unittest.TestCase):
         self.segment.update(2, 10)
         self.assertEqual(self.segment.query_sum(0, 4), 22)  # Sum of [1, 2, 10, 4, 5]
         self.assertEqual(self.segment.query_max(0, 4), 10)  # Max of [1, 2, 10, 4, 5]
+
+    def test_query_many(self):
+        # Batched queries should match the scalar queries
+        ls = np.array([0, 0, 0, 2, 1])
+        rs = np.array([0, 1, 4, 4, 3])
+        np.testing.assert_array_equal(self.segment.query_sum_many(ls, rs), [1, 3, 15, 12, 9])
+        np.testing.assert_array_equal(self.segment.query_max_many(ls, rs), [1, 2, 5, 5, 4])
+
+    def test_update_many(self):
+        # Duplicate index 2: the last write (7) wins
+        self.segment.update_many(np.array([2, 0, 2, 4]), np.array([10, 6, 7, 0]))
+        np.testing.assert_array_equal(self.segment.query_sum_many(np.arange(5), np.arange(5)), [6, 2, 7, 4, 0])
+        self.assertEqual(self.segment.query_sum(0, 4), 19)  # Sum of [6, 2, 7, 4, 0]
+        self.assertEqual(self.segment.query_max(0, 4), 7)  # Max of [6, 2, 7, 4, 0]
+
+    def test_save_load(self):
+        # A memory-mapped snapshot answers the same queries without a rebuild
+        with tempfile.TemporaryDirectory() as path:
+            self.segment.save(path)
+            loaded = SegmentTree.load(path, mmap=True)
+            self.assertEqual(loaded.query_sum(2, 4), 12)  # Sum of [3, 4, 5]
+            self.assertEqual(loaded.query_max(0, 1), 2)  # Max of [1, 2]
+            del loaded  # Release the memory map before the directory is removed
+
+    def test_aggregates_and_dtype(self):
+        # A max-only tree keeps the int32 input dtype and has no sum tree
+        segment = SegmentTree(np.array(self.data, dtype=np.int32), aggregates=("max",))
+        self.assertEqual(segment.aggregates, ("max",))
+        self.assertEqual(segment.tree_max.dtype, np.int32)
+        self.assertEqual(len(segment.tree_max), 10)  # 2n entries
+        self.assertEqual(segment.query_max(1, 3), 4)  # Max of [2, 3, 4]
+        with self.assertRaises(ValueError):
+            segment.query_sum(0, 4)
+        with self.assertRaises(OverflowError):
+            segment.update_many(np.array([0]), np.array([2 ** 40]))
+
+    def test_random_sizes(self):
+        # The non-power-of-two layout must agree with brute force for any n
+        rng = np.random.default_rng(0)
+        for n in [1, 2, 3, 7, 33, 100]:
+            data = rng.integers(0, 1000, size=n)
+            segment = SegmentTree(data)
+            indices = rng.integers(0, n, size=20)
+            values = rng.integers(0, 1000, size=20)
+            segment.update_many(indices[:10], values[:10])
+            for i, v in zip(indices[10:], values[10:]):
+                segment.update(int(i), int(v))
+            for i, v in zip(indices, values):
+                data[i] = v
+            ls = rng.integers(0, n, size=50)
+            rs = np.minimum(ls + rng.integers(0, n, size=50), n - 1)
+            np.testing.assert_array_equal(segment.query_sum_many(ls, rs), [data[l:r + 1].sum() for l, r in zip(ls, rs)])
+            np.testing.assert_array_equal(segment.query_max_many(ls, rs), [data[l:r + 1].max() for l, r in zip(ls, rs)])
+            self.assertEqual(segment.query_sum(0, n - 1), data.sum())
+
+    def test_out_of_range(self):
+        # Bad indices and ranges raise on every backend instead of touching memory past the tree
+        for index in (-1, 5, 7):
+            with self.assertRaises(IndexError):
+                self.segment.update(index, 100)
+        for l, r in ((0, 7), (-1, 2), (3, 2)):
+            with self.assertRaises(IndexError):
+                self.segment.query_sum(l, r)
+            with self.assertRaises(IndexError):
+                self.segment.query_max(l, r)
+        self.assertEqual(self.segment.query_sum(0, 4), 15)
+        self.assertEqual(self.segment.query_max(0, 4), 5)
+
+    def test_update_overflow(self):
+        # A value that does not fit the int32 max tree is rejected on every backend
+        with self.assertRaises(OverflowError):
+            self.segment.update(0, 2**40)
+        # Neither tree was touched, so the aggregates still agree
+        self.assertEqual(self.segment.query_max(0, 4), 5)
+        self.assertEqual(self.segment.query_sum(0, 4), 15)
+
+    def test_parallel_build(self):
+        # Threaded builds must produce the same trees as the serial build
+        data = np.random.default_rng(1).integers(-1000, 1000, size=300_001).astype(np.int32)
+        serial = SegmentTree(data)
+        for workers in (2, 3):
+            parallel = SegmentTree(data, workers=workers)
+            np.testing.assert_array_equal(parallel.tree_sum, serial.tree_sum)
+            np.testing.assert_array_equal(parallel.tree_max, serial.tree_max)
+        with self.assertRaises(ValueError):
+            SegmentTree(data[:10], workers=0)
+
+
+@unittest.skipUnless("numba" in backend.AVAILABLE, "Numba is not installed")
+class TestSegmentTreeNumba(TestSegmentTree):
+    # Rerun every test with the JIT-compiled kernels
+    backend = "numba"
@@ -0,0 +1,111 @@
+#
+#  test_service.py
+#  Advanced Data Structure
+#
+#  Tests for the asyncio query service.
+#
+
+import asyncio
+import threading
+import time
+import unittest
+import numpy as np
+from src.fenwick_tree import FenwickTree
+from src.segment_tree import SegmentTree
+from src.service import QueryService, benchmark_service, run_load
+
+class TestQueryService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.data = np.arange(1, 101, dtype=np.int64)
+
+    async def test_coalescing(self):
+        # Concurrent queries should be answered in a few batches, each with its own result
+        async with QueryService(SegmentTree(self.data), max_delay=0.01) as service:
+            ranges = [(l, min(99, l + 10)) for l in range(50)]
+            sums = await asyncio.gather(*(service.query_sum(l, r) for l, r in ranges))
+            maxes = await asyncio.gather(*(service.query_max(l, r) for l, r in ranges))
+            self.assertEqual(sums, [int(self.data[l:r + 1].sum()) for l, r in ranges])
+            self.assertEqual(maxes, [r + 1 for l, r in ranges])
+            self.assertLessEqual(service.stats()["batches"], 4)
+            self.assertEqual(service.stats()["queries"], 100)
+
+    async def test_update_order(self):
+        # Queries submitted before an update should not see it; later ones should
+        async with QueryService(FenwickTree(self.data), max_delay=0.01) as service:
+            before = asyncio.ensure_future(service.query_sum(0, 99))
+            await asyncio.sleep(0)  # Let the query reach the queue
+            await service.update(0, 1001)
+            after = await service.query_sum(0, 99)
+            self.assertEqual(await before, 5050)
+            self.assertEqual(after, 5050 + 1000)
+
+    async def test_invalid_range(self):
+        # A bad range should fail on its own without failing the batch
+        async with QueryService(SegmentTree(self.data)) as service:
+            with self.assertRaises(IndexError):
+                await service.query_sum(5, 100)
+            self.assertEqual(await service.query_max(0, 99), 100)
+
+    async def test_close_in_flight(self):
+        # A batch already on the worker thread when close() is called is still answered
+        tree = SegmentTree(self.data)
+        started = threading.Event()
+        query_sum_many = tree.query_sum_many
+        def slow_query_sum_many(ls, rs):
+            started.set()
+            time.sleep(0.1)
+            return query_sum_many(ls, rs)
+        tree.query_sum_many = slow_query_sum_many
+        service = QueryService(tree, max_delay=0)
+        await service.start()
+        in_flight = asyncio.ensure_future(service.query_sum(0, 9))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        waiting = asyncio.ensure_future(service.query_sum(0, 99))  # Queued behind the running batch
+        await service.close()
+        self.assertEqual(await asyncio.wait_for(in_flight, 1), 55)
+        self.assertEqual(await asyncio.wait_for(waiting, 1), 5050)
+
+    async def test_socket(self):
+        # Requests over the socket protocol should be answered, including errors
+        async with QueryService(SegmentTree(self.data), max_delay=0.001) as service:
+            server = await service.serve()
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            for request, reply in [(b"SUM 0 9\n", b"55\n"), (b"UPDATE 9 0\n", b"OK\n"), (b"MAX 0 9\n", b"9\n"),
+                                   (b"SUM 0\n", None), (b"NOPE 1 2\n", None)]:
+                writer.write(request)
+                line = await reader.readline()
+                if reply is None:
+                    self.assertTrue(line.startswith(b"ERR"))
+                else:
+                    self.assertEqual(line, reply)
+            writer.close()
+            result = await run_load(host, port, 100, clients=4, requests=10)
+            self.assertEqual(result["queries"], 40)
+            server.close()
+            await server.wait_closed()
+
+    async def test_socket_unsupported(self):
+        # Unsupported queries and failed updates get an ERR reply without dropping the connection
+        async with QueryService(FenwickTree(self.data), max_delay=0.001) as service:
+            server = await service.serve()
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            for request in (b"MAX 0 9\n", f"UPDATE 0 {2**70}\n".encode()):
+                writer.write(request)
+                self.assertTrue((await reader.readline()).startswith(b"ERR"))
+            writer.write(b"SUM 0 9\n")
+            self.assertEqual(await reader.readline(), b"55\n")
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    async def test_benchmark(self):
+        # The report should have one row per delay and client count
+        results = await benchmark_service(SegmentTree(self.data), [1, 4], requests=5, delays=(0.0, 0.001))
+        self.assertEqual([(r["delay_ms"], r["clients"]) for r in results], [(0.0, 1), (0.0, 4), (1.0, 1), (1.0, 4)])
+        self.assertTrue(all(r["queries_per_sec"] > 0 for r in results))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+#
+#  test_shared_pool.py
+#  Advanced Data Structure
+#
+
+
+import threading
+import unittest
+import numpy as np
+from src.segment_tree import SegmentTree
+from src.sparse_table import SparseTable
+from src.shared_pool import SharedQueryPool
+
+class TestSharedQueryPool(unittest.TestCase):
+    def setUp(self):
+        self.data = np.array([1, 2, 3, 4, 5], dtype=np.int32)
+        self.ls = np.array([0, 0, 0, 2, 1])
+        self.rs = np.array([0, 1, 4, 4, 3])
+
+    def test_segment_tree(self):
+        # Queries are served by the workers; updates by the writer are visible to them
+        with SharedQueryPool(SegmentTree(self.data), workers=2) as pool:
+            np.testing.assert_array_equal(pool.query_sum_many(self.ls, self.rs), [1, 3, 15, 12, 9])
+            pool.update_many(np.array([2]), np.array([10]))
+            self.assertEqual(pool.version, 1)
+            np.testing.assert_array_equal(pool.query_sum_many(self.ls, self.rs), [1, 3, 22, 19, 16])
+            np.testing.assert_array_equal(pool.query_max_many(self.ls, self.rs), [1, 2, 10, 10, 10])
+
+    def test_sparse_table(self):
+        # Read-only structures are served the same way
+        with SharedQueryPool(SparseTable(self.data), workers=2) as pool:
+            np.testing.assert_array_equal(pool.query_max_many(self.ls, self.rs), [1, 2, 5, 5, 4])
+            with self.assertRaises(TypeError):
+                pool.update_many(np.array([0]), np.array([9]))
+
+    def test_consistent_batches(self):
+        # Every answer of one batched call reflects the same write batch
+        n = 1 << 14
+        ls = np.arange(0, n, 64)
+        rs = ls + 63
+        with SharedQueryPool(SegmentTree(np.zeros(n, dtype=np.int64)), workers=2) as pool:
+            stop = threading.Event()
+            
+            def writer():
+                version = 0
+                while not stop.is_set():
+                    version += 1
+                    pool.update_many(np.arange(n), np.full(n, version))  # Every value becomes the version
+            
+            thread = threading.Thread(target=writer)
+            thread.start()
+            try:
+                for _ in range(100):
+                    res = pool.query_max_many(ls, rs)
+                    self.assertEqual(len(np.unique(res)), 1)
+                    self.assertEqual(res[0], pool.last_version)
+            finally:
+                stop.set()
+                thread.join()
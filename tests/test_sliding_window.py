@@ -0,0 +1,47 @@
+#
+#  test_sliding_window.py
+#  Advanced Data Structure
+#
+
+
+import unittest
+import numpy as np
+from src.sliding_window import SlidingWindowMonitor
+
+class TestSlidingWindowMonitor(unittest.TestCase):
+    def setUp(self):
+        self.monitor = SlidingWindowMonitor(4)
+        for value in [1, 2, 3, 4, 5, 6]:
+            self.monitor.append(value)  # Window now holds [3, 4, 5, 6]
+
+    def test_query(self):
+        # Window-relative queries, including ranges that wrap around the buffer
+        self.assertEqual(len(self.monitor), 4)
+        self.assertEqual(self.monitor.query_sum(0, 3), 18)  # Sum of [3, 4, 5, 6]
+        self.assertEqual(self.monitor.query_sum(1, 2), 9)  # Sum of [4, 5]
+        self.assertEqual(self.monitor.query_max(0, 1), 4)  # Max of [3, 4]
+        self.assertEqual(self.monitor.query_max(0, 3), 6)  # Max of [3, 4, 5, 6]
+
+    def test_query_many(self):
+        # Batched queries should match the scalar queries
+        ls = np.array([0, 1, 0, 3])
+        rs = np.array([3, 2, 1, 3])
+        np.testing.assert_array_equal(self.monitor.query_sum_many(ls, rs), [18, 9, 7, 6])
+        np.testing.assert_array_equal(self.monitor.query_max_many(ls, rs), [6, 5, 4, 6])
+
+    def test_extend(self):
+        # Extending with more than the capacity keeps only the newest values
+        self.monitor.extend(np.array([7, 8, 9, 10, 11]))
+        self.assertEqual(self.monitor.count, 11)
+        self.assertEqual(self.monitor.query_sum(0, 3), 38)  # Sum of [8, 9, 10, 11]
+        self.assertEqual(self.monitor.query_max(0, 0), 8)  # Max of [8]
+
+    def test_fenwick_backend(self):
+        # The Fenwick backend answers sums only
+        monitor = SlidingWindowMonitor(3, backend="fenwick")
+        monitor.extend(np.array([1, 2, 3, 4]))
+        self.assertEqual(monitor.query_sum(0, 2), 9)  # Sum of [2, 3, 4]
+        with self.assertRaises(ValueError):
+            monitor.query_max(0, 2)
+        with self.assertRaises(IndexError):
+            monitor.query_sum(0, 3)
@@ -6,9 +6,10 @@
 #
 
 
+import tempfile
 import unittest
 import numpy as np
-from src.sparse_table import SparseTable
+from src.sparse_table import SparseTable, BlockSparseTable
 
 class TestSparseTable(unittest.TestCase):
     def setUp(self):
@@ -21,3 +22,82 @@ class TestSparseTable(unittest.TestCase):
         self.assertEqual(self.sparse.query_max(0, 1), 2)  # Max of [1, 2]
         self.assertEqual(self.sparse.query_max(0, 4), 5)  # Max of [1, 2, 3, 4, 5]
         self.assertEqual(self.sparse.query_max(2, 4), 5)  # Max of [3, 4, 5]
+
+    def test_query_max_random(self):
+        # Compare against a brute-force max on random data
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 1000, size=257, dtype=np.int32)
+        sparse = SparseTable(data)
+        for l, r in [(0, 256), (3, 3), (10, 200), (128, 255), (255, 256)]:
+            self.assertEqual(sparse.query_max(l, r), data[l:r + 1].max())
+
+    def test_query_max_many(self):
+        # Batched queries should match the scalar queries
+        ls = np.array([0, 0, 0, 2, 1])
+        rs = np.array([0, 1, 4, 4, 3])
+        np.testing.assert_array_equal(self.sparse.query_max_many(ls, rs), [1, 2, 5, 5, 4])
+
+    def test_save_load(self):
+        # A memory-mapped snapshot answers the same queries without a rebuild
+        with tempfile.TemporaryDirectory() as path:
+            self.sparse.save(path)
+            loaded = SparseTable.load(path, mmap=True)
+            self.assertEqual(loaded.query_max(0, 4), 5)  # Max of [1, 2, 3, 4, 5]
+            self.assertEqual(loaded.query_max(0, 1), 2)  # Max of [1, 2]
+            del loaded  # Release the memory map before the directory is removed
+
+    def test_parallel_build(self):
+        # Threaded builds must produce the same table as the serial build
+        data = np.random.default_rng(1).integers(0, 1000, size=200_003).astype(np.int32)
+        np.testing.assert_array_equal(SparseTable(data, workers=4).st, SparseTable(data).st)
+
+
+class TestBlockSparseTable(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.data = rng.integers(0, 1000, size=103, dtype=np.int32)
+        self.sparse = BlockSparseTable(self.data, block_size=8)
+
+    def test_query_max(self):
+        # Ranges inside one block, across two blocks, and spanning many blocks
+        for l, r in [(0, 0), (1, 6), (5, 12), (7, 8), (0, 102), (17, 95), (96, 102)]:
+            self.assertEqual(self.sparse.query_max(l, r), self.data[l:r + 1].max())
+
+    def test_query_max_many(self):
+        # Batched queries should match a brute-force max
+        rng = np.random.default_rng(2)
+        ls = rng.integers(0, 103, size=200)
+        rs = np.minimum(ls + rng.integers(0, 40, size=200), 102)
+        expected = [self.data[l:r + 1].max() for l, r in zip(ls, rs)]
+        np.testing.assert_array_equal(self.sparse.query_max_many(ls, rs), expected)
+
+    def test_update(self):
+        # Updates must be reflected in queries inside and across blocks
+        rng = np.random.default_rng(3)
+        data = self.data.copy()
+        for _ in range(50):
+            index = int(rng.integers(0, 103))
+            value = int(rng.integers(0, 2000))
+            self.sparse.update(index, value)
+            data[index] = value
+            l = int(rng.integers(0, 103))
+            r = int(rng.integers(l, 103))
+            self.assertEqual(self.sparse.query_max(l, r), data[l:r + 1].max())
+        self.assertEqual(self.sparse.query_max(0, 102), data.max())
+
+    def test_update_many(self):
+        # Batched updates, with the last write winning for duplicate indices
+        indices = np.array([0, 50, 50, 102, 7])
+        values = np.array([5000, 3000, 1, 4000, 2])
+        self.sparse.update_many(indices, values)
+        data = self.data.copy()
+        data[[0, 50, 102, 7]] = [5000, 1, 4000, 2]
+        ls = np.arange(0, 103, 3)
+        rs = np.minimum(ls + 30, 102)
+        np.testing.assert_array_equal(self.sparse.query_max_many(ls, rs), [data[l:r + 1].max() for l, r in zip(ls, rs)])
+
+    def test_update_many_overflow(self):
+        # Values that do not fit int32 are rejected instead of wrapping around
+        with self.assertRaises(OverflowError):
+            self.sparse.update_many(np.array([0]), np.array([2**40]))
+        self.assertEqual(self.sparse.query_max(0, 102), self.data.max())
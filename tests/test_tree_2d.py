@@ -0,0 +1,66 @@
+#
+#  test_tree_2d.py
+#  Advanced Data Structure
+#
+
+
+import unittest
+import numpy as np
+from src.tree_2d import FenwickTree2D, SegmentTree2D
+
+class TestFenwickTree2D(unittest.TestCase):
+    def setUp(self):
+        self.data = np.arange(1, 13, dtype=np.int32).reshape(3, 4)  # [[1..4], [5..8], [9..12]]
+        self.fenwick = FenwickTree2D(self.data)
+
+    def test_query_sum(self):
+        # Rectangle sums
+        self.assertEqual(self.fenwick.query_sum(0, 2, 0, 3), 78)  # Whole matrix
+        self.assertEqual(self.fenwick.query_sum(1, 2, 1, 2), 34)  # [[6, 7], [10, 11]]
+        self.assertEqual(self.fenwick.query_sum(0, 0, 3, 3), 4)  # [[4]]
+
+    def test_update(self):
+        # Set (1, 2) from 7 to 0
+        self.fenwick.update(1, 2, 0)
+        self.assertEqual(self.fenwick.query_sum(0, 2, 0, 3), 71)
+        self.assertEqual(self.fenwick.query_sum(1, 2, 1, 2), 27)  # [[6, 0], [10, 11]]
+
+
+class TestSegmentTree2D(unittest.TestCase):
+    def setUp(self):
+        self.data = np.arange(1, 13, dtype=np.int32).reshape(3, 4)  # [[1..4], [5..8], [9..12]]
+        self.segment = SegmentTree2D(self.data)
+
+    def test_query(self):
+        # Rectangle sums and maxima
+        self.assertEqual(self.segment.query_sum(0, 2, 0, 3), 78)  # Whole matrix
+        self.assertEqual(self.segment.query_sum(1, 2, 1, 2), 34)  # [[6, 7], [10, 11]]
+        self.assertEqual(self.segment.query_max(0, 1, 0, 2), 7)  # [[1, 2, 3], [5, 6, 7]]
+
+    def test_update(self):
+        # Set (2, 3) from 12 to 0 and (0, 0) from 1 to 50
+        self.segment.update(2, 3, 0)
+        self.segment.update(0, 0, 50)
+        self.assertEqual(self.segment.query_sum(0, 2, 0, 3), 115)
+        self.assertEqual(self.segment.query_max(1, 2, 0, 3), 11)
+        self.assertEqual(self.segment.query_max(0, 2, 0, 3), 50)
+
+    def test_random(self):
+        # Compare both trees against brute force on a random matrix
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 100, size=(7, 11))
+        segment = SegmentTree2D(data)
+        fenwick = FenwickTree2D(data)
+        for _ in range(30):
+            row, col, value = int(rng.integers(0, 7)), int(rng.integers(0, 11)), int(rng.integers(0, 100))
+            segment.update(row, col, value)
+            fenwick.update(row, col, value)
+            data[row, col] = value
+            r1 = int(rng.integers(0, 7))
+            r2 = int(rng.integers(r1, 7))
+            c1 = int(rng.integers(0, 11))
+            c2 = int(rng.integers(c1, 11))
+            block = data[r1:r2 + 1, c1:c2 + 1]
+            self.assertEqual(segment.query_sum(r1, r2, c1, c2), block.sum())
+            self.assertEqual(fenwick.query_sum(r1, r2, c1, c2), block.sum())
+            self.assertEqual(segment.query_max(r1, r2, c1, c2), block.max())
@@ -0,0 +1,80 @@
+#
+#  test_wavelet_matrix.py
+#  Advanced Data Structure
+#
+#  Tests for the Wavelet Matrix.
+#
+
+import tempfile
+import unittest
+import numpy as np
+from src.wavelet_matrix import WaveletMatrix
+
+class TestWaveletMatrix(unittest.TestCase):
+    def setUp(self):
+        self.data = [5, 1, 4, 1, 9, 2, 6]
+        self.wm = WaveletMatrix(np.array(self.data, dtype=np.int32))
+
+    def test_kth(self):
+        # Sorted [1, 4, 1, 9, 2] is [1, 1, 2, 4, 9]
+        self.assertEqual([self.wm.kth_smallest(1, 5, k) for k in range(5)], [1, 1, 2, 4, 9])
+        self.assertEqual(self.wm.kth_largest(1, 5, 0), 9)
+        self.assertEqual(self.wm.kth_largest(0, 6, 1), 6)
+        self.assertEqual(self.wm.quantile(1, 5, 0.5), 2)  # Median
+        self.assertEqual(self.wm.quantile(0, 6, 1.0), 9)
+
+    def test_counts(self):
+        self.assertEqual(self.wm.count_greater(0, 6, 4), 3)  # 5, 9, 6
+        self.assertEqual(self.wm.count_greater(1, 3, 100), 0)
+        self.assertEqual(self.wm.count_greater(1, 3, -1), 3)
+        self.assertEqual(self.wm.count_less(0, 6, 2), 2)  # 1, 1
+        self.assertEqual(self.wm.count_less(2, 2, 5), 1)
+
+    def test_invalid(self):
+        with self.assertRaises(IndexError):
+            self.wm.kth_smallest(2, 4, 3)
+        with self.assertRaises(IndexError):
+            self.wm.count_greater(3, 7, 0)
+        with self.assertRaises(ValueError):
+            self.wm.quantile(0, 6, 1.5)
+        with self.assertRaisesRegex(IndexError, "k=5"):
+            self.wm.kth_largest(1, 5, 5)
+
+    def test_invalid_many(self):
+        # Batched queries reject the same ranges instead of wrapping around
+        for ls, rs in (([0, -1], [3, 2]), ([0, 2], [3, 7]), ([4], [3])):
+            with self.assertRaises(IndexError):
+                self.wm.count_greater_many(np.array(ls), np.array(rs), np.zeros(len(ls)))
+            with self.assertRaises(IndexError):
+                self.wm.kth_smallest_many(np.array(ls), np.array(rs), np.zeros(len(ls)))
+            with self.assertRaises(IndexError):
+                self.wm.quantile_many(np.array(ls), np.array(rs), 0.5)
+
+    def test_random(self):
+        # Compare against sorting each slice
+        rng = np.random.default_rng(0)
+        for n, high in ((1, 5), (64, 1), (300, 20), (1000, 10**9)):
+            data = rng.integers(-high, high + 1, size=n)
+            wm = WaveletMatrix(data)
+            ls = rng.integers(0, n, size=200)
+            rs = np.array([rng.integers(l, n) for l in ls])
+            ks = np.array([rng.integers(0, r - l + 1) for l, r in zip(ls, rs)])
+            ts = rng.integers(-high - 1, high + 2, size=200)
+            slices = [np.sort(data[l:r + 1]) for l, r in zip(ls, rs)]
+            expected_kth = [s[k] for s, k in zip(slices, ks)]
+            expected_count = [int(np.sum(s > t)) for s, t in zip(slices, ts)]
+            self.assertEqual([wm.kth_smallest(l, r, k) for l, r, k in zip(ls, rs, ks)], expected_kth)
+            self.assertEqual([wm.count_greater(l, r, t) for l, r, t in zip(ls, rs, ts)], expected_count)
+            self.assertEqual(wm.kth_smallest_many(ls, rs, ks).tolist(), expected_kth)
+            self.assertEqual(wm.count_greater_many(ls, rs, ts).tolist(), expected_count)
+            self.assertEqual(wm.quantile_many(ls, rs, 0.5).tolist(), [s[(len(s) - 1) // 2] for s in slices])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.wm.save(path)
+            loaded = WaveletMatrix.load(path)
+            self.assertEqual(loaded.kth_smallest(1, 5, 2), 2)
+            self.assertEqual(loaded.count_greater(0, 6, 4), 3)
+
+if __name__ == '__main__':
+    unittest.main()
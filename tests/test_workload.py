@@ -0,0 +1,77 @@
+#
+#  test_workload.py
+#  Advanced Data Structure
+#
+#  Tests for the mixed read/write workload executor.
+#
+
+import unittest
+import numpy as np
+from src.fenwick_tree import FenwickTree
+from src.generate_data import OP_UPDATE, generate_operation_array
+from src.segment_tree import SegmentTree
+from src.sparse_table import BlockSparseTable
+from src.workload import MixedWorkloadExecutor, summarize_run
+
+class TestMixedWorkloadExecutor(unittest.TestCase):
+    def setUp(self):
+        self.data = np.arange(1, 201, dtype=np.int64)
+
+    def _expected(self, operations, reduce):
+        # Apply the stream one operation at a time to a plain array
+        values = self.data.copy()
+        answers = []
+        for op, a, b in operations.tolist():
+            if op == OP_UPDATE:
+                values[a] = b
+            else:
+                answers.append(reduce(values[a:b + 1]))
+        return answers, values
+
+    def test_matches_sequential(self):
+        # Answers should match the sequential stream for every structure
+        for structure, query_type, reduce in [(FenwickTree, "sum", np.sum), (SegmentTree, "max", np.max),
+                                              (BlockSparseTable, "max", np.max)]:
+            operations = generate_operation_array(200, 2000, query_ratio=0.5, query_type=query_type,
+                                                  distribution="hotspot", seed=0)
+            executor = MixedWorkloadExecutor(structure(self.data), max_pending=64)
+            run = executor.run(operations)
+            answers, values = self._expected(operations, reduce)
+            self.assertEqual(run["answers"], answers)
+            self.assertEqual(executor.structure.query_max(0, 199) if query_type == "max"
+                             else executor.structure.query_sum(0, 199), reduce(values))
+
+    def test_flush_only_on_overlap(self):
+        # Queries away from buffered indices should not flush
+        executor = MixedWorkloadExecutor(SegmentTree(self.data))
+        executor.update(10, 1000)
+        executor.update(10, 0)  # Last write wins
+        self.assertEqual(executor.query_sum(20, 30), self.data[20:31].sum())
+        self.assertEqual(executor.flushes, 0)
+        self.assertEqual(executor.query_max(0, 10), 10)
+        self.assertEqual(executor.flushes, 1)
+        self.assertEqual(executor.pending, {})
+
+    def test_max_pending(self):
+        # A full buffer should flush without any query
+        executor = MixedWorkloadExecutor(FenwickTree(self.data), max_pending=3)
+        for index in range(7):
+            executor.update(index, 0)
+        self.assertEqual(executor.flushes, 2)
+        self.assertEqual(executor.pending_indices, [6])
+        with self.assertRaises(ValueError):
+            MixedWorkloadExecutor(FenwickTree(self.data), max_pending=0)
+
+    def test_summary(self):
+        # The summary should report throughput and latency per operation type
+        operations = generate_operation_array(200, 500, query_ratio=0.3, seed=1)
+        executor = MixedWorkloadExecutor(FenwickTree(self.data))
+        summary = summarize_run(operations, executor.run(operations))
+        self.assertEqual(summary["num_ops"], 500)
+        self.assertGreater(summary["ops_per_sec"], 0)
+        self.assertIn("update_p99_us", summary)
+        self.assertIn("query_sum_p50_us", summary)
+        self.assertNotIn("query_max_p50_us", summary)
+
+if __name__ == "__main__":
+    unittest.main()